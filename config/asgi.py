@@ -9,3 +9,10 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402 (settings are only usable after setup)
+
+if settings.WARMUP:
+    from core.warmup import warm_up
+
+    warm_up()
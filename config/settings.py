@@ -44,7 +44,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.ProfilingMiddleware',
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.SlowQueryLogMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.CompressionMiddleware',
+    'core.middleware.StaticFilesMiddleware',
+    'core.middleware.ReadYourWritesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -59,7 +65,6 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'core' / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -67,13 +72,60 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'core.context_processors.site_context',
+                'core.context_processors.user_counters',
+            ],
+            # Production compiles each template once per process; DEBUG re-reads
+            # templates from disk so edits show up without a restart
+            'loaders': [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ] if DEBUG else [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
             ],
         },
     },
 ]
 
+# Record render time per template name and periodically log the slowest
+TEMPLATE_PROFILING = os.getenv('TEMPLATE_PROFILING', 'False') == 'True'
+TEMPLATE_PROFILING_LOG_INTERVAL = int(os.getenv('TEMPLATE_PROFILING_LOG_INTERVAL', '60'))
+
+# Request profiling (core.profiling): Server-Timing headers on every response,
+# and this fraction of requests run under cProfile with stats saved per view
+REQUEST_PROFILING = os.getenv('REQUEST_PROFILING', 'False') == 'True'
+REQUEST_PROFILING_SAMPLE_RATE = float(os.getenv('REQUEST_PROFILING_SAMPLE_RATE', '0.0'))
+REQUEST_PROFILING_DIR = os.getenv('REQUEST_PROFILING_DIR', str(BASE_DIR / 'profiles'))
+# Seconds a signed ?_profile= link from the profiling_url command stays valid
+REQUEST_PROFILING_TOKEN_MAX_AGE = int(os.getenv('REQUEST_PROFILING_TOKEN_MAX_AGE', '600'))
+
+# Prometheus metrics at /metrics/ (core.metrics). Set METRICS_DIR when running
+# several worker processes so each one's snapshot is merged into the output
+METRICS_DIR = os.getenv('METRICS_DIR', '')
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', '1'))
+# Snapshots of exited processes are deleted this many seconds after their last write
+METRICS_RETENTION_SECONDS = int(os.getenv('METRICS_RETENTION_SECONDS', '3600'))
+# Scrapers are let in by "Authorization: Bearer <METRICS_TOKEN>"; staff always are.
+# Only list addresses when REMOTE_ADDR is the scraper's own: behind a proxy on
+# the same host every visitor arrives from 127.0.0.1
+METRICS_ALLOWED_IPS = [ip for ip in os.getenv('METRICS_ALLOWED_IPS', '').split(',') if ip]
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Slow query log (core.db.slow_queries): queries over the threshold are logged
+# with their view, SQL fingerprint and, the first time, their EXPLAIN plan
+SLOW_QUERY_LOG = os.getenv('SLOW_QUERY_LOG', 'True') == 'True'
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv('SLOW_QUERY_THRESHOLD_MS', '200'))
+# Seconds between log summaries of the fingerprints with the most slow time
+SLOW_QUERY_REPORT_INTERVAL = int(os.getenv('SLOW_QUERY_REPORT_INTERVAL', '300'))
+
 WSGI_APPLICATION = 'config.wsgi.application'
 
+# Serve browse, listing detail and seller storefront with async views (worth it
+# under config.asgi; compare with `python manage.py benchmark_async`)
+ASYNC_VIEWS = os.getenv('ASYNC_VIEWS', 'False') == 'True'
+
 # Database
 DATABASES = {
     'default': {
@@ -83,9 +135,82 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD', ''),
         'HOST': os.getenv('DB_HOST', ''),
         'PORT': os.getenv('DB_PORT', ''),
+        # Seconds a connection is reused across requests (0 closes it after each request).
+        # The pool engine needs 0, so connections go back to the pool when a request ends
+        'CONN_MAX_AGE': int(os.getenv(
+            'DB_CONN_MAX_AGE', '0' if os.getenv('DB_ENGINE', '').endswith('postgresql_pool') else '60'
+        )),
+        # Check a reused connection still works before the request uses it
+        'CONN_HEALTH_CHECKS': os.getenv('DB_CONN_HEALTH_CHECKS', 'True') == 'True',
+        # Only read by the core.db.backends.postgresql_pool engine
+        'POOL': {
+            'MAX_SIZE': int(os.getenv('DB_POOL_MAX_SIZE', '10')),
+            'MIN_SIZE': int(os.getenv('DB_POOL_MIN_SIZE', '0')),
+            'IDLE_TIMEOUT': int(os.getenv('DB_POOL_IDLE_TIMEOUT', '300')),
+            'TIMEOUT': int(os.getenv('DB_POOL_TIMEOUT', '10')),
+        },
     }
 }
 
+# Production SQLite profile, applied to each new connection by core.db.sqlite
+if os.getenv('DB_SQLITE_TUNED', str(not DEBUG)) == 'True':
+    DATABASES['default']['PRAGMAS'] = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': int(os.getenv('DB_SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))),
+        # Negative values are KiB rather than pages
+        'cache_size': -int(os.getenv('DB_SQLITE_CACHE_SIZE_KB', '20000')),
+        'busy_timeout': int(os.getenv('DB_SQLITE_BUSY_TIMEOUT_MS', '5000')),
+        'temp_store': 'MEMORY',
+    }
+
+# Read replicas: comma-separated host[:port] entries for PostgreSQL, or
+# database file names for SQLite; everything else is copied from default
+for number, replica in enumerate(filter(None, os.getenv('DB_REPLICAS', '').split(',')), start=1):
+    replica_settings = {
+        **DATABASES['default'],
+        'POOL': dict(DATABASES['default']['POOL']),
+        # Tests run against the primary only
+        'TEST': {'MIRROR': 'default'},
+    }
+    if replica_settings['ENGINE'].endswith('sqlite3'):
+        replica_settings['NAME'] = replica.strip()
+    else:
+        host, _, port = replica.strip().partition(':')
+        replica_settings.update(HOST=host, PORT=port or replica_settings['PORT'])
+    DATABASES[f'replica{number}'] = replica_settings
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['core.db.routers.PrimaryReplicaRouter']
+# Seconds a client keeps reading from the primary after it writes
+REPLICA_STICKY_SECONDS = int(os.getenv('DB_REPLICA_STICKY_SECONDS', '10'))
+
+# Cache (navbar counters and other per-user values)
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+# Seconds the category list is cached; edits invalidate it in this cache, but a
+# per-process cache (locmem) in other workers only catches up on expiry
+CATEGORY_CACHE_TIMEOUT = int(os.getenv('CATEGORY_CACHE_TIMEOUT', '300'))
+
+# Worker warm-up (core.warmup), run when config.wsgi / config.asgi is imported:
+# compile URL patterns and these templates, prime caches and open connections.
+# Off by default: a server that imports the app before forking (gunicorn --preload)
+# would hand the same connections to every worker
+WARMUP = os.getenv('WARMUP', 'False') == 'True'
+WARMUP_TEMPLATES = [
+    'base.html',
+    'index.html',
+    'marketplace/listing_list.html',
+    'marketplace/listing_detail.html',
+    'users/seller_list.html',
+    'users/seller_profile.html',
+    'users/profile.html',
+]
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -116,6 +241,27 @@ STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_DIRS = [BASE_DIR / 'static'] if (BASE_DIR / 'static').exists() else []
 
+# Outside DEBUG, collectstatic writes content-hashed names (cache busting) plus
+# .gz/.br variants, and StaticFilesMiddleware serves them with far-future caching
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+            else 'core.storage.CompressedManifestStaticFilesStorage'
+        ),
+    },
+}
+SERVE_STATIC = os.getenv('SERVE_STATIC', str(not DEBUG)) == 'True'
+
+# Response compression (brotli when the optional package is installed, else gzip)
+# Smaller bodies fit in a packet or two already and are sent as they are
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+# Pages that render a CSRF token are left uncompressed against BREACH unless this is on
+COMPRESS_CSRF_RESPONSES = os.getenv('COMPRESS_CSRF_RESPONSES', 'False') == 'True'
+
 # Media files (User uploads)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
@@ -127,6 +273,51 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 CRISPY_TEMPLATE_PACK = "bootstrap5"
 
+# Transactions
+# Minutes a buyer's reservation holds an item before the expiry job releases it
+RESERVATION_TIMEOUT_MINUTES = int(os.getenv('RESERVATION_TIMEOUT_MINUTES', '30'))
+# Hours a transaction request's Idempotency-Key is remembered for replaying retries
+IDEMPOTENCY_KEY_TTL_HOURS = int(os.getenv('IDEMPOTENCY_KEY_TTL_HOURS', '24'))
+
+# Background tasks (run with `python manage.py run_worker`)
+# Seconds before a running task whose worker died is handed to another worker
+TASK_LOCK_TIMEOUT_SECONDS = int(os.getenv('TASK_LOCK_TIMEOUT_SECONDS', '1800'))
+# Days finished tasks are kept for inspection in the admin
+TASK_RETENTION_DAYS = int(os.getenv('TASK_RETENTION_DAYS', '7'))
+# Task name -> seconds between the end of one run and the start of the next
+PERIODIC_TASKS = {
+    'transactions.expire_reservations': 60,
+    'transactions.purge_idempotency_keys': 60 * 60,
+    'reviews.rebuild_seller_ratings': 24 * 60 * 60,
+    'core.purge_finished_tasks': 24 * 60 * 60,
+    'marketplace.expire_listings': 24 * 60 * 60,
+    'marketplace.requeue_stale_moderation_jobs': 5 * 60,
+    'core.optimize_sqlite': 6 * 60 * 60,
+}
+
+# Uploaded item images are downscaled in the background to fit this many pixels
+ITEM_IMAGE_MAX_DIMENSION = int(os.getenv('ITEM_IMAGE_MAX_DIMENSION', '1600'))
+
+# Listing lifecycle
+# Available listings older than this many days are taken off the marketplace
+LISTING_MAX_AGE_DAYS = int(os.getenv('LISTING_MAX_AGE_DAYS', '90'))
+# Listings inactive for this many days are moved to the archive tables
+LISTING_ARCHIVE_AFTER_DAYS = int(os.getenv('LISTING_ARCHIVE_AFTER_DAYS', '180'))
+
+# Moderation
+# Admin bulk actions on more objects than this are queued as a ModerationJob
+MODERATION_INLINE_LIMIT = int(os.getenv('MODERATION_INLINE_LIMIT', '1000'))
+# Objects updated per statement (and per database transaction) by moderation jobs
+MODERATION_BATCH_SIZE = int(os.getenv('MODERATION_BATCH_SIZE', '500'))
+# Running jobs with no finished batch for this many seconds are requeued (worker died)
+MODERATION_JOB_TIMEOUT_SECONDS = int(os.getenv('MODERATION_JOB_TIMEOUT_SECONDS', '600'))
+
+# Reviews
+# Seller ranking shrinks each average towards RATING_PRIOR_MEAN as if every
+# seller had RATING_PRIOR_WEIGHT extra reviews at that mean
+RATING_PRIOR_MEAN = float(os.getenv('RATING_PRIOR_MEAN', '3.5'))
+RATING_PRIOR_WEIGHT = int(os.getenv('RATING_PRIOR_WEIGHT', '10'))
+
 # Logging
 LOGGING = {
     'version': 1,
@@ -141,12 +332,18 @@ LOGGING = {
             'handlers': ['console'],
             'level': 'INFO',
         },
+        'core': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
     },
 }
 
 # Security Settings (adjust for production)
 if not DEBUG:
     SECURE_SSL_REDIRECT = True
+    # Scrapers on the internal network talk plain HTTP
+    SECURE_REDIRECT_EXEMPT = [r'^metrics/$']
     SESSION_COOKIE_SECURE = True
     CSRF_COOKIE_SECURE = True
     SECURE_BROWSER_XSS_FILTER = True
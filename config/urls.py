@@ -8,6 +8,8 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.views.generic import TemplateView
 
+from core.views import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', TemplateView.as_view(template_name='index.html'), name='home'),
@@ -16,6 +18,7 @@ urlpatterns = [
     path('messaging/', include('messaging.urls')),
     path('transactions/', include('transactions.urls')),
     path('reviews/', include('reviews.urls')),
+    path('metrics/', metrics_view, name='metrics'),
 ]
 
 # Serve media files in development
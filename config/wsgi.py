@@ -9,3 +9,10 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_wsgi_application()
+
+from django.conf import settings  # noqa: E402 (settings are only usable after setup)
+
+if settings.WARMUP:
+    from core.warmup import warm_up
+
+    warm_up()
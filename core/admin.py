@@ -0,0 +1,27 @@
+from django.contrib import admin
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Task
+from .paginator import EstimatedCountPaginator
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    """Admin for background Task rows."""
+    list_display = ['id', 'name', 'status', 'priority', 'attempts', 'run_at', 'locked_by', 'finished_at']
+    list_filter = ['status', 'name']
+    search_fields = ['name', 'dedupe_key']
+    readonly_fields = ['attempts', 'last_error', 'locked_by', 'locked_at', 'created_at', 'finished_at']
+    ordering = ['-id']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ['retry_tasks']
+    
+    @admin.action(description='Run selected failed tasks again')
+    def retry_tasks(self, request, queryset):
+        """Queue failed tasks for one more attempt."""
+        retried = queryset.filter(status='failed').update(
+            status='queued', run_at=timezone.now(), max_attempts=F('attempts') + 1, finished_at=None
+        )
+        self.message_user(request, f"{retried} task(s) queued again.")
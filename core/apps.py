@@ -3,8 +3,28 @@ Core app configuration
 """
 
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.utils.module_loading import autodiscover_modules
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        # Register the @task functions of every installed app
+        autodiscover_modules('tasks')
+
+        from .db.sqlite import apply_pragmas
+        connection_created.connect(apply_pragmas)
+
+        from .db.slow_queries import install
+        connection_created.connect(install)
+
+        from .profiling import install as install_query_timing
+        connection_created.connect(install_query_timing)
+
+        if settings.TEMPLATE_PROFILING:
+            from . import template_profiling
+            template_profiling.install()
@@ -0,0 +1,302 @@
+"""
+In-process benchmark of the hot views.
+
+run_scenarios() drives each hot view through the test Client and
+records latency percentiles, followed by a shorter instrumented pass
+that counts queries and measures the memory allocated per request with
+tracemalloc (kept out of the timed pass, where it would inflate the
+latencies). compare() checks a run against a saved baseline. The
+benchmark_views command seeds core.synthetic data at production scale
+and ties these together.
+
+run_concurrent() is the ASGI counterpart used by benchmark_async: it
+sends many simultaneous requests straight to the ASGI application, with
+db_latency() adding a fixed delay to every query to stand in for a slow
+or distant database, so the sync and async views can be compared where
+waiting on the database dominates.
+"""
+
+import asyncio
+import random
+import statistics
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from types import ModuleType
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path, reverse
+
+from core import synthetic
+from marketplace.models import Category, Item
+
+# Metrics compared against the baseline; queries must not grow at all
+LATENCY_METRICS = ('p50', 'p95', 'p99')
+MEMORY_METRIC = 'alloc_kib'
+QUERY_METRIC = 'queries'
+
+
+@contextmanager
+def benchmark_database(keepdb=False):
+    """Point the default connection at a separate benchmark database for the block."""
+    test_settings = connection.settings_dict.setdefault('TEST', {})
+    test_name = test_settings.get('NAME')
+    if connection.vendor == 'sqlite':
+        # An on-disk file, like production, and one that keepdb can reuse
+        test_settings['NAME'] = str(settings.BASE_DIR / 'benchmark.sqlite3')
+    else:
+        # Never the test runner's test_<NAME>, which autoclobber would drop without asking
+        test_settings['NAME'] = f"benchmark_{connection.settings_dict['NAME']}"
+    old_name = connection.settings_dict['NAME']
+    try:
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False, keepdb=keepdb)
+        try:
+            yield
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+    finally:
+        test_settings['NAME'] = test_name
+
+
+def seed(sellers, items, images_per_item, stdout):
+    """Generate synthetic data up to sellers sellers and items listings, topping up a kept database."""
+    missing_sellers = max(0, sellers - len(synthetic.existing_seller_ids()))
+    missing_items = max(0, items - Item.objects.count())
+    if not missing_sellers and not missing_items:
+        stdout.write(f"Reusing {sellers} seeded sellers and {items} listings.")
+        return
+    stdout.write(f"Seeding {missing_sellers} more sellers and {missing_items} more listings...")
+    if missing_sellers:
+        synthetic.generate(users=missing_sellers, sellers=missing_sellers, items=0)
+    # Listings are spread over every synthetic seller, old and new
+    synthetic.generate(users=0, sellers=0, items=missing_items, images_per_item=images_per_item)
+
+
+def _percentile(timings, percent):
+    return statistics.quantiles(timings, n=100, method='inclusive')[percent - 1] if len(timings) > 1 else timings[0]
+
+
+class Scenario:
+    """A named request generator: request(client, rng) issues one request and returns the response."""
+
+    def __init__(self, name, request, login=False, expected_status=200):
+        self.name = name
+        self.request = request
+        self.login = login
+        self.expected_status = expected_status
+
+
+def build_scenarios(seller):
+    """The hot views, with targets drawn at random from the seeded data."""
+    item_ids = list(Item.objects.filter(is_active=True).values_list('pk', flat=True)[:5000])
+    category_ids = list(Category.objects.values_list('pk', flat=True))
+    seller_names = list(
+        User.objects.filter(profile__is_seller=True, profile__verification_status='verified')
+        .values_list('username', flat=True)[:5000]
+    )
+    own_items = list(Item.objects.filter(seller=seller).values_list('pk', flat=True)[:50])
+    listing = {
+        'title': 'Benchmark skillet', 'description': 'Cast iron, pre-seasoned.',
+        'category': category_ids[0], 'price': '25.00', 'condition': 'good', 'location': 'Springfield',
+    }
+    return [
+        Scenario('browse', lambda client, rng: client.get(reverse('marketplace:list'))),
+        Scenario('browse_category', lambda client, rng: client.get(
+            reverse('marketplace:list'), {'category': rng.choice(category_ids)})),
+        Scenario('detail', lambda client, rng: client.get(
+            reverse('marketplace:detail', args=[rng.choice(item_ids)]))),
+        Scenario('seller_list', lambda client, rng: client.get(reverse('users:seller_list'))),
+        Scenario('storefront', lambda client, rng: client.get(
+            reverse('users:seller_profile', args=[rng.choice(seller_names)]))),
+        Scenario('create', lambda client, rng: client.post(reverse('marketplace:create'), listing),
+                 login=True, expected_status=302),
+        Scenario('edit', lambda client, rng: client.post(
+            reverse('marketplace:edit', args=[rng.choice(own_items)]), listing), login=True, expected_status=302),
+    ]
+
+
+def run_scenario(scenario, client, requests, instrumented_requests, seed=0):
+    """Time a scenario, then measure queries and allocations on a shorter pass."""
+    rng = random.Random(seed)
+    for _ in range(min(10, requests)):
+        # Warm up URL resolution, template loading and the database cache
+        scenario.request(client, rng)
+
+    timings = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = scenario.request(client, rng)
+        timings.append((time.perf_counter() - started) * 1000)
+        if response.status_code != scenario.expected_status:
+            raise AssertionError(f"{scenario.name}: expected {scenario.expected_status}, got {response.status_code}")
+
+    queries, allocated = [], []
+    tracemalloc.start()
+    try:
+        for _ in range(instrumented_requests):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            with CaptureQueriesContext(connection) as captured:
+                scenario.request(client, rng)
+            _, peak = tracemalloc.get_traced_memory()
+            queries.append(len(captured))
+            allocated.append((peak - before) / 1024)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'requests': requests,
+        'mean': statistics.mean(timings),
+        'p50': _percentile(timings, 50),
+        'p95': _percentile(timings, 95),
+        'p99': _percentile(timings, 99),
+        QUERY_METRIC: max(queries) if queries else None,
+        MEMORY_METRIC: statistics.median(allocated) if allocated else None,
+    }
+
+
+def run_scenarios(requests=200, instrumented_requests=20, names=None, seed=0):
+    """Run every scenario (or those in names); returns {name: metrics}."""
+    seller = User.objects.filter(profile__is_seller=True).order_by('pk').first()
+    results = {}
+    for scenario in build_scenarios(seller):
+        if names and scenario.name not in names:
+            continue
+        client = Client()
+        if scenario.login:
+            client.force_login(seller)
+        results[scenario.name] = run_scenario(scenario, client, requests, instrumented_requests, seed)
+    return results
+
+
+def compare(results, baseline, threshold=0.2):
+    """
+    List regressions of results against baseline.
+
+    Latency and memory regress when they grow by more than threshold
+    (a fraction); the query count regresses on any increase. Returns
+    (scenario, metric, baseline value, current value) tuples.
+    """
+    regressions = []
+    for name, metrics in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for metric in (*LATENCY_METRICS, MEMORY_METRIC):
+            if previous.get(metric) and metrics.get(metric) is not None \
+                    and metrics[metric] > previous[metric] * (1 + threshold):
+                regressions.append((name, metric, previous[metric], metrics[metric]))
+        if previous.get(QUERY_METRIC) is not None and metrics.get(QUERY_METRIC) is not None \
+                and metrics[QUERY_METRIC] > previous[QUERY_METRIC]:
+            regressions.append((name, QUERY_METRIC, previous[QUERY_METRIC], metrics[QUERY_METRIC]))
+    return regressions
+
+
+@contextmanager
+def db_latency(seconds):
+    """Sleep this long before every query, on every connection in every thread."""
+    def slow_execute(execute, sql, params, many, context):
+        time.sleep(seconds)
+        return execute(sql, params, many, context)
+
+    def install(sender, connection, **kwargs):
+        connection.execute_wrappers.append(slow_execute)
+
+    for existing in connections.all():
+        install(None, existing)
+    connection_created.connect(install, weak=False)
+    try:
+        yield
+    finally:
+        connection_created.disconnect(install)
+        for existing in connections.all():
+            if slow_execute in existing.execute_wrappers:
+                existing.execute_wrappers.remove(slow_execute)
+
+
+def sync_and_async_urlconf():
+    """
+    A URLconf serving the sync views under sync/ and the async ones under
+    async/, whatever ASYNC_VIEWS says, with the project's URLs alongside
+    for the templates' {% url %} tags.
+    """
+    from marketplace import views as marketplace_views
+    from users import views as users_views
+
+    urlconf = ModuleType('benchmark_urls')
+    urlconf.urlpatterns = [
+        path('sync/items/', marketplace_views.ItemListView.as_view()),
+        path('sync/items/<int:pk>/', marketplace_views.ItemDetailView.as_view()),
+        path('sync/sellers/<str:username>/', users_views.SellerDetailView.as_view()),
+        path('async/items/', marketplace_views.AsyncItemListView.as_view()),
+        path('async/items/<int:pk>/', marketplace_views.AsyncItemDetailView.as_view()),
+        path('async/sellers/<str:username>/', users_views.AsyncSellerDetailView.as_view()),
+        path('', include(settings.ROOT_URLCONF)),
+    ]
+    return urlconf
+
+
+def concurrency_targets():
+    """Request generators for the read-only views: {name: target(rng) -> (path suffix, query string)}."""
+    item_ids = list(Item.objects.filter(is_active=True).values_list('pk', flat=True)[:5000])
+    seller_names = list(
+        User.objects.filter(profile__is_seller=True, profile__verification_status='verified')
+        .values_list('username', flat=True)[:5000]
+    )
+    pages = max(1, min(20, len(item_ids) // 12))
+    return {
+        'browse': lambda rng: ('items/', f'page={rng.randint(1, pages)}'),
+        'detail': lambda rng: (f'items/{rng.choice(item_ids)}/', ''),
+        'storefront': lambda rng: (f'sellers/{rng.choice(seller_names)}/', ''),
+    }
+
+
+async def _asgi_get(application, path, query_string):
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'https', 'path': path, 'raw_path': path.encode(), 'query_string': query_string.encode(),
+        'root_path': '', 'headers': [(b'host', b'testserver')],
+        'client': ('127.0.0.1', 50000), 'server': ('testserver', 443),
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await application(scope, receive, send)
+    return messages[0]['status']
+
+
+async def run_concurrent(application, prefix, target, requests, concurrency, seed=0):
+    """Send requests GETs to application, at most concurrency at a time; returns throughput and latencies."""
+    rng = random.Random(seed)
+    urls = [target(rng) for _ in range(requests)]
+    slots = asyncio.Semaphore(concurrency)
+    timings, statuses = [], Counter()
+
+    async def fetch(suffix, query_string):
+        async with slots:
+            started = time.perf_counter()
+            statuses[await _asgi_get(application, prefix + suffix, query_string)] += 1
+            timings.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(fetch(suffix, query_string) for suffix, query_string in urls))
+    elapsed = time.perf_counter() - started
+    return {
+        'requests': requests,
+        'concurrency': concurrency,
+        'throughput': requests / elapsed,
+        'p50': _percentile(timings, 50),
+        'p95': _percentile(timings, 95),
+        'errors': sum(count for status, count in statuses.items() if status != 200),
+    }
@@ -2,6 +2,8 @@
 Context processors for core app
 """
 
+from . import counters
+
 
 def site_context(request):
     """Add site-wide context variables"""
@@ -9,3 +11,11 @@ def site_context(request):
         'site_name': 'Kitchenware Marketplace',
         'site_version': '1.0',
     }
+
+
+def user_counters(request):
+    """Add cached navbar badge counters for logged-in users"""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+    return {'counters': counters.get_counters(user.pk)}
@@ -0,0 +1,64 @@
+"""
+Per-user badge counters (unread messages, pending transactions...) kept in the cache.
+
+Each counter is registered by the app that owns the data together with a
+loader that computes the exact value from the database. Reads go through
+the cache with a single get_many; the loader only runs on a miss. Writers
+adjust cached values with atomic incr/decr instead of invalidating them,
+and the timeout bounds any drift from races between a miss and a write.
+"""
+
+from django.core.cache import cache
+
+from core import metrics
+
+COUNTER_TIMEOUT = 60 * 60
+
+_loaders = {}
+
+
+def register(name, loader):
+    """Register a counter and the callable loader(user_id) that computes it."""
+    _loaders[name] = loader
+
+
+def _cache_key(name, user_id):
+    return f'counters:{name}:{user_id}'
+
+
+def get_counters(user_id):
+    """Return a dict of every registered counter for a user."""
+    keys = {_cache_key(name, user_id): name for name in _loaders}
+    counters = {keys[key]: value for key, value in cache.get_many(keys).items()}
+
+    missing = {}
+    for name, loader in _loaders.items():
+        if name not in counters:
+            counters[name] = missing[_cache_key(name, user_id)] = loader(user_id)
+    if missing:
+        cache.set_many(missing, COUNTER_TIMEOUT)
+    metrics.record_cache('counters', hits=len(keys) - len(missing), misses=len(missing))
+
+    return counters
+
+
+def increment(name, user_id, delta=1):
+    """Atomically adjust a cached counter; uncached counters are left to their loader."""
+    key = _cache_key(name, user_id)
+    try:
+        value = cache.incr(key, delta)
+    except ValueError:
+        return
+    if value < 0:
+        # Drifted below zero: let the loader recompute it on next read
+        cache.delete(key)
+
+
+def decrement(name, user_id, delta=1):
+    """Atomically decrease a cached counter."""
+    increment(name, user_id, -delta)
+
+
+def invalidate(name, user_id):
+    """Drop a cached counter so the next read recomputes it."""
+    cache.delete(_cache_key(name, user_id))
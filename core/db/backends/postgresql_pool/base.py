@@ -0,0 +1,91 @@
+"""
+PostgreSQL backend that keeps connections in an in-process pool.
+
+Set DB_ENGINE=core.db.backends.postgresql_pool. Sizing comes from the
+database's POOL settings (MAX_SIZE, MIN_SIZE, IDLE_TIMEOUT, TIMEOUT).
+Each request checks a connection out and hands it back when it
+finishes, so a worker with many threads shares a few warm connections
+instead of opening one per request. That needs CONN_MAX_AGE=0: a
+persistent connection is never handed back, so every thread would keep
+one checked out and the rest would time out waiting for the pool.
+"""
+
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.postgresql.base import DatabaseWrapper as PostgreSQLDatabaseWrapper
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+
+from core.db.pool import ConnectionPool, PoolTimeout
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, settings_dict):
+    """Return the process-wide pool for a database alias, creating it on first use."""
+    with _pools_lock:
+        if alias not in _pools:
+            options = settings_dict.get('POOL', {})
+            _pools[alias] = ConnectionPool(
+                max_size=options.get('MAX_SIZE', 10),
+                min_size=options.get('MIN_SIZE', 0),
+                idle_timeout=options.get('IDLE_TIMEOUT', 300),
+                timeout=options.get('TIMEOUT', 10),
+                reset=_reset,
+            )
+        return _pools[alias]
+
+
+def pool_stats():
+    """Return {alias: stats} for every pool opened in this process."""
+    with _pools_lock:
+        pools = dict(_pools)
+    return {alias: pool.stats() for alias, pool in pools.items()}
+
+
+# psycopg2.extensions.TRANSACTION_STATUS_IDLE / psycopg.pq.TransactionStatus.IDLE
+IDLE_STATUS = 0
+
+
+def _reset(conn):
+    """Roll back anything left open; False if the connection is not idle afterwards."""
+    if conn.info.transaction_status != IDLE_STATUS:
+        conn.rollback()
+    return conn.info.transaction_status == IDLE_STATUS
+
+
+class DatabaseWrapper(PostgreSQLDatabaseWrapper):
+    """PostgreSQL wrapper whose connect/close check connections out of and into a pool."""
+
+    pooled = False
+
+    def __init__(self, settings_dict, alias='default'):
+        super().__init__(settings_dict, alias)
+        if settings_dict.get('POOL', {}).get('ENABLED', True) and settings_dict.get('CONN_MAX_AGE'):
+            raise ImproperlyConfigured(
+                f"Database '{alias}' uses the connection pool, which needs CONN_MAX_AGE=0 "
+                f"(set DB_CONN_MAX_AGE=0); persistent connections would never go back to the pool."
+            )
+
+    def get_new_connection(self, conn_params):
+        # POOL['ENABLED'] = False falls back to plain connections (used for benchmarking)
+        self.pooled = self.settings_dict.get('POOL', {}).get('ENABLED', True)
+        if not self.pooled:
+            return super().get_new_connection(conn_params)
+
+        pool = get_pool(self.alias, self.settings_dict)
+        # Normally set by the parent when it opens a connection, which a reused one skips
+        self.isolation_level = IsolationLevel(
+            self.settings_dict['OPTIONS'].get('isolation_level', IsolationLevel.READ_COMMITTED)
+        )
+        try:
+            return pool.acquire(lambda: super(DatabaseWrapper, self).get_new_connection(conn_params))
+        except PoolTimeout as exc:
+            raise self.Database.OperationalError(str(exc)) from exc
+
+    def _close(self):
+        if self.connection is None or not self.pooled:
+            return super()._close()
+        with self.wrap_database_errors:
+            get_pool(self.alias, self.settings_dict).release(self.connection)
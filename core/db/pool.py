@@ -0,0 +1,127 @@
+"""
+A small thread-safe pool of DB-API connections.
+
+Used by the postgresql_pool backend: Django's close() hands the
+connection back here instead of closing it, and the next connect() in
+any thread of the process takes it out again, skipping the TCP and
+authentication handshake. Connections above min_size that sit idle for
+idle_timeout seconds are closed; when max_size connections are checked
+out, acquire() waits up to timeout seconds and then raises PoolTimeout.
+"""
+
+import threading
+import time
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes free within the pool timeout."""
+
+
+class ConnectionPool:
+    """Bounded pool of connections created on demand by a caller-supplied factory."""
+
+    def __init__(self, max_size=10, min_size=0, idle_timeout=300, timeout=10, reset=None):
+        self.max_size = max_size
+        self.min_size = min_size
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        # reset(conn) returns False if a returned connection is not fit for reuse
+        self.reset = reset or (lambda conn: True)
+        self._idle = []  # (connection, returned_at), most recently returned last
+        self._size = 0
+        self._condition = threading.Condition()
+        self._counters = dict(created=0, reused=0, discarded=0, waits=0, timeouts=0, wait_seconds=0.0)
+
+    def acquire(self, factory):
+        """Return an idle connection, or a new one from factory() while under max_size."""
+        deadline = time.monotonic() + self.timeout
+        with self._condition:
+            waited = None
+            while True:
+                self._reap_idle()
+                if self._idle:
+                    conn, _ = self._idle.pop()
+                    self._counters['reused'] += 1
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    conn = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._counters['timeouts'] += 1
+                    raise PoolTimeout(f"No database connection free after {self.timeout}s (pool size {self.max_size}).")
+                if waited is None:
+                    waited = time.monotonic()
+                    self._counters['waits'] += 1
+                self._condition.wait(remaining)
+            if waited is not None:
+                self._counters['wait_seconds'] += time.monotonic() - waited
+
+        if conn is not None:
+            return conn
+        try:
+            conn = factory()
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._counters['created'] += 1
+        return conn
+
+    def release(self, conn):
+        """Return a connection for reuse, or drop it if it is closed or cannot be reset."""
+        try:
+            usable = not getattr(conn, 'closed', False) and self.reset(conn)
+        except Exception:
+            usable = False
+        if not usable:
+            self.discard(conn)
+            return
+        with self._condition:
+            self._idle.append((conn, time.monotonic()))
+            self._condition.notify()
+
+    def discard(self, conn):
+        """Close a connection and free its slot."""
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._condition:
+            self._size -= 1
+            self._counters['discarded'] += 1
+            self._condition.notify()
+
+    def close_all(self):
+        """Close every idle connection (checked-out ones are closed when released)."""
+        with self._condition:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+        for conn, _ in idle:
+            conn.close()
+
+    def stats(self):
+        """Return sizing and counters for monitoring."""
+        with self._condition:
+            return dict(
+                self._counters,
+                size=self._size,
+                idle=len(self._idle),
+                in_use=self._size - len(self._idle),
+                max_size=self.max_size,
+            )
+
+    def _reap_idle(self):
+        # Caller holds the lock; the oldest idle connections are at the front
+        cutoff = time.monotonic() - self.idle_timeout
+        while self._idle and self._size > self.min_size and self._idle[0][1] < cutoff:
+            conn, _ = self._idle.pop(0)
+            self._size -= 1
+            self._counters['discarded'] += 1
+            try:
+                conn.close()
+            except Exception:
+                pass
@@ -0,0 +1,78 @@
+"""
+Primary/replica routing.
+
+Writes always go to 'default'. Reads go to a random alias from
+settings.DATABASE_REPLICAS unless the current context is pinned to the
+primary: inside a transaction on the primary, after this request has
+written anything, during a POST (or other unsafe) request, or for
+REPLICA_STICKY_SECONDS after the same client's last write
+(ReadYourWritesMiddleware keeps that window in a signed cookie). That
+way a user redirected to the item they just created never reads a
+replica that has not caught up yet.
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_pinned = ContextVar('pinned_to_primary', default=False)
+_wrote = ContextVar('wrote_to_primary', default=False)
+
+
+def pinned_to_primary():
+    """Whether reads in this context currently go to the primary."""
+    return _pinned.get() or _wrote.get()
+
+
+def wrote_to_primary():
+    """Whether anything in this context has been routed for writing."""
+    return _wrote.get()
+
+
+@contextmanager
+def routing_context(pinned=False):
+    """Start with fresh pinning/write state, restoring the previous state on exit."""
+    pinned_token, wrote_token = _pinned.set(pinned), _wrote.set(False)
+    try:
+        yield
+    finally:
+        _pinned.reset(pinned_token)
+        _wrote.reset(wrote_token)
+
+
+@contextmanager
+def use_primary():
+    """Read from the primary inside the block, e.g. right before a write that depends on the read."""
+    token = _pinned.set(True)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """Route reads to settings.DATABASE_REPLICAS and writes to the primary."""
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas or pinned_to_primary() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        _wrote.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        aliases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive the schema through replication
+        return db not in settings.DATABASE_REPLICAS
@@ -0,0 +1,175 @@
+"""
+Slow query log.
+
+install() is connected to connection_created, so every database
+connection gets an execute wrapper that times each query. Queries taking
+SLOW_QUERY_THRESHOLD_MS or longer are logged with the view that issued
+them and a fingerprint: the SQL with literals and placeholders replaced
+by ?, so the same query with different arguments groups together. The
+first time a fingerprint is seen its plan is captured with EXPLAIN
+(EXPLAIN QUERY PLAN on SQLite) and logged alongside.
+
+Counts and times are aggregated per fingerprint; every
+SLOW_QUERY_REPORT_INTERVAL seconds the fingerprints with the most total
+time are logged, and db_slow_queries_total is exported in core.metrics.
+At most MAX_FINGERPRINTS fingerprints are tracked and explained; slow
+queries of any further shapes are still logged, but not explained, and
+are counted under fingerprint="other".
+"""
+
+import hashlib
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+
+from core import metrics
+
+logger = logging.getLogger(__name__)
+
+# Cap on distinct fingerprints kept, so ad-hoc SQL cannot grow memory without bound
+MAX_FINGERPRINTS = 500
+
+_lock = threading.Lock()
+_stats = {}
+_local = threading.local()
+_current_request = ContextVar('slow_query_request', default=None)
+_last_report = time.monotonic()
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_RE = re.compile(r'%s|\?')
+_IN_LIST_RE = re.compile(r'\bIN \((?:\?, )*\?\)', re.IGNORECASE)
+_SPACE_RE = re.compile(r'\s+')
+
+
+def normalize(sql):
+    """SQL with literals, placeholders and IN lists collapsed, so variants of a query compare equal."""
+    sql = _STRING_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = _PLACEHOLDER_RE.sub('?', sql)
+    sql = _IN_LIST_RE.sub('IN (...)', sql)
+    return _SPACE_RE.sub(' ', sql).strip()
+
+
+def fingerprint(sql):
+    """Return (short hash, normalized SQL) identifying a query shape."""
+    normalized = normalize(sql)
+    return hashlib.sha1(normalized.encode()).hexdigest()[:12], normalized
+
+
+@contextmanager
+def request_context(request):
+    """Attribute queries run inside the block to request's view."""
+    token = _current_request.set(request)
+    try:
+        yield
+    finally:
+        _current_request.reset(token)
+
+
+def _current_view():
+    request = _current_request.get()
+    if request is None:
+        return '-'
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else request.path
+
+
+def slow_query_stats():
+    """Return {fingerprint: {'sql', 'count', 'total', 'max', 'views', 'plan'}} with times in seconds."""
+    with _lock:
+        return {key: {**values, 'views': dict(values['views'])} for key, values in _stats.items()}
+
+
+def worst_queries(limit=10):
+    """(fingerprint, stats) pairs with the most total time first."""
+    return sorted(slow_query_stats().items(), key=lambda item: item[1]['total'], reverse=True)[:limit]
+
+
+def reset():
+    """Forget everything recorded so far."""
+    with _lock:
+        _stats.clear()
+
+
+def _explain(connection, sql, params):
+    """The query plan as text, or None if it cannot be explained."""
+    if not sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+        # Plans of writes are rarely the problem, and EXPLAIN ANALYZE-style side effects are not worth the risk
+        return None
+    _local.explaining = True
+    try:
+        # A savepoint keeps a failed EXPLAIN from breaking the caller's transaction
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}', params)
+            return '\n'.join(str(row[-1]) for row in cursor.fetchall())
+    except DatabaseError as exc:
+        return f'(EXPLAIN failed: {exc})'
+    finally:
+        _local.explaining = False
+
+
+def _record(connection, sql, params, many, elapsed):
+    key, normalized = fingerprint(sql)
+    view = _current_view()
+    with _lock:
+        stats = _stats.get(key)
+        # Only a fingerprint that was just added is explained, so one past the cap never is
+        first = stats is None and len(_stats) < MAX_FINGERPRINTS
+        if first:
+            stats = _stats[key] = {'sql': normalized, 'count': 0, 'total': 0.0, 'max': 0.0, 'views': {}, 'plan': None}
+        if stats is not None:
+            stats['count'] += 1
+            stats['total'] += elapsed
+            stats['max'] = max(stats['max'], elapsed)
+            stats['views'][view] = stats['views'].get(view, 0) + 1
+    # Untracked fingerprints share one label value, keeping the series count bounded
+    metrics.inc('db_slow_queries_total', fingerprint=key if stats is not None else 'other')
+
+    logger.warning("Slow query %.1f ms in %s [%s] on %s: %s", elapsed * 1000, view, key, connection.alias, normalized)
+    if first and not many:
+        plan = _explain(connection, sql, params)
+        if plan is not None:
+            with _lock:
+                if key in _stats:
+                    _stats[key]['plan'] = plan
+            logger.warning("Plan for [%s]:\n%s", key, plan)
+    _maybe_report()
+
+
+def _maybe_report():
+    global _last_report
+    now = time.monotonic()
+    with _lock:
+        if now - _last_report < settings.SLOW_QUERY_REPORT_INTERVAL:
+            return
+        _last_report = now
+    for key, stats in worst_queries(5):
+        logger.info(
+            "[%s] %d slow, total %.1f ms, max %.1f ms, mostly from %s: %s",
+            key, stats['count'], stats['total'] * 1000, stats['max'] * 1000,
+            max(stats['views'], key=stats['views'].get), stats['sql'],
+        )
+
+
+def _wrapper(execute, sql, params, many, context):
+    if getattr(_local, 'explaining', False):
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    result = execute(sql, params, many, context)
+    elapsed = time.perf_counter() - started
+    if elapsed * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+        _record(context['connection'], sql, params, many, elapsed)
+    return result
+
+
+def install(sender, connection, **kwargs):
+    """connection_created receiver: time every query on the new connection."""
+    if settings.SLOW_QUERY_LOG and _wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_wrapper)
@@ -0,0 +1,38 @@
+"""
+SQLite tuning for production.
+
+With the default rollback journal a writer locks out every reader, so
+concurrent uploads and page views end in "database is locked". When
+DB_SQLITE_TUNED is on (the default when DEBUG is off) each new SQLite
+connection runs the PRAGMAS listed in its database settings:
+
+- journal_mode=WAL: readers keep reading while one writer appends to the log
+- synchronous=NORMAL: fsync at checkpoints rather than every commit; a
+  power cut can lose the last commits but never corrupts the file
+- mmap_size / cache_size: serve hot pages from memory instead of read() calls
+- busy_timeout: wait for the write lock instead of failing straight away
+- temp_store=MEMORY: keep sort and temporary tables off the disk
+
+The optimize_sqlite task runs PRAGMA optimize periodically so the query
+planner's statistics follow the data.
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def apply_pragmas(sender, connection, **kwargs):
+    """connection_created receiver: run the database's PRAGMAS on a new SQLite connection."""
+    pragmas = connection.settings_dict.get('PRAGMAS')
+    if connection.vendor != 'sqlite' or not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+        if 'journal_mode' in pragmas:
+            cursor.execute('PRAGMA journal_mode')
+            mode = cursor.fetchone()[0]
+            # In-memory databases (tests) cannot use WAL and silently keep their mode
+            if mode.lower() != str(pragmas['journal_mode']).lower():
+                logger.debug("%s: journal_mode is %s, not %s", connection.alias, mode, pragmas['journal_mode'])
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.warmup import import_times, project_modules
+
+
+class Command(BaseCommand):
+    help = (
+        "Import the project's app modules in a fresh interpreter under -X importtime and list "
+        "the slowest project modules and the heaviest dependencies they pull in."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=15, help="Rows per table")
+        parser.add_argument('modules', nargs='*', help="Modules to audit (default: every project app module)")
+
+    def handle(self, *args, **options):
+        modules = options['modules'] or project_modules()
+        try:
+            rows = import_times(modules)
+        except RuntimeError as exc:
+            raise CommandError(f"Importing the modules failed: {exc}")
+
+        top_level = [row for row in rows if row[1] == 0]
+        total = sum(cumulative for _, _, _, cumulative in top_level)
+        self.stdout.write(f"{len(rows)} modules imported in {total / 1000:.0f} ms (including Django setup)\n")
+
+        packages = {module.split('.')[0] for module in modules}
+        own = [row for row in rows if row[0].split('.')[0] in packages]
+        self.table("Project modules, by cumulative import time", own, options['limit'])
+        dependencies = [row for row in top_level if row[0].split('.')[0] not in packages]
+        self.table("Top-level dependencies, by cumulative import time", dependencies, options['limit'])
+
+    def table(self, title, rows, limit):
+        self.stdout.write(title)
+        self.stdout.write(f"  {'cumulative ms':>13} {'self ms':>8}  module")
+        for name, _, own, cumulative in sorted(rows, key=lambda row: row[3], reverse=True)[:limit]:
+            self.stdout.write(f"  {cumulative / 1000:13.1f} {own / 1000:8.1f}  {name}")
+        self.stdout.write('')
@@ -0,0 +1,63 @@
+import asyncio
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from core import benchmark
+
+MODES = ('sync', 'async')
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the sync and async browse, detail and storefront views under ASGI with many "
+        "simultaneous requests and an artificial per-query database delay."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sellers', type=int, default=1000, help="Sellers to seed")
+        parser.add_argument('--items', type=int, default=10000, help="Listings to seed")
+        parser.add_argument('--images-per-item', type=float, default=3.0, help="Average image rows per listing")
+        parser.add_argument('--requests', type=int, default=200, help="Requests per view and mode")
+        parser.add_argument('--concurrency', type=int, default=50, help="Requests in flight at once")
+        parser.add_argument('--db-latency-ms', type=float, default=20.0,
+                            help="Delay added to every query, standing in for a slow database")
+        parser.add_argument('--scenario', action='append', dest='scenarios',
+                            help="Only run this view (repeatable): browse, detail, storefront")
+        parser.add_argument('--keepdb', action='store_true',
+                            help="Keep the seeded database for the next run instead of destroying it")
+
+    def handle(self, *args, **options):
+        if settings.DEBUG:
+            self.stderr.write("DEBUG is on: timings include debug overhead and are not representative.")
+
+        with benchmark.benchmark_database(options['keepdb']), \
+                override_settings(DATABASE_REPLICAS=[], ALLOWED_HOSTS=['*'],
+                                  ROOT_URLCONF=benchmark.sync_and_async_urlconf()):
+            benchmark.seed(options['sellers'], options['items'], options['images_per_item'], self.stdout)
+            targets = benchmark.concurrency_targets()
+            application = ASGIHandler()
+            results = {}
+            with benchmark.db_latency(options['db_latency_ms'] / 1000):
+                for name, target in targets.items():
+                    if options['scenarios'] and name not in options['scenarios']:
+                        continue
+                    for mode in MODES:
+                        results[name, mode] = asyncio.run(benchmark.run_concurrent(
+                            application, f'/{mode}/', target, options['requests'], options['concurrency'],
+                        ))
+
+        self.stdout.write(
+            f"{options['concurrency']} concurrent requests, {options['db_latency_ms']:g} ms added per query"
+        )
+        self.stdout.write(f"{'view':12} {'mode':6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+        for (name, mode), metrics in results.items():
+            self.stdout.write(
+                f"{name:12} {mode:6} {metrics['throughput']:8.1f} {metrics['p50']:8.1f} "
+                f"{metrics['p95']:8.1f} {metrics['errors']:7}"
+            )
+            if mode == 'async' and (name, 'sync') in results:
+                speedup = metrics['throughput'] / results[name, 'sync']['throughput']
+                self.stdout.write(f"{'':12} async/sync throughput: {speedup:.2f}x")
@@ -0,0 +1,56 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import Client
+from django.test.utils import override_settings
+
+
+class Command(BaseCommand):
+    help = (
+        "Time requests through the full request cycle with per-request database connections "
+        "and with the configured reuse (CONN_MAX_AGE or the connection pool)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help="Requests per mode")
+        parser.add_argument('--url', default='/marketplace/', help="Path to request")
+
+    def handle(self, *args, **options):
+        settings_dict = connections['default'].settings_dict
+        configured = settings_dict['CONN_MAX_AGE']
+        pooled = settings_dict['ENGINE'].endswith('postgresql_pool')
+        self.stdout.write(f"Engine {settings_dict['ENGINE']}, CONN_MAX_AGE={configured}, {options['requests']} requests to {options['url']}")
+
+        modes = [('new connection per request', 0, False), ('configured reuse', configured, pooled)]
+        for label, max_age, use_pool in modes:
+            timings = self.run_mode(options['url'], options['requests'], max_age, use_pool)
+            self.stdout.write(
+                f"{label:28} mean {statistics.mean(timings):7.2f} ms  "
+                f"p50 {statistics.median(timings):7.2f} ms  "
+                f"p95 {statistics.quantiles(timings, n=20)[-1]:7.2f} ms"
+            )
+
+        if pooled:
+            from core.db.backends.postgresql_pool.base import pool_stats
+            self.stdout.write(f"Pool: {pool_stats().get('default')}")
+
+    def run_mode(self, url, count, max_age, use_pool):
+        connection = connections['default']
+        connection.close()
+        connection.settings_dict['CONN_MAX_AGE'] = max_age
+        connection.settings_dict.setdefault('POOL', {})['ENABLED'] = use_pool
+
+        client = Client()
+        timings = []
+        try:
+            with override_settings(ALLOWED_HOSTS=['*']):
+                client.get(url)  # warm up URL resolution and template caches
+                for _ in range(count):
+                    started = time.perf_counter()
+                    client.get(url)
+                    timings.append((time.perf_counter() - started) * 1000)
+        finally:
+            connection.close()
+        return timings
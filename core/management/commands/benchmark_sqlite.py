@@ -0,0 +1,184 @@
+import multiprocessing
+import random
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+from decimal import Decimal
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections
+
+from marketplace.models import Category, Item
+
+TUNED_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -20000,
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare SQLite throughput with default and tuned pragmas under concurrent "
+        "listing writes and browse reads, each profile on a fresh temporary database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=4, help="Worker processes, like a pre-forking server")
+        parser.add_argument('--threads', type=int, default=2, help="Client threads per process")
+        parser.add_argument('--seconds', type=float, default=5.0, help="Duration of each run")
+        parser.add_argument('--write-ratio', type=float, default=0.2, help="Fraction of operations that create a listing")
+        parser.add_argument('--items', type=int, default=2000, help="Listings seeded before the run")
+
+    def handle(self, *args, **options):
+        directory = tempfile.mkdtemp(prefix='sqlite-benchmark-')
+        try:
+            pragmas = settings.DATABASES['default'].get('PRAGMAS') or TUNED_PRAGMAS
+            results = {}
+            for profile, profile_pragmas in (('default', None), ('tuned', pragmas)):
+                alias = self.prepare(profile, Path(directory) / f'{profile}.sqlite3', profile_pragmas, options['items'])
+                results[profile] = self.run(alias, options)
+                connections[alias].close()
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+        self.stdout.write(
+            f"{options['processes']} processes x {options['threads']} threads, {options['seconds']:g}s, "
+            f"{options['write_ratio']:.0%} writes, {options['items']} seeded listings"
+        )
+        for profile, result in results.items():
+            self.stdout.write(
+                f"{profile:8} {result['ops'] / options['seconds']:8.0f} ops/s  "
+                f"reads {result['reads']:6}  writes {result['writes']:5}  locked {result['errors']:4}  "
+                f"read p95 {result['read_p95']:6.2f} ms  write p95 {result['write_p95']:7.2f} ms"
+            )
+        if results['default']['ops']:
+            self.stdout.write(f"Tuned throughput: {results['tuned']['ops'] / results['default']['ops']:.2f}x default")
+
+    def prepare(self, profile, path, pragmas, item_count):
+        """Register a database alias for the profile, migrate it and seed listings."""
+        alias = f'benchmark_{profile}'
+        connections.settings[alias] = {
+            **connections['default'].settings_dict,
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': str(path),
+            'PRAGMAS': pragmas,
+            'CONN_MAX_AGE': None,
+            'TEST': {'MIRROR': None},
+        }
+        call_command('migrate', database=alias, verbosity=0)
+
+        sellers = [User(username=f'seller{number}') for number in range(20)]
+        for seller in sellers:
+            seller.set_unusable_password()
+        User.objects.using(alias).bulk_create(sellers)
+        sellers = list(User.objects.using(alias).values_list('pk', flat=True))
+        categories = list(Category.objects.using(alias).values_list('pk', flat=True))
+        rng = random.Random(0)
+        Item.objects.using(alias).bulk_create(
+            [self.listing(rng, sellers, categories) for _ in range(item_count)], batch_size=500,
+        )
+        return alias
+
+    @staticmethod
+    def listing(rng, sellers, categories):
+        return Item(
+            seller_id=rng.choice(sellers),
+            category_id=rng.choice(categories),
+            title=f'Cast iron pan {rng.randrange(10**6)}',
+            description='Pre-seasoned, lightly used. ' * 4,
+            price=Decimal(rng.randrange(500, 20000)) / 100,
+            condition='good',
+            location='Springfield',
+        )
+
+    def run(self, alias, options):
+        """Run the mixed workload from several processes; returns totals and latency percentiles."""
+        sellers = list(User.objects.using(alias).values_list('pk', flat=True))
+        categories = list(Category.objects.using(alias).values_list('pk', flat=True))
+        max_pk = Item.objects.using(alias).order_by('-pk').values_list('pk', flat=True).first()
+        workload = (alias, sellers, categories, max_pk, options['write_ratio'], time.time() + options['seconds'])
+        # Children must not share the parent's SQLite connections
+        connections.close_all()
+        with multiprocessing.get_context('fork').Pool(options['processes']) as pool:
+            outcomes = pool.starmap(
+                _run_clients,
+                [(workload, options['threads'], process) for process in range(options['processes'])],
+            )
+
+        reads = [timing for outcome in outcomes for timing in outcome['reads']]
+        writes = [timing for outcome in outcomes for timing in outcome['writes']]
+
+        def p95(timings):
+            return statistics.quantiles(timings, n=20)[-1] * 1000 if len(timings) > 1 else 0.0
+
+        return {
+            'ops': len(reads) + len(writes),
+            'reads': len(reads),
+            'writes': len(writes),
+            'errors': sum(outcome['errors'] for outcome in outcomes),
+            'read_p95': p95(reads),
+            'write_p95': p95(writes),
+        }
+
+
+def _run_clients(workload, thread_count, process):
+    """Run thread_count clients in this worker process until the deadline."""
+    lock = threading.Lock()
+    totals = {'reads': [], 'writes': [], 'errors': 0}
+
+    def client(seed):
+        outcome = _client(workload, seed)
+        with lock:
+            totals['reads'] += outcome['reads']
+            totals['writes'] += outcome['writes']
+            totals['errors'] += outcome['errors']
+
+    threads = [
+        threading.Thread(target=client, args=(process * thread_count + number,))
+        for number in range(thread_count)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return totals
+
+
+def _client(workload, seed):
+    """One client: create listings or browse them until the deadline, timing each operation."""
+    alias, sellers, categories, max_pk, write_ratio, deadline = workload
+    rng = random.Random(seed)
+    items = Item.objects.using(alias)
+    reads, writes, errors = [], [], 0
+    try:
+        while time.time() < deadline:
+            started = time.perf_counter()
+            try:
+                if rng.random() < write_ratio:
+                    Command.listing(rng, sellers, categories).save(using=alias)
+                    writes.append(time.perf_counter() - started)
+                    continue
+                if rng.random() < 0.5:
+                    # Browse page: latest active listings in a category
+                    list(
+                        items.filter(is_active=True, category_id=rng.choice(categories))
+                        .select_related('seller', 'category')[:20]
+                    )
+                else:
+                    items.select_related('seller', 'category').filter(pk=rng.randint(1, max_pk)).first()
+                reads.append(time.perf_counter() - started)
+            except OperationalError:
+                errors += 1
+    finally:
+        connections[alias].close()
+    return {'reads': reads, 'writes': writes, 'errors': errors}
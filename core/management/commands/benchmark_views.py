@@ -0,0 +1,86 @@
+import json
+import platform
+import sys
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from core import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a separate benchmark database at production-like scale and time the hot views "
+        "(latency percentiles, queries and memory per request). Optionally compare with a baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sellers', type=int, default=10000, help="Sellers to seed")
+        parser.add_argument('--items', type=int, default=100000, help="Listings to seed")
+        parser.add_argument('--images-per-item', type=float, default=3.0, help="Average image rows per listing")
+        parser.add_argument('--requests', type=int, default=200, help="Timed requests per view")
+        parser.add_argument('--instrumented-requests', type=int, default=20,
+                            help="Requests per view measured for queries and memory")
+        parser.add_argument('--scenario', action='append', dest='scenarios',
+                            help="Only run this view (repeatable): browse, browse_category, detail, "
+                                 "seller_list, storefront, create, edit")
+        parser.add_argument('--keepdb', action='store_true',
+                            help="Keep the seeded database for the next run instead of destroying it")
+        parser.add_argument('--output', help="Write results to this JSON file")
+        parser.add_argument('--compare', metavar='BASELINE', help="Flag regressions against this results file")
+        parser.add_argument('--threshold', type=float, default=0.2,
+                            help="Allowed latency/memory growth over the baseline (0.2 = 20%%)")
+
+    def handle(self, *args, **options):
+        if settings.DEBUG:
+            self.stderr.write("DEBUG is on: timings include debug overhead and are not representative.")
+
+        # Everything reads and writes the benchmark database, never a replica
+        with benchmark.benchmark_database(options['keepdb']), \
+                override_settings(DATABASE_REPLICAS=[], ALLOWED_HOSTS=['*']):
+            benchmark.seed(options['sellers'], options['items'], options['images_per_item'], self.stdout)
+            results = benchmark.run_scenarios(
+                requests=options['requests'],
+                instrumented_requests=options['instrumented_requests'],
+                names=options['scenarios'],
+            )
+
+        self.report(results)
+        report = {
+            'created_at': timezone.now().isoformat(),
+            'environment': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'debug': settings.DEBUG,
+                'argv': sys.argv[1:],
+            },
+            'scale': {key: options[key] for key in ('sellers', 'items', 'images_per_item')},
+            'results': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if options['compare']:
+            with open(options['compare']) as handle:
+                baseline = json.load(handle)
+            regressions = benchmark.compare(results, baseline['results'], options['threshold'])
+            for name, metric, previous, current in regressions:
+                self.stderr.write(f"REGRESSION {name} {metric}: {previous:.2f} -> {current:.2f}")
+            if regressions:
+                raise CommandError(f"{len(regressions)} regression(s) against {options['compare']}.")
+            self.stdout.write(self.style.SUCCESS(f"No regressions against {options['compare']}."))
+
+    def report(self, results):
+        self.stdout.write(f"{'view':16} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8} {'alloc KiB':>10}")
+        for name, metrics in results.items():
+            self.stdout.write(
+                f"{name:16} {metrics['p50']:8.2f} {metrics['p95']:8.2f} {metrics['p99']:8.2f} "
+                f"{metrics['queries']:8} {metrics['alloc_kib']:10.1f}"
+            )
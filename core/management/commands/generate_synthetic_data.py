@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import synthetic
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate deterministic synthetic users, sellers, listings and image rows at scale. "
+        f"Accounts are named {synthetic.USERNAME_PREFIX}<n> and share the password '{synthetic.PASSWORD}'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000, help="Accounts to create")
+        parser.add_argument('--sellers', type=int, default=2000, help="How many of the accounts sell")
+        parser.add_argument('--items', type=int, default=100000, help="Listings to create")
+        parser.add_argument('--images-per-item', type=float, default=3.0, help="Average image rows per listing")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed; the same seed gives the same data")
+        parser.add_argument('--alpha', type=float, default=1.1,
+                            help="Power-law exponent of catalogue sizes (higher = a few big shops)")
+        parser.add_argument('--batch-size', type=int, default=5000, help="Rows per bulk insert")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+
+        def progress(done, total):
+            self.stdout.write(f"  {done}/{total} listings ({time.perf_counter() - started:.0f}s)")
+
+        try:
+            counts = synthetic.generate(
+                users=options['users'],
+                sellers=options['sellers'],
+                items=options['items'],
+                images_per_item=options['images_per_item'],
+                seed=options['seed'],
+                alpha=options['alpha'],
+                batch_size=options['batch_size'],
+                progress=progress,
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {counts['users']} users ({counts['sellers']} sellers), {counts['items']} listings "
+            f"and {counts['images']} images in {time.perf_counter() - started:.1f}s."
+        ))
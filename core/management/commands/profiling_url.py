@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.profiling import PROFILE_PARAM, profile_token
+
+
+class Command(BaseCommand):
+    help = "Print a signed link that profiles one request to PATH with cProfile."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Request path, e.g. /marketplace/")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        self.stdout.write(f"{path}?{PROFILE_PARAM}={profile_token(path)}")
+        self.stderr.write(
+            f"Valid for {settings.REQUEST_PROFILING_TOKEN_MAX_AGE}s; "
+            f"stats are written under {settings.REQUEST_PROFILING_DIR}."
+        )
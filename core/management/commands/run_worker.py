@@ -0,0 +1,77 @@
+import os
+import signal
+import socket
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+
+from core import tasks
+
+# Seconds between checks for stale locks and due periodic tasks
+SCHEDULER_INTERVAL = 15
+
+
+class Command(BaseCommand):
+    help = "Run background task workers until interrupted (or, with --once, until the queue is drained)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=1, help="Number of concurrent worker threads")
+        parser.add_argument('--poll-interval', type=float, default=1.0, help="Seconds an idle worker waits before polling again")
+        parser.add_argument('--once', action='store_true', help="Exit once no task is due instead of polling")
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+        if not options['once']:
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(signum, lambda *_: stop.set())
+
+        self.maintain()
+        prefix = f'{socket.gethostname()}:{os.getpid()}'
+        threads = [
+            threading.Thread(
+                target=self.work,
+                args=(f'{prefix}:{number}', stop, options['poll_interval'], options['once']),
+                daemon=True,
+            )
+            for number in range(options['workers'])
+        ]
+        for thread in threads:
+            thread.start()
+        self.stdout.write(f"Started {len(threads)} worker(s).")
+
+        last_maintenance = time.monotonic()
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(timeout=1)
+            if not options['once'] and time.monotonic() - last_maintenance >= SCHEDULER_INTERVAL:
+                self.maintain()
+                last_maintenance = time.monotonic()
+        connection.close()
+        self.stdout.write(self.style.SUCCESS("Workers stopped."))
+
+    def maintain(self):
+        """Recover tasks from dead workers and queue due periodic tasks."""
+        requeued = tasks.requeue_stale()
+        if requeued:
+            self.stderr.write(f"Requeued {requeued} stale task(s).")
+        tasks.schedule_periodic()
+
+    def work(self, worker_id, stop, poll_interval, once):
+        """Run tasks one at a time until stopped; each thread uses its own connection."""
+        try:
+            while not stop.is_set():
+                try:
+                    ran = tasks.run_next(worker_id)
+                except OperationalError as exc:
+                    # Database busy (SQLite write lock): back off and poll again
+                    self.stderr.write(f"{worker_id}: {exc}")
+                    stop.wait(poll_interval)
+                    continue
+                if not ran:
+                    if once:
+                        break
+                    stop.wait(poll_interval)
+        finally:
+            connection.close()
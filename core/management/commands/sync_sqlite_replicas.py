@@ -0,0 +1,33 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the SQLite primary database into each configured replica file. "
+        "For trying replica routing locally; real replicas are kept up to date by the database server."
+    )
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError("No replicas configured (set DB_REPLICAS).")
+        primary = connections['default']
+        if primary.vendor != 'sqlite':
+            raise CommandError("Only SQLite replicas can be synced by this command.")
+
+        source = sqlite3.connect(primary.settings_dict['NAME'])
+        try:
+            for alias in settings.DATABASE_REPLICAS:
+                connections[alias].close()
+                target = sqlite3.connect(connections[alias].settings_dict['NAME'])
+                try:
+                    # The backup API copies a consistent snapshot even while the primary is in use
+                    source.backup(target)
+                finally:
+                    target.close()
+                self.stdout.write(f"Copied primary to {alias} ({connections[alias].settings_dict['NAME']}).")
+        finally:
+            source.close()
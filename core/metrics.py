@@ -0,0 +1,212 @@
+"""
+Request metrics in the Prometheus text format.
+
+MetricsMiddleware records, per resolved URL name, a latency histogram,
+response counts by status code and database query counts and time, plus
+the number of requests in flight. core.counters reports cache hits and
+misses, and the compression middleware's byte totals are included.
+
+Each process keeps its metrics in memory. With METRICS_DIR set, every
+process also writes a snapshot to METRICS_DIR/<pid>.json at most once
+per METRICS_FLUSH_INTERVAL seconds, and the /metrics/ endpoint adds up
+the snapshots of all processes, so any worker answers for the whole
+server. Gauges such as requests in flight are only reported for the
+process answering the scrape: a snapshot is up to a flush interval old,
+which is fine for counters but not for a value that moves up and down
+with every request. Snapshots of processes that have exited keep
+counting for METRICS_RETENTION_SECONDS and are then deleted (Prometheus
+treats the drop as a counter reset).
+"""
+
+import json
+import os
+import threading
+import time
+
+from django.conf import settings
+
+# Upper bounds in seconds, as in the Prometheus client defaults
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HELP = {
+    'http_request_duration_seconds': ('histogram', "Time to produce a response, by URL name"),
+    'http_responses_total': ('counter', "Responses by URL name and status code"),
+    'http_requests_in_flight': ('gauge', "Requests this process is currently handling"),
+    'db_queries_total': ('counter', "Database queries, by URL name"),
+    'db_query_seconds_total': ('counter', "Time spent in database queries, by URL name"),
+    'db_slow_queries_total': ('counter', "Queries over SLOW_QUERY_THRESHOLD_MS, by SQL fingerprint"),
+    'cache_requests_total': ('counter', "Cache lookups by cache and result (hit or miss)"),
+    'compression_bytes_in_total': ('counter', "Response bytes before compression, by encoding"),
+    'compression_bytes_out_total': ('counter', "Response bytes after compression, by encoding"),
+}
+
+_lock = threading.Lock()
+_counters = {}
+_gauges = {}
+_histograms = {}
+_last_flush = 0.0
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def inc(name, value=1, **labels):
+    """Add value to a counter."""
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def gauge_add(name, value, **labels):
+    """Move a gauge up or down by value."""
+    key = _key(name, labels)
+    with _lock:
+        _gauges[key] = _gauges.get(key, 0) + value
+
+
+def observe(name, value, **labels):
+    """Record value in a latency histogram."""
+    key = _key(name, labels)
+    with _lock:
+        # Per-bucket (non-cumulative) counts, then sum and count
+        histogram = _histograms.setdefault(key, [0] * (len(LATENCY_BUCKETS) + 3))
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                histogram[index] += 1
+                break
+        else:
+            histogram[len(LATENCY_BUCKETS)] += 1
+        histogram[-2] += value
+        histogram[-1] += 1
+
+
+def record_cache(cache_name, hits, misses):
+    """Count cache lookups; called by code that reads through the cache."""
+    if hits:
+        inc('cache_requests_total', hits, cache=cache_name, result='hit')
+    if misses:
+        inc('cache_requests_total', misses, cache=cache_name, result='miss')
+
+
+def snapshot():
+    """This process's metrics as a JSON-serialisable dict."""
+    from core.middleware import compression_stats
+
+    with _lock:
+        data = {
+            'pid': os.getpid(),
+            'counters': [[name, list(labels), value] for (name, labels), value in _counters.items()],
+            'gauges': [[name, list(labels), value] for (name, labels), value in _gauges.items()],
+            'histograms': [[name, list(labels), list(values)] for (name, labels), values in _histograms.items()],
+        }
+    for encoding, totals in compression_stats().items():
+        data['counters'].append(['compression_bytes_in_total', [['encoding', encoding]], totals['bytes_in']])
+        data['counters'].append(['compression_bytes_out_total', [['encoding', encoding]], totals['bytes_out']])
+    return data
+
+
+def flush(force=False):
+    """Write this process's snapshot to METRICS_DIR (at most once per METRICS_FLUSH_INTERVAL)."""
+    global _last_flush
+    if not settings.METRICS_DIR:
+        return
+    now = time.monotonic()
+    with _lock:
+        if not force and now - _last_flush < settings.METRICS_FLUSH_INTERVAL:
+            return
+        _last_flush = now
+    os.makedirs(settings.METRICS_DIR, exist_ok=True)
+    path = os.path.join(settings.METRICS_DIR, f'{os.getpid()}.json')
+    temporary = f'{path}.{threading.get_ident()}.tmp'
+    with open(temporary, 'w') as handle:
+        json.dump(snapshot(), handle)
+    # Readers see either the old or the new snapshot, never a partial one
+    os.replace(temporary, path)
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _read_snapshots(directory):
+    """Snapshots of the other processes in directory, deleting those of long-exited ones."""
+    snapshots = []
+    for filename in os.listdir(directory):
+        if not filename.endswith('.json') or filename == f'{os.getpid()}.json':
+            continue
+        path = os.path.join(directory, filename)
+        try:
+            with open(path) as handle:
+                data = json.load(handle)
+            if not _alive(data['pid']) and time.time() - os.path.getmtime(path) > settings.METRICS_RETENTION_SECONDS:
+                os.remove(path)
+                continue
+        except (OSError, ValueError):
+            continue
+        snapshots.append(data)
+    return snapshots
+
+
+def collect():
+    """Merge the snapshots of every process (or just this one without METRICS_DIR)."""
+    snapshots = [snapshot()]
+    if settings.METRICS_DIR and os.path.isdir(settings.METRICS_DIR):
+        snapshots += _read_snapshots(settings.METRICS_DIR)
+
+    counters, histograms = {}, {}
+    gauges = {(name, tuple(map(tuple, labels))): value for name, labels, value in snapshots[0]['gauges']}
+    for data in snapshots:
+        for name, labels, value in data['counters']:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, values in data['histograms']:
+            key = (name, tuple(map(tuple, labels)))
+            merged = histograms.setdefault(key, [0] * len(values))
+            for index, value in enumerate(values):
+                merged[index] += value
+    return counters, gauges, histograms
+
+
+def _labels(labels, **extra):
+    pairs = [*labels, *extra.items()]
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def render():
+    """All metrics in the Prometheus text exposition format."""
+    counters, gauges, histograms = collect()
+    series = {}
+    for (name, labels), value in sorted(counters.items()) + sorted(gauges.items()):
+        series.setdefault(name, []).append(f'{name}{_labels(labels)} {value:g}')
+    for (name, labels), values in sorted(histograms.items()):
+        lines = series.setdefault(name, [])
+        cumulative = 0
+        for bound, count in zip((*LATENCY_BUCKETS, '+Inf'), values):
+            cumulative += count
+            lines.append(f'{name}_bucket{_labels(labels, le=bound)} {cumulative}')
+        lines.append(f'{name}_sum{_labels(labels)} {values[-2]:g}')
+        lines.append(f'{name}_count{_labels(labels)} {values[-1]}')
+
+    output = []
+    for name, lines in series.items():
+        metric_type, description = HELP.get(name, ('untyped', name))
+        output += [f'# HELP {name} {description}', f'# TYPE {name} {metric_type}', *lines]
+    return '\n'.join(output) + '\n'
+
+
+def reset():
+    """Forget this process's metrics."""
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+        _histograms.clear()
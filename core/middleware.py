@@ -0,0 +1,520 @@
+"""
+Core middleware.
+"""
+
+import cProfile
+import gzip
+import logging
+import mimetypes
+import os
+import random
+import re
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from core import metrics, profiling, template_profiling
+from core.db import slow_queries
+from core.db.routers import routing_context, wrote_to_primary
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Hashed names written by ManifestStaticFilesStorage, e.g. main.3f2a9c81d0e4.css
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{12}\.[^/]+$')
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Unhashed names can change in place, so clients must check back
+REVALIDATE_CACHE_CONTROL = 'public, max-age=60, must-revalidate'
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+
+class SyncAsyncMiddleware:
+    """
+    Base for middleware that runs natively in both WSGI and ASGI stacks.
+
+    When the rest of the stack is async, Django hands over a coroutine
+    function as get_response; the instance then marks itself as one too
+    and __call__ returns ahandle(request). Otherwise handle(request) runs.
+    A middleware Django has to adapt to sync puts every request, async
+    views included, on a thread, so everything in the stack has to be
+    async capable for those views to free it.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.ahandle(request)
+        return self.handle(request)
+
+    def handle(self, request):
+        raise NotImplementedError
+
+    async def ahandle(self, request):
+        raise NotImplementedError
+
+
+class StaticFilesMiddleware(SyncAsyncMiddleware):
+    """
+    Serve collected static files from STATIC_ROOT without a separate web server.
+
+    The directory is indexed once per process, so a request costs a dict
+    lookup rather than filesystem calls. Hashed files get far-future
+    immutable caching, and the precompressed .br/.gz variant written by
+    collectstatic is sent when the client accepts it. Enabled by
+    SERVE_STATIC (on by default when DEBUG is off).
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.enabled = settings.SERVE_STATIC and bool(settings.STATIC_ROOT)
+        self.prefix = settings.STATIC_URL if settings.STATIC_URL.startswith('/') else '/' + settings.STATIC_URL
+        self.files = self._index(str(settings.STATIC_ROOT)) if self.enabled else {}
+
+    def handle(self, request):
+        entry = self._lookup(request)
+        return self._serve(request, entry) if entry else self.get_response(request)
+
+    async def ahandle(self, request):
+        entry = self._lookup(request)
+        return self._serve(request, entry) if entry else await self.get_response(request)
+
+    def _lookup(self, request):
+        """The index entry of the static file request asks for, or None."""
+        if self.enabled and request.method in ('GET', 'HEAD') and request.path_info.startswith(self.prefix):
+            return self.files.get(request.path_info[len(self.prefix):])
+        return None
+
+    @staticmethod
+    def _index(root):
+        """Map each servable file's URL path to its metadata and compressed variants."""
+        files = {}
+        variant_suffixes = tuple(suffix for _, suffix in ENCODINGS)
+        for directory, _, names in os.walk(root):
+            for name in names:
+                if name.endswith(variant_suffixes) and name[:-3] in names:
+                    continue
+                path = os.path.join(directory, name)
+                url_path = os.path.relpath(path, root).replace(os.sep, '/')
+                content_type, _ = mimetypes.guess_type(name)
+                stat = os.stat(path)
+                files[url_path] = {
+                    'path': path,
+                    'content_type': content_type or 'application/octet-stream',
+                    'mtime': stat.st_mtime,
+                    'immutable': bool(HASHED_NAME_RE.search(name)),
+                    'variants': [
+                        (encoding, path + suffix)
+                        for encoding, suffix in ENCODINGS
+                        if name + suffix in names
+                    ],
+                }
+        return files
+
+    def _serve(self, request, entry):
+        if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), entry['mtime']):
+            # A 304 must carry the caching headers the full response would have
+            return self._cache_headers(HttpResponseNotModified(), entry)
+
+        variants = dict(entry['variants'])
+        encoding = negotiate_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''), variants)
+        path = variants[encoding] if encoding else entry['path']
+
+        response = FileResponse(open(path, 'rb'), content_type=entry['content_type'])
+        del response['Content-Disposition']
+        if encoding:
+            response['Content-Encoding'] = encoding
+        return self._cache_headers(response, entry)
+
+    @staticmethod
+    def _cache_headers(response, entry):
+        if entry['variants']:
+            response['Vary'] = 'Accept-Encoding'
+        response['Last-Modified'] = http_date(entry['mtime'])
+        response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL if entry['immutable'] else REVALIDATE_CACHE_CONTROL
+        return response
+
+
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/json', 'application/javascript', 'application/xml', 'image/svg+xml',
+)
+GZIP_LEVEL = 6
+# Quality 11 is for build-time assets; mid qualities compress HTML better than gzip at similar CPU cost
+BROTLI_QUALITY = 5
+
+_stats_lock = threading.Lock()
+_stats = {}
+
+
+def compression_stats():
+    """Per-encoding totals for this process: responses, bytes in/out and CPU seconds."""
+    with _stats_lock:
+        return {encoding: dict(values) for encoding, values in _stats.items()}
+
+
+def _record(encoding, bytes_in, bytes_out, cpu_seconds):
+    with _stats_lock:
+        totals = _stats.setdefault(encoding, {'responses': 0, 'bytes_in': 0, 'bytes_out': 0, 'cpu_seconds': 0.0})
+        totals['responses'] += 1
+        totals['bytes_in'] += bytes_in
+        totals['bytes_out'] += bytes_out
+        totals['cpu_seconds'] += cpu_seconds
+    logger.debug(
+        "%s: %d -> %d bytes (%.0f%% saved) in %.2f ms CPU",
+        encoding, bytes_in, bytes_out, 100 - 100 * bytes_out / bytes_in if bytes_in else 0, cpu_seconds * 1000,
+    )
+
+
+def negotiate_encoding(accept_encoding, available=None):
+    """
+    Pick 'br' or 'gzip' from an Accept-Encoding header, honouring q=0; None
+    if neither. available limits the choice (precompressed static variants,
+    say); by default it is whatever this process can compress with.
+    """
+    accepted = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    if available is None:
+        available = ('br', 'gzip') if brotli is not None else ('gzip',)
+    for coding in ('br', 'gzip'):
+        if coding not in available:
+            continue
+        quality = accepted[coding] if coding in accepted else accepted.get('*', 0.0)
+        if quality > 0:
+            return coding
+    return None
+
+
+def _compressor(encoding):
+    """Return (compress(chunk), flush(), finish()) callables for streaming."""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        return compressor.process, compressor.flush, compressor.finish
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+
+
+def _compress(encoding, content):
+    if encoding == 'br':
+        return brotli.compress(content, quality=BROTLI_QUALITY)
+    return gzip.compress(content, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _issued_csrf_token(request):
+    """
+    Whether get_token() ran during this request, i.e. the body may hold a
+    CSRF token. CsrfViewMiddleware resets CSRF_COOKIE_NEEDS_UPDATE to False
+    once it has set the cookie, before this middleware sees the response,
+    but only get_token() and rotate_token() ever add the key.
+    """
+    return 'CSRF_COOKIE_NEEDS_UPDATE' in request.META
+
+
+class CompressionMiddleware(SyncAsyncMiddleware):
+    """
+    Compress dynamic text responses with brotli (if installed) or gzip.
+
+    Buffered responses under COMPRESSION_MIN_SIZE bytes are left alone;
+    streaming responses are compressed chunk by chunk, each chunk flushed
+    so the client still receives data as it is produced. To avoid BREACH,
+    responses that rendered a CSRF token (any page with a POST form) are
+    not compressed. Bytes saved and CPU time are totalled per encoding in
+    compression_stats() and logged at DEBUG level.
+    """
+
+    def handle(self, request):
+        return self._process(request, self.get_response(request))
+
+    async def ahandle(self, request):
+        return self._process(request, await self.get_response(request))
+
+    def _process(self, request, response):
+        if not self._should_compress(request, response):
+            return response
+
+        # The body varies by Accept-Encoding, even when this client gets it uncompressed
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = negotiate_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            stream = self._astream if response.is_async else self._stream
+            response.streaming_content = stream(encoding, response.streaming_content)
+            del response['Content-Length']
+        else:
+            content = response.content
+            started = time.thread_time()
+            compressed = _compress(encoding, content)
+            cpu_seconds = time.thread_time() - started
+            if len(compressed) >= len(content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+            _record(encoding, len(content), len(compressed), cpu_seconds)
+
+        response['Content-Encoding'] = encoding
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            # The compressed body is no longer byte-identical to what a strong ETag promised
+            response['ETag'] = 'W/' + etag
+        return response
+
+    def _should_compress(self, request, response):
+        if response.status_code != 200 or response.has_header('Content-Encoding'):
+            return False
+        if not response.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES):
+            return False
+        if _issued_csrf_token(request) and not settings.COMPRESS_CSRF_RESPONSES:
+            return False
+        if not response.streaming and len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return False
+        return True
+
+    def _stream(self, encoding, chunks):
+        compress, flush, finish = _compressor(encoding)
+        bytes_in = bytes_out = 0
+        cpu_seconds = 0.0
+        for chunk in chunks:
+            started = time.thread_time()
+            data = compress(chunk) + flush()
+            cpu_seconds += time.thread_time() - started
+            bytes_in += len(chunk)
+            bytes_out += len(data)
+            if data:
+                yield data
+        started = time.thread_time()
+        tail = finish()
+        cpu_seconds += time.thread_time() - started
+        bytes_out += len(tail)
+        _record(encoding, bytes_in, bytes_out, cpu_seconds)
+        yield tail
+
+    async def _astream(self, encoding, chunks):
+        """_stream() for async iterators, which ASGI servers consume without a thread."""
+        compress, flush, finish = _compressor(encoding)
+        bytes_in = bytes_out = 0
+        cpu_seconds = 0.0
+        async for chunk in chunks:
+            started = time.thread_time()
+            data = compress(chunk) + flush()
+            cpu_seconds += time.thread_time() - started
+            bytes_in += len(chunk)
+            bytes_out += len(data)
+            if data:
+                yield data
+        started = time.thread_time()
+        tail = finish()
+        cpu_seconds += time.thread_time() - started
+        bytes_out += len(tail)
+        _record(encoding, bytes_in, bytes_out, cpu_seconds)
+        yield tail
+
+
+PRIMARY_PIN_COOKIE = 'primary_pin'
+PRIMARY_PIN_SALT = 'core.middleware.ReadYourWritesMiddleware'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+
+class ReadYourWritesMiddleware(SyncAsyncMiddleware):
+    """
+    Keep a client on the primary database for a while after it writes.
+
+    Unsafe requests, and any request that routed a write, set a signed
+    cookie valid for REPLICA_STICKY_SECONDS; while it is valid, the
+    client's reads skip the replicas. A cookie rather than the session,
+    because loading the session is itself a read that could hit a stale
+    replica (right after logging in, for instance). Does nothing when
+    DATABASE_REPLICAS is empty.
+    """
+
+    def handle(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        with routing_context(pinned=self._pinned(request)):
+            response = self.get_response(request)
+            wrote = wrote_to_primary()
+        return self._pin(request, response, wrote)
+
+    async def ahandle(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return await self.get_response(request)
+        # Writes routed in sync_to_async threads are copied back into this context
+        with routing_context(pinned=self._pinned(request)):
+            response = await self.get_response(request)
+            wrote = wrote_to_primary()
+        return self._pin(request, response, wrote)
+
+    @staticmethod
+    def _pinned(request):
+        return request.method not in SAFE_METHODS or request.get_signed_cookie(
+            PRIMARY_PIN_COOKIE, default=None, salt=PRIMARY_PIN_SALT, max_age=settings.REPLICA_STICKY_SECONDS,
+        ) is not None
+
+    @staticmethod
+    def _pin(request, response, wrote):
+        if wrote or request.method not in SAFE_METHODS:
+            response.set_signed_cookie(
+                PRIMARY_PIN_COOKIE, '1', salt=PRIMARY_PIN_SALT, max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True, samesite='Lax', secure=request.is_secure(),
+            )
+        return response
+
+
+class ProfilingMiddleware(SyncAsyncMiddleware):
+    """
+    Server-Timing headers and sampled cProfile runs (see core.profiling).
+
+    Place it first so the total covers every other middleware. When
+    REQUEST_PROFILING is off, only requests carrying a valid signed
+    ?_profile= token are measured. Under ASGI, cProfile sees the event
+    loop thread: the async code of other requests interleaved with this
+    one is in the profile, and sync code run in sync_to_async threads
+    is not.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        if settings.REQUEST_PROFILING:
+            template_profiling.install()
+
+    def handle(self, request):
+        forced = self._forced(request)
+        if not settings.REQUEST_PROFILING and not forced:
+            return self.get_response(request)
+        with self._measure(request, forced) as measurement:
+            measurement.response = self.get_response(request)
+        return measurement.response
+
+    async def ahandle(self, request):
+        forced = self._forced(request)
+        if not settings.REQUEST_PROFILING and not forced:
+            return await self.get_response(request)
+        with self._measure(request, forced) as measurement:
+            measurement.response = await self.get_response(request)
+        return measurement.response
+
+    @staticmethod
+    def _forced(request):
+        return profiling.PROFILE_PARAM in request.GET and profiling.valid_token(
+            request.path, request.GET[profiling.PROFILE_PARAM],
+        )
+
+    @contextmanager
+    def _measure(self, request, forced):
+        """Time the block, which stores its response on the yielded object, and add Server-Timing to it."""
+        # A forced request times its templates only while it runs
+        if forced:
+            template_profiling.acquire()
+        try:
+            sampled = forced or random.random() < settings.REQUEST_PROFILING_SAMPLE_RATE
+            profiler = cProfile.Profile() if sampled and profiling.profiler_lock.acquire(blocking=False) else None
+            template_profiling.start_request()
+            measurement = SimpleNamespace(response=None)
+            started = time.perf_counter()
+            with profiling.track_queries(profiling.QueryTimer()) as timer:
+                try:
+                    if profiler:
+                        profiler.enable()
+                    yield measurement
+                finally:
+                    if profiler:
+                        profiler.disable()
+                        profiling.profiler_lock.release()
+            total = time.perf_counter() - started
+
+            metrics = [
+                f'db;dur={timer.seconds * 1000:.1f};desc="{timer.count} queries"',
+                f'tpl;dur={template_profiling.request_time() * 1000:.1f};desc="templates"',
+                f'total;dur={total * 1000:.1f}',
+            ]
+            if profiler:
+                view_name = request.resolver_match.view_name if request.resolver_match else None
+                filename = profiling.write_profile(profiler, view_name)
+                metrics.append(f'profile;desc="{filename}"')
+            measurement.response['Server-Timing'] = ', '.join(metrics)
+        finally:
+            if forced:
+                template_profiling.release()
+
+
+class MetricsMiddleware(SyncAsyncMiddleware):
+    """
+    Record per-view latency, status codes, database work and in-flight
+    requests in core.metrics. Runs near the top of the stack so the
+    latency includes the other middleware.
+    """
+
+    def handle(self, request):
+        with self._track(request) as outcome:
+            response = self.get_response(request)
+            outcome.status = response.status_code
+        return response
+
+    async def ahandle(self, request):
+        with self._track(request) as outcome:
+            response = await self.get_response(request)
+            outcome.status = response.status_code
+        return response
+
+    @contextmanager
+    def _track(self, request):
+        """Record the block as one request; it sets the yielded object's status (a 500 if it raises)."""
+        metrics.gauge_add('http_requests_in_flight', 1)
+        started = time.perf_counter()
+        outcome = SimpleNamespace(status=500)
+        timer = profiling.QueryTimer()
+        try:
+            with profiling.track_queries(timer):
+                yield outcome
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.gauge_add('http_requests_in_flight', -1)
+            # URL names, not paths, keep the number of label values bounded
+            view = request.resolver_match.view_name if request.resolver_match else 'unresolved'
+            metrics.observe('http_request_duration_seconds', elapsed, view=view)
+            metrics.inc('http_responses_total', view=view, status=str(outcome.status))
+            if timer.count:
+                metrics.inc('db_queries_total', timer.count, view=view)
+                metrics.inc('db_query_seconds_total', timer.seconds, view=view)
+            metrics.flush()
+
+
+class SlowQueryLogMiddleware(SyncAsyncMiddleware):
+    """Attribute queries logged by core.db.slow_queries to the view that ran them."""
+
+    def handle(self, request):
+        with slow_queries.request_context(request):
+            return self.get_response(request)
+
+    async def ahandle(self, request):
+        # sync_to_async copies the context, so queries run in its threads see the request too
+        with slow_queries.request_context(request):
+            return await self.get_response(request)
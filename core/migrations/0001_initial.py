@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Task',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text="Registered task name, e.g. 'transactions.expire_reservations'", max_length=200)),
+                ('args', models.JSONField(blank=True, default=list, help_text='Positional arguments')),
+                ('kwargs', models.JSONField(blank=True, default=dict, help_text='Keyword arguments')),
+                ('priority', models.SmallIntegerField(default=0, help_text='Higher priorities run first')),
+                ('run_at', models.DateTimeField(help_text='Earliest time the task may run')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=20)),
+                ('attempts', models.PositiveSmallIntegerField(default=0, help_text='Number of times the task has been started')),
+                ('max_attempts', models.PositiveSmallIntegerField(default=3, help_text='Attempts before the task is marked failed')),
+                ('last_error', models.TextField(blank=True, help_text='Traceback of the last failed attempt')),
+                ('dedupe_key', models.CharField(blank=True, help_text='Only one queued or running task may hold a given key', max_length=200, null=True)),
+                ('locked_by', models.CharField(blank=True, help_text='Worker running the task', max_length=100)),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-priority', 'run_at', 'id'],
+                'indexes': [models.Index(fields=['status', '-priority', 'run_at', 'id'], name='core_task_status_51fdd3_idx'), models.Index(fields=['name', 'status'], name='core_task_name_de65c9_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='task',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['queued', 'running'])), fields=('dedupe_key',), name='unique_active_task_dedupe_key'),
+        ),
+    ]
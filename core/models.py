@@ -12,3 +12,51 @@ class TimeStampedModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class Task(models.Model):
+    """Background job stored in the database and run by the run_worker command."""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    name = models.CharField(max_length=200, help_text="Registered task name, e.g. 'transactions.expire_reservations'")
+    args = models.JSONField(default=list, blank=True, help_text="Positional arguments")
+    kwargs = models.JSONField(default=dict, blank=True, help_text="Keyword arguments")
+    priority = models.SmallIntegerField(default=0, help_text="Higher priorities run first")
+    run_at = models.DateTimeField(help_text="Earliest time the task may run")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveSmallIntegerField(default=0, help_text="Number of times the task has been started")
+    max_attempts = models.PositiveSmallIntegerField(default=3, help_text="Attempts before the task is marked failed")
+    last_error = models.TextField(blank=True, help_text="Traceback of the last failed attempt")
+    dedupe_key = models.CharField(
+        max_length=200,
+        null=True,
+        blank=True,
+        help_text="Only one queued or running task may hold a given key"
+    )
+    locked_by = models.CharField(max_length=100, blank=True, help_text="Worker running the task")
+    locked_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-priority', 'run_at', 'id']
+        indexes = [
+            # Claim query: queued tasks that are due, best priority first
+            models.Index(fields=['status', '-priority', 'run_at', 'id']),
+            models.Index(fields=['name', 'status']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['dedupe_key'],
+                condition=models.Q(status__in=['queued', 'running']),
+                name='unique_active_task_dedupe_key',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
@@ -0,0 +1,46 @@
+"""
+Paginator for admin changelists over large tables.
+
+An unfiltered changelist asks for COUNT(*) of the whole table on every
+page view, which is a full scan on PostgreSQL. EstimatedCountPaginator
+answers that case from the planner statistics in pg_class instead, and
+only falls back to an exact count when the table is small, the query is
+filtered, or the database keeps no such statistics (SQLite).
+"""
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+# Below this many rows an exact count is cheap enough and always correct
+EXACT_COUNT_THRESHOLD = 10000
+
+
+def estimated_row_count(model, using='default'):
+    """Return the planner's row estimate for a model's table, or None if unavailable."""
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)",
+            [model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    # reltuples is -1 (or 0) until the table has been vacuumed or analyzed
+    if row is None or row[0] is None or row[0] <= 0:
+        return None
+    return row[0]
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that estimates the count of unfiltered querysets on big tables."""
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is not None and not query.where:
+            estimate = estimated_row_count(self.object_list.model, self.object_list.db)
+            if estimate is not None and estimate >= EXACT_COUNT_THRESHOLD:
+                return estimate
+        return super().count
@@ -0,0 +1,101 @@
+"""
+Per-request profiling.
+
+ProfilingMiddleware (core.middleware) uses these helpers. With
+REQUEST_PROFILING on, every response carries a Server-Timing header
+splitting its time into database, templates and total, and a
+REQUEST_PROFILING_SAMPLE_RATE fraction of requests run under cProfile,
+their stats written to REQUEST_PROFILING_DIR/<view name>/. Load them
+with `python -m pstats <file>` or snakeviz.
+
+Independently of that setting, any single request can be profiled by
+adding ?_profile=<token>, where the token is a signature of the path made
+with the SECRET_KEY (see the profiling_url command) and expires after
+REQUEST_PROFILING_TOKEN_MAX_AGE seconds.
+
+Query timing works through a context variable rather than
+connection.execute_wrapper(): database connections belong to a thread,
+and under ASGI the queries of an async view run on sync_to_async
+threads, which see the context of the request but not its connections.
+"""
+
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core import signing
+
+PROFILE_PARAM = '_profile'
+TOKEN_SALT = 'core.profiling'
+
+# cProfile cannot run two profilers at once in a thread-safe way
+profiler_lock = threading.Lock()
+
+_timers = ContextVar('query_timers', default=())
+
+
+def profile_token(path):
+    """Signed, expiring token that allows profiling a request to path."""
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign(path)[len(path) + 1:]
+
+
+def valid_token(path, token):
+    """Whether token was issued for path and has not expired."""
+    try:
+        signing.TimestampSigner(salt=TOKEN_SALT).unsign(
+            f'{path}:{token}', max_age=settings.REQUEST_PROFILING_TOKEN_MAX_AGE,
+        )
+    except signing.BadSignature:
+        return False
+    return True
+
+
+class QueryTimer:
+    """Totals the number and duration of the queries run inside track_queries()."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+@contextmanager
+def track_queries(timer):
+    """Count the queries run in this context, on any connection or thread, into timer."""
+    token = _timers.set((*_timers.get(), timer))
+    try:
+        yield timer
+    finally:
+        _timers.reset(token)
+
+
+def _wrapper(execute, sql, params, many, context):
+    timers = _timers.get()
+    if not timers:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        for timer in timers:
+            timer.count += 1
+            timer.seconds += elapsed
+
+
+def install(sender, connection, **kwargs):
+    """connection_created receiver: report the new connection's queries to track_queries()."""
+    if _wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_wrapper)
+
+
+def write_profile(profiler, view_name):
+    """Dump profiler stats under REQUEST_PROFILING_DIR/<view name>/; returns the file name."""
+    directory = os.path.join(settings.REQUEST_PROFILING_DIR, re.sub(r'[^\w.-]', '_', view_name or 'unresolved'))
+    os.makedirs(directory, exist_ok=True)
+    filename = f'{time.strftime("%Y%m%d-%H%M%S")}-{time.time_ns() % 10**9:09d}.prof'
+    profiler.dump_stats(os.path.join(directory, filename))
+    return filename
@@ -0,0 +1,54 @@
+"""
+Static files storage for production.
+
+CompressedManifestStaticFilesStorage is Django's manifest storage (every
+file gets a content hash in its name, and {% static %} points at the
+hashed copy) plus precompression: after collectstatic hashes the files,
+text assets are written next to them as .gz and, when the optional
+brotli package is installed, .br variants. StaticFilesMiddleware serves
+whichever variant the client accepts.
+"""
+
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.json', '.map', '.txt', '.xml', '.html')
+# Files this small gain nothing from compression once headers are counted
+MIN_COMPRESS_SIZE = 256
+
+
+def compress_variants(content):
+    """Return {'.gz': bytes, '.br': bytes} for the encodings that make content smaller."""
+    variants = {'.gz': gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(content, quality=11)
+    return {suffix: data for suffix, data in variants.items() if len(data) < len(content)}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Manifest storage that also writes gzip and brotli variants of hashed text assets."""
+
+    def post_process(self, *args, **kwargs):
+        yield from super().post_process(*args, **kwargs)
+        if kwargs.get('dry_run'):
+            return
+        for name in self.hashed_files.values():
+            if name.endswith(COMPRESSIBLE_EXTENSIONS):
+                self._write_variants(name)
+
+    def _write_variants(self, name):
+        with self.open(name) as original:
+            content = original.read()
+        if len(content) < MIN_COMPRESS_SIZE:
+            return
+        for suffix, data in compress_variants(content).items():
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            self._save(name + suffix, ContentFile(data))
@@ -0,0 +1,229 @@
+"""
+Deterministic synthetic data at production scale.
+
+generate() creates users with profiles, a share of them sellers, and
+listings with image rows. The same seed always yields the same data on
+an empty database. Distributions follow what a real marketplace looks
+like rather than being uniform:
+
+- catalogue size per seller is power-law (Zipf) distributed: a few shops
+  hold most listings, most sellers list a handful
+- category popularity is skewed the same way
+- prices are log-normal around a per-category typical price
+- condition, status and verification follow fixed weights
+- listing ages are spread over the last LISTING_MAX_AGE_DAYS days
+
+Rows are written with bulk_create in batches. Every synthetic account
+shares one password hash, computed once, because hashing a password per
+row with the production hasher would dominate the run time.
+"""
+
+import itertools
+import math
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.functions import Length
+from django.utils import timezone
+
+from marketplace.models import Category, Item, ItemImage
+from users.models import UserProfile
+
+PASSWORD = 'synthetic-password'
+USERNAME_PREFIX = 'synthetic_'
+
+CONDITION_WEIGHTS = {'like_new': 25, 'good': 45, 'fair': 22, 'needs_repair': 8}
+STATUS_WEIGHTS = {'available': 92, 'reserved': 2, 'sold': 6}
+VERIFICATION_WEIGHTS = {'verified': 80, 'unverified': 18, 'suspended': 2}
+
+ADJECTIVES = ['Vintage', 'Heavy', 'Nonstick', 'Enamelled', 'Professional', 'Compact', 'Classic', 'Hand-forged']
+NOUNS = ['Skillet', 'Saucepan', 'Chef Knife', 'Dutch Oven', 'Sheet Pan', 'Stand Mixer', 'Cutting Board',
+         'Stock Pot', 'Whisk', 'Colander', 'Teapot', 'Wok', 'Bread Knife', 'Ramekin Set', 'Grater']
+BRANDS = ['Le Creuset', 'Lodge', 'Victorinox', 'KitchenAid', 'Pyrex', 'OXO', 'Wusthof', 'Staub', 'All-Clad', '']
+MATERIALS = ['Cast iron', 'Stainless steel', 'Carbon steel', 'Ceramic', 'Glass', 'Wood', 'Copper', '']
+LOCATIONS = ['Springfield', 'Riverside', 'Fairview', 'Greenville', 'Madison', 'Georgetown', 'Salem', 'Franklin']
+
+
+def zipf_weights(count, alpha):
+    """Cumulative weights proportional to 1 / rank**alpha for ranks 1..count."""
+    return list(itertools.accumulate(1 / rank ** alpha for rank in range(1, count + 1)))
+
+
+def _choices(rng, weights, k):
+    return rng.choices(list(weights), weights=list(weights.values()), k=k)
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """Let bulk_create keep the created/updated times set on instances instead of now()."""
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _bulk_create(model, objects, batch_size):
+    """bulk_create that also fills in primary keys on databases that cannot return them."""
+    if not objects:
+        return objects
+    last_pk = model.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+    model.objects.bulk_create(objects, batch_size=batch_size)
+    if objects[0].pk is None:
+        new_pks = model.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)
+        for obj, pk in zip(objects, new_pks):
+            obj.pk = pk
+    return objects
+
+
+def _generate_users(rng, count, seller_count, password, offset, batch_size, now):
+    """Create users and their profiles; returns seller ids, most prolific seller first."""
+    seller_ids = []
+    for start in range(0, count, batch_size):
+        numbers = range(offset + start, offset + min(start + batch_size, count))
+        users = _bulk_create(User, [
+            User(
+                username=f'{USERNAME_PREFIX}{number}',
+                email=f'{USERNAME_PREFIX}{number}@example.com',
+                password=password,
+                date_joined=now - timedelta(days=rng.randrange(3 * 365)),
+            )
+            for number in numbers
+        ], batch_size)
+        sellers_in_batch = max(0, min(len(users), seller_count - start))
+        statuses = _choices(rng, VERIFICATION_WEIGHTS, sellers_in_batch)
+        UserProfile.objects.bulk_create([
+            UserProfile(
+                user_id=user.pk,
+                is_seller=index < sellers_in_batch,
+                verification_status=statuses[index] if index < sellers_in_batch else 'unverified',
+                created_at=user.date_joined,
+                updated_at=user.date_joined,
+            )
+            for index, user in enumerate(users)
+        ], batch_size=batch_size)
+        seller_ids += [user.pk for user in users[:sellers_in_batch]]
+    return seller_ids
+
+
+def _generate_items(rng, count, seller_ids, images_per_item, alpha, batch_size, now, progress):
+    """Create listings and their image rows; returns (items, images) created."""
+    categories = list(Category.objects.values_list('pk', flat=True))
+    if not categories:
+        raise ValueError("No categories exist; run migrations first.")
+    # Typical price per category, in dollars
+    typical_price = {pk: rng.lognormvariate(math.log(30), 0.8) for pk in categories}
+    rng.shuffle(categories)
+    seller_weights = zipf_weights(len(seller_ids), alpha)
+    category_weights = zipf_weights(len(categories), 1.0)
+    # Image counts: 1 plus a binomial around images_per_item, so every listing has a photo
+    spread = max(0, round(2 * (images_per_item - 1)))
+    image_counts = list(range(1, spread + 2)) if images_per_item >= 1 else [0]
+    image_weights = [math.comb(spread, k) for k in range(spread + 1)] if images_per_item >= 1 else [1]
+    max_age = settings.LISTING_MAX_AGE_DAYS * 24 * 3600
+
+    created_items = created_images = 0
+    for start in range(0, count, batch_size):
+        size = min(batch_size, count - start)
+        sellers = rng.choices(seller_ids, cum_weights=seller_weights, k=size)
+        category_ids = rng.choices(categories, cum_weights=category_weights, k=size)
+        conditions = _choices(rng, CONDITION_WEIGHTS, size)
+        statuses = _choices(rng, STATUS_WEIGHTS, size)
+        items = []
+        for seller_id, category_id, condition, status in zip(sellers, category_ids, conditions, statuses):
+            created_at = now - timedelta(seconds=rng.randrange(max_age))
+            price = typical_price[category_id] * rng.lognormvariate(0, 0.6)
+            items.append(Item(
+                seller_id=seller_id,
+                category_id=category_id,
+                title=f'{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}',
+                description='Used in a home kitchen and well looked after. Collection or local delivery.',
+                price=Decimal(max(1.0, min(price, 5000.0))).quantize(Decimal('0.01')),
+                condition=condition,
+                brand=rng.choice(BRANDS),
+                material=rng.choice(MATERIALS),
+                location=rng.choice(LOCATIONS),
+                is_active=status != 'sold',
+                status=status,
+                created_at=created_at,
+                updated_at=created_at,
+            ))
+        with transaction.atomic():
+            _bulk_create(Item, items, batch_size)
+            images = [
+                ItemImage(
+                    item_id=item.pk,
+                    image=f'listings/synthetic/{item.pk}_{number}.jpg',
+                    is_primary=number == 0,
+                    uploaded_at=item.created_at,
+                )
+                for item, image_count in zip(items, rng.choices(image_counts, weights=image_weights, k=size))
+                for number in range(image_count)
+            ]
+            ItemImage.objects.bulk_create(images, batch_size=batch_size)
+        created_items += len(items)
+        created_images += len(images)
+        if progress:
+            progress(created_items, count)
+    return created_items, created_images
+
+
+def _next_number():
+    """The number after the highest existing synthetic account, so a new run never reuses a username."""
+    last = (
+        User.objects.filter(username__regex=rf'^{USERNAME_PREFIX}[0-9]+$')
+        .annotate(length=Length('username')).order_by('-length', '-username')
+        .values_list('username', flat=True).first()
+    )
+    return int(last[len(USERNAME_PREFIX):]) + 1 if last else 0
+
+
+def existing_seller_ids():
+    """Synthetic sellers already in the database, oldest (and so most prolific) first."""
+    return list(
+        User.objects.filter(username__startswith=USERNAME_PREFIX, profile__is_seller=True)
+        .order_by('pk').values_list('pk', flat=True)
+    )
+
+
+def generate(users, sellers, items, images_per_item=3.0, seed=0, alpha=1.1, batch_size=5000, progress=None):
+    """
+    Create users accounts (the first sellers of them selling), items
+    listings and on average images_per_item image rows per listing.
+
+    alpha is the Zipf exponent of catalogue sizes (larger means more
+    concentrated). progress(done, total) is called after each listing
+    batch. With no sellers to create, the listings go to the synthetic
+    sellers already there. Returns {'users', 'sellers', 'items', 'images'}
+    counts of the rows created.
+    """
+    if sellers > users:
+        raise ValueError("sellers cannot exceed users.")
+    rng = random.Random(seed)
+    now = timezone.now()
+    offset = _next_number()
+    password = make_password(PASSWORD)
+
+    with explicit_timestamps(UserProfile, Item, ItemImage):
+        with transaction.atomic():
+            new_seller_ids = _generate_users(rng, users, sellers, password, offset, batch_size, now)
+        seller_ids = new_seller_ids or (existing_seller_ids() if items else [])
+        if items and not seller_ids:
+            raise ValueError("Listings need at least one seller.")
+        item_count, image_count = _generate_items(
+            rng, items, seller_ids, images_per_item, alpha, batch_size, now, progress,
+        ) if items else (0, 0)
+    return {'users': users, 'sellers': len(new_seller_ids), 'items': item_count, 'images': image_count}
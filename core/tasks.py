@@ -0,0 +1,217 @@
+"""
+Database-backed background tasks.
+
+Functions decorated with @task are registered under '<app>.<function>' and
+queued with .delay()/.schedule(), which insert a Task row. Workers started
+by the run_worker command claim due rows, best priority first: with
+SELECT ... FOR UPDATE SKIP LOCKED where the database supports it
+(PostgreSQL), otherwise with a conditional UPDATE per candidate row so
+two workers can never both claim one task (SQLite). A failed attempt is
+requeued with exponential backoff until max_attempts is reached.
+
+Tasks listed in settings.PERIODIC_TASKS are re-queued by the workers
+INTERVAL seconds after their previous run finished; a partial unique
+constraint on dedupe_key keeps exactly one pending copy of each.
+"""
+
+import logging
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, OperationalError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+class UnknownTask(Exception):
+    """Raised when a queued task's name is not registered."""
+
+
+def task(func=None, *, name=None, priority=0, max_attempts=3, retry_delay=30):
+    """
+    Register a function as a background task.
+
+    The function gains .delay(*args, **kwargs) to queue it now and
+    .schedule(run_at=None, priority=..., dedupe_key=None, args=(), kwargs=None)
+    for finer control. Arguments must be JSON-serialisable.
+    """
+    def register(func):
+        task_name = name or f"{func.__module__.split('.')[0]}.{func.__name__}"
+        func.task_name = task_name
+        func.retry_delay = retry_delay
+
+        def schedule(run_at=None, priority=priority, dedupe_key=None, args=(), kwargs=None):
+            return enqueue(
+                task_name, args=args, kwargs=kwargs, priority=priority,
+                run_at=run_at, max_attempts=max_attempts, dedupe_key=dedupe_key,
+            )
+
+        func.delay = lambda *args, **kwargs: schedule(args=args, kwargs=kwargs)
+        func.schedule = schedule
+        _registry[task_name] = func
+        return func
+
+    return register(func) if func is not None else register
+
+
+def get_task(name):
+    """Return the function registered under name."""
+    try:
+        return _registry[name]
+    except KeyError:
+        raise UnknownTask(f"No task registered as {name!r}.") from None
+
+
+def enqueue(name, args=(), kwargs=None, priority=0, run_at=None, max_attempts=3, dedupe_key=None):
+    """
+    Insert a Task row; returns it, or None if dedupe_key is already queued or running.
+
+    The row becomes visible to workers when the surrounding transaction commits.
+    """
+    get_task(name)
+    fields = dict(
+        name=name, args=list(args), kwargs=kwargs or {}, priority=priority,
+        run_at=run_at or timezone.now(), max_attempts=max_attempts, dedupe_key=dedupe_key,
+    )
+    if dedupe_key is None:
+        return Task.objects.create(**fields)
+    try:
+        with transaction.atomic():
+            return Task.objects.create(**fields)
+    except IntegrityError:
+        return None
+
+
+def _due(now):
+    return Task.objects.filter(status='queued', run_at__lte=now).order_by('-priority', 'run_at', 'id')
+
+
+def claim(worker_id, now=None):
+    """Claim the next due task for worker_id; returns it or None."""
+    now = now or timezone.now()
+    lock = dict(status='running', locked_by=worker_id, locked_at=now)
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            task_row = _due(now).select_for_update(skip_locked=True).first()
+            if task_row is None:
+                return None
+            Task.objects.filter(pk=task_row.pk).update(attempts=task_row.attempts + 1, **lock)
+    else:
+        # No row locks to skip: race for a few candidates with conditional UPDATEs instead
+        for pk, attempts in _due(now).values_list('pk', 'attempts')[:10]:
+            if Task.objects.filter(pk=pk, status='queued').update(attempts=attempts + 1, **lock):
+                break
+        else:
+            return None
+        task_row = Task(pk=pk)
+
+    task_row.refresh_from_db()
+    return task_row
+
+
+def _finish(task_row, **fields):
+    """Record a task's outcome, retrying briefly if the database is busy."""
+    # The task has already run; losing its outcome would make it run again
+    for attempt in range(5):
+        try:
+            return Task.objects.filter(pk=task_row.pk).update(locked_by='', locked_at=None, **fields)
+        except OperationalError:
+            if attempt == 4:
+                raise
+            time.sleep(0.05 * 2 ** attempt)
+
+
+def run(task_row):
+    """Run a claimed task and record the outcome; returns True on success."""
+    try:
+        func = get_task(task_row.name)
+        func(*task_row.args, **task_row.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        logger.exception("Task %s failed (attempt %s/%s)", task_row, task_row.attempts, task_row.max_attempts)
+        finished = task_row.name not in _registry or task_row.attempts >= task_row.max_attempts
+        if finished:
+            outcome = dict(status='failed', finished_at=timezone.now())
+        else:
+            delay = func.retry_delay * 2 ** (task_row.attempts - 1)
+            outcome = dict(status='queued', run_at=timezone.now() + timedelta(seconds=delay))
+        _finish(task_row, last_error=error, **outcome)
+        return False
+
+    _finish(task_row, status='done', finished_at=timezone.now())
+    return True
+
+
+def run_next(worker_id):
+    """Claim and run one due task; returns False when the queue had nothing due."""
+    task_row = claim(worker_id)
+    if task_row is None:
+        return False
+    run(task_row)
+    return True
+
+
+def requeue_stale(now=None):
+    """
+    Requeue tasks running longer than TASK_LOCK_TIMEOUT_SECONDS (their
+    worker died); returns the count. A task that has used up its attempts
+    is failed instead, so one that keeps killing its worker stops.
+    """
+    now = now or timezone.now()
+    cutoff = now - timedelta(seconds=settings.TASK_LOCK_TIMEOUT_SECONDS)
+    stale = Task.objects.filter(status='running', locked_at__lt=cutoff)
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status='failed', finished_at=now, locked_by='', locked_at=None,
+        last_error="Worker stopped responding on the last attempt.",
+    )
+    if failed:
+        logger.error("Failed %s task(s) whose worker died on their last attempt", failed)
+    return stale.filter(attempts__lt=F('max_attempts')).update(
+        status='queued', run_at=now, locked_by='', locked_at=None
+    )
+
+
+def schedule_periodic(now=None):
+    """Queue the next run of every periodic task that has none pending."""
+    now = now or timezone.now()
+    for name, interval in settings.PERIODIC_TASKS.items():
+        dedupe_key = f'periodic:{name}'
+        if Task.objects.filter(dedupe_key=dedupe_key, status__in=['queued', 'running']).exists():
+            continue
+        last = (
+            Task.objects.filter(name=name, status__in=['done', 'failed'])
+            .order_by('-finished_at')
+            .values_list('finished_at', flat=True)
+            .first()
+        )
+        run_at = max(now, last + timedelta(seconds=interval)) if last else now
+        get_task(name).schedule(run_at=run_at, dedupe_key=dedupe_key)
+
+
+@task
+def purge_finished_tasks(batch_size=1000):
+    """Delete finished tasks older than TASK_RETENTION_DAYS in batches."""
+    cutoff = timezone.now() - timedelta(days=settings.TASK_RETENTION_DAYS)
+    finished = Task.objects.filter(status__in=['done', 'failed'], finished_at__lt=cutoff)
+    while True:
+        ids = list(finished.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            break
+        Task.objects.filter(pk__in=ids).delete()
+
+
+@task
+def optimize_sqlite():
+    """Run PRAGMA optimize on a SQLite primary so planner statistics follow the data."""
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA optimize')
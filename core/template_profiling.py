@@ -0,0 +1,156 @@
+"""
+Per-template render timing.
+
+When TEMPLATE_PROFILING is on, CoreConfig.ready() wraps
+django.template.base.Template._render, which runs once for every
+template taking part in a response: the view's template, each
+{% extends %} parent and each {% include %}. For each template name we
+keep the number of renders, inclusive time, self time (excluding nested
+templates) and the slowest render. Every TEMPLATE_PROFILING_LOG_INTERVAL
+seconds the templates with the most self time are logged.
+
+A request profiled on its own (ProfilingMiddleware's signed token)
+brackets itself with acquire()/release() instead: the wrapper stays in
+place while any such request, or install(), still needs it, so a
+request that finishes never unpatches renders another thread is in the
+middle of.
+
+start_request()/request_time() give the total template time of one
+request, for the Server-Timing header. The total lives in a context
+variable rather than a thread-local, so it also adds up renders that an
+ASGI request runs in sync_to_async threads.
+"""
+
+import logging
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.template.base import Template
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_stats = {}
+_local = threading.local()
+# A one-item list, shared with the copies of the context sync_to_async makes
+_request_time = ContextVar('template_request_time', default=None)
+_last_report = time.monotonic()
+# Captured once; the wrapper always has the real render to call, patched or not
+_original_render = Template._render
+_patch_lock = threading.Lock()
+_installed = False
+_acquired = 0
+
+
+def template_stats():
+    """Return {template name: {'renders', 'total', 'self', 'max'}} with times in seconds."""
+    with _lock:
+        return {name: dict(values) for name, values in _stats.items()}
+
+
+def hottest_templates(limit=10):
+    """Return (name, stats) pairs with the most self time first."""
+    return sorted(template_stats().items(), key=lambda item: item[1]['self'], reverse=True)[:limit]
+
+
+def reset():
+    """Forget everything recorded so far."""
+    with _lock:
+        _stats.clear()
+
+
+def start_request():
+    """Reset the current request's template time."""
+    _request_time.set([0.0])
+
+
+def request_time():
+    """Seconds spent rendering templates in this context since start_request()."""
+    total = _request_time.get()
+    return total[0] if total else 0.0
+
+
+def _record(name, elapsed, self_time):
+    with _lock:
+        stats = _stats.setdefault(name, {'renders': 0, 'total': 0.0, 'self': 0.0, 'max': 0.0})
+        stats['renders'] += 1
+        stats['total'] += elapsed
+        stats['self'] += self_time
+        stats['max'] = max(stats['max'], elapsed)
+
+
+def _maybe_report():
+    global _last_report
+    now = time.monotonic()
+    with _lock:
+        if now - _last_report < settings.TEMPLATE_PROFILING_LOG_INTERVAL:
+            return
+        _last_report = now
+    for name, stats in hottest_templates():
+        logger.info(
+            "%s: %d renders, self %.1f ms (avg %.2f ms), total %.1f ms, max %.2f ms",
+            name, stats['renders'], stats['self'] * 1000, stats['self'] * 1000 / stats['renders'],
+            stats['total'] * 1000, stats['max'] * 1000,
+        )
+
+
+def _profiled_render(self, context):
+    # Each frame accumulates the time spent in the templates it renders
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    stack.append(0.0)
+    started = time.perf_counter()
+    try:
+        return _original_render(self, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        nested = stack.pop()
+        if stack:
+            stack[-1] += elapsed
+        name = self.origin.template_name or self.name or '<string>'
+        _record(name, elapsed, elapsed - nested)
+        if not stack:
+            total = _request_time.get()
+            if total is not None:
+                total[0] += elapsed
+            _maybe_report()
+
+
+def _apply_patch():
+    # Called with _patch_lock held
+    Template._render = _profiled_render if _installed or _acquired else _original_render
+
+
+def install():
+    """Start timing template renders for the whole process (idempotent)."""
+    global _installed
+    with _patch_lock:
+        _installed = True
+        _apply_patch()
+
+
+def uninstall():
+    """Stop timing template renders, once no acquired request still needs them."""
+    global _installed
+    with _patch_lock:
+        _installed = False
+        _apply_patch()
+
+
+def acquire():
+    """Time template renders until the matching release()."""
+    global _acquired
+    with _patch_lock:
+        _acquired += 1
+        _apply_patch()
+
+
+def release():
+    """Undo one acquire(); renders go untimed after the last one unless install() was called."""
+    global _acquired
+    with _patch_lock:
+        _acquired -= 1
+        _apply_patch()
@@ -0,0 +1,1041 @@
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, RequestFactory, override_settings
+from django.core.management import call_command
+from django.core.exceptions import ImproperlyConfigured
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper as SQLiteDatabaseWrapper
+from django.test.utils import CaptureQueriesContext
+from django.template import Context, Engine
+from django.template.base import Template
+from django.urls import reverse
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from contextlib import nullcontext
+from unittest import mock, skipIf
+
+from asgiref.sync import iscoroutinefunction
+
+from core import benchmark, counters, metrics, paginator, profiling, synthetic, tasks, template_profiling, warmup
+from core.context_processors import user_counters
+from core.db import slow_queries
+from core.db.pool import ConnectionPool, PoolTimeout
+from core.db.routers import PrimaryReplicaRouter, routing_context, use_primary
+from core import middleware
+from core.middleware import CompressionMiddleware, ReadYourWritesMiddleware, StaticFilesMiddleware, compression_stats, negotiate_encoding
+from marketplace.models import Category, Item, ItemImage, cached_categories
+from messaging.models import Conversation, Message
+from core.models import Task
+
+
+class CounterTests(TestCase):
+    """Tests for cached per-user counters."""
+
+    def setUp(self):
+        """Create users with an unread message."""
+        cache.clear()
+        self.buyer = User.objects.create_user(username='buyer', password='testpass')
+        self.seller = User.objects.create_user(username='seller', password='testpass')
+        conversation = Conversation.get_or_create_between(self.buyer, self.seller)
+        Message.objects.create(conversation=conversation, sender=self.buyer, content='Hello')
+
+    def test_loader_runs_on_miss(self):
+        """Test counters are computed from the database on a cache miss."""
+        self.assertEqual(counters.get_counters(self.seller.pk)['unread_messages'], 1)
+        self.assertEqual(counters.get_counters(self.buyer.pk)['unread_messages'], 0)
+
+    def test_cache_hit_costs_no_queries(self):
+        """Test a warm counter read does not touch the database."""
+        counters.get_counters(self.seller.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(counters.get_counters(self.seller.pk)['unread_messages'], 1)
+
+    def test_increment_and_decrement(self):
+        """Test cached counters are adjusted in place."""
+        counters.get_counters(self.seller.pk)
+        counters.increment('unread_messages', self.seller.pk, 2)
+        counters.decrement('unread_messages', self.seller.pk)
+        self.assertEqual(counters.get_counters(self.seller.pk)['unread_messages'], 2)
+
+    def test_increment_uncached_counter_is_noop(self):
+        """Test adjusting an uncached counter leaves it to the loader."""
+        counters.increment('unread_messages', self.seller.pk, 5)
+        self.assertEqual(counters.get_counters(self.seller.pk)['unread_messages'], 1)
+
+    def test_negative_counter_is_recomputed(self):
+        """Test a counter drifting below zero is dropped and reloaded."""
+        counters.get_counters(self.buyer.pk)
+        counters.decrement('unread_messages', self.buyer.pk)
+        self.assertEqual(counters.get_counters(self.buyer.pk)['unread_messages'], 0)
+
+
+class UserCountersContextProcessorTests(TestCase):
+    """Tests for the user_counters context processor."""
+
+    def setUp(self):
+        """Create a user."""
+        cache.clear()
+        self.factory = RequestFactory()
+        self.user = User.objects.create_user(username='buyer', password='testpass')
+        self.other = User.objects.create_user(username='seller', password='testpass')
+
+    def test_anonymous_user_gets_no_counters(self):
+        """Test anonymous requests get no counters."""
+        request = self.factory.get('/')
+        request.user = AnonymousUser()
+        self.assertEqual(user_counters(request), {})
+
+    def test_authenticated_user_gets_counters(self):
+        """Test logged-in users get their counters."""
+        request = self.factory.get('/')
+        request.user = self.user
+        self.assertIn('unread_messages', user_counters(request)['counters'])
+
+    def test_navbar_badge_follows_send_and_read(self):
+        """Test the badge updates when messages are sent and read."""
+        self.client.login(username='seller', password='testpass')
+        self.client.get(reverse('home'))  # warm the cache
+
+        self.client.logout()
+        self.client.login(username='buyer', password='testpass')
+        self.client.post(reverse('messaging:send'), {'recipient': self.other.pk, 'content': 'Hi'})
+        self.assertEqual(counters.get_counters(self.other.pk)['unread_messages'], 1)
+
+        self.client.logout()
+        self.client.login(username='seller', password='testpass')
+        self.client.get(reverse('messaging:conversation', args=[self.user.pk]))
+        self.assertEqual(counters.get_counters(self.other.pk)['unread_messages'], 0)
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    """Tests for the estimated-count admin paginator."""
+
+    def setUp(self):
+        """Create a few categories."""
+        for name in ('Pots', 'Pans', 'Knives'):
+            Category.objects.create(name=name)
+
+    def test_exact_count_without_statistics(self):
+        """Test databases without planner statistics get an exact count."""
+        pages = paginator.EstimatedCountPaginator(Category.objects.all(), 2)
+        self.assertEqual(pages.count, Category.objects.count())
+
+    def test_large_unfiltered_table_uses_estimate(self):
+        """Test the estimate replaces COUNT(*) on big unfiltered tables."""
+        with mock.patch.object(paginator, 'estimated_row_count', return_value=50000):
+            pages = paginator.EstimatedCountPaginator(Category.objects.all(), 2)
+            with self.assertNumQueries(0):
+                self.assertEqual(pages.count, 50000)
+
+    def test_filtered_queryset_counts_exactly(self):
+        """Test filtered querysets are never estimated."""
+        with mock.patch.object(paginator, 'estimated_row_count', return_value=50000):
+            pages = paginator.EstimatedCountPaginator(Category.objects.filter(name__in=['Pots', 'Pans']), 2)
+            self.assertEqual(pages.count, 2)
+
+
+CALLS = []
+CALLS_LOCK = threading.Lock()
+
+
+@tasks.task(name='core.test_record')
+def record_call(value):
+    """Remember that the task ran."""
+    with CALLS_LOCK:
+        CALLS.append(value)
+
+
+@tasks.task(name='core.test_explode', max_attempts=2, retry_delay=10)
+def explode():
+    """Always fail."""
+    raise RuntimeError("boom")
+
+
+class TaskQueueTests(TestCase):
+    """Tests for the database-backed task queue."""
+
+    def setUp(self):
+        """Start with no recorded calls."""
+        CALLS.clear()
+
+    def test_delay_and_run(self):
+        """Test a queued task is claimed, run and marked done."""
+        record_call.delay(7)
+        self.assertTrue(tasks.run_next('test'))
+        self.assertEqual(CALLS, [7])
+        self.assertEqual(Task.objects.get().status, 'done')
+        self.assertFalse(tasks.run_next('test'))
+
+    def test_priority_and_schedule(self):
+        """Test higher priorities run first and future tasks wait."""
+        record_call.delay('low')
+        record_call.schedule(args=['high'], priority=5)
+        record_call.schedule(args=['later'], priority=9, run_at=timezone.now() + timedelta(hours=1))
+        while tasks.run_next('test'):
+            pass
+        self.assertEqual(CALLS, ['high', 'low'])
+
+    def test_retry_with_backoff_then_fail(self):
+        """Test failures are retried after a delay until max_attempts."""
+        explode.delay()
+        with self.assertLogs('core.tasks', 'ERROR'):
+            tasks.run_next('test')
+        row = Task.objects.get()
+        self.assertEqual((row.status, row.attempts), ('queued', 1))
+        self.assertGreater(row.run_at, timezone.now() + timedelta(seconds=5))
+        self.assertIn('boom', row.last_error)
+
+        Task.objects.update(run_at=timezone.now())
+        with self.assertLogs('core.tasks', 'ERROR'):
+            tasks.run_next('test')
+        self.assertEqual(Task.objects.get().status, 'failed')
+
+    def test_dedupe_key(self):
+        """Test only one active task may hold a dedupe key."""
+        self.assertIsNotNone(record_call.schedule(args=[1], dedupe_key='once'))
+        self.assertIsNone(record_call.schedule(args=[2], dedupe_key='once'))
+        tasks.run_next('test')
+        self.assertIsNotNone(record_call.schedule(args=[3], dedupe_key='once'))
+
+    @override_settings(PERIODIC_TASKS={'core.test_record': 60})
+    def test_periodic_tasks(self):
+        """Test periodic tasks are queued once and again after their interval."""
+        tasks.schedule_periodic()
+        tasks.schedule_periodic()
+        self.assertEqual(Task.objects.filter(status='queued').count(), 1)
+        Task.objects.update(args=['tick'])
+        tasks.run_next('test')
+
+        tasks.schedule_periodic()
+        pending = Task.objects.get(status='queued')
+        self.assertGreater(pending.run_at, timezone.now() + timedelta(seconds=50))
+
+    def test_stale_running_task_is_requeued(self):
+        """Test tasks held by a dead worker go back on the queue."""
+        record_call.delay(1)
+        tasks.claim('dead-worker')
+        Task.objects.update(locked_at=timezone.now() - timedelta(days=1))
+        self.assertEqual(tasks.requeue_stale(), 1)
+        self.assertTrue(tasks.run_next('test'))
+        self.assertEqual(Task.objects.get().attempts, 2)
+
+    def test_stale_task_on_last_attempt_is_failed(self):
+        """Test a task that keeps killing its worker is failed instead of requeued forever."""
+        explode.delay()
+        for attempt in range(2):
+            tasks.claim('dead-worker')
+            Task.objects.update(locked_at=timezone.now() - timedelta(days=1))
+            with self.assertLogs('core.tasks', 'ERROR') if attempt else nullcontext():
+                tasks.requeue_stale()
+        task_row = Task.objects.get()
+        self.assertEqual((task_row.status, task_row.attempts), ('failed', 2))
+        self.assertFalse(tasks.run_next('test'))
+
+
+@override_settings(PERIODIC_TASKS={})
+class TaskWorkerTests(TransactionTestCase):
+    """Run several workers against one queue."""
+
+    def test_workers_run_each_task_once(self):
+        """Test concurrent workers never run a task twice."""
+        CALLS.clear()
+        for number in range(30):
+            record_call.delay(number)
+        call_command('run_worker', workers=4, once=True, stdout=io.StringIO(), stderr=io.StringIO())
+        self.assertEqual(sorted(CALLS), list(range(30)))
+        self.assertEqual(Task.objects.filter(status='done').count(), 30)
+
+
+class StaticFilesTests(TestCase):
+    """Tests for hashed, precompressed static files and the serving middleware."""
+
+    def setUp(self):
+        """Collect static files into a temporary STATIC_ROOT."""
+        self.static_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.static_root)
+        storages = {
+            'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+            'staticfiles': {'BACKEND': 'core.storage.CompressedManifestStaticFilesStorage'},
+        }
+        self.settings_override = override_settings(STATIC_ROOT=self.static_root, STORAGES=storages, SERVE_STATIC=True)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    def middleware(self):
+        return StaticFilesMiddleware(lambda request: HttpResponse('app'))
+
+    def hashed_css(self):
+        return staticfiles_storage.stored_name('css/main.css')
+
+    def test_collectstatic_writes_hashed_and_gzip_files(self):
+        """Test hashed names and gzip variants are written."""
+        name = self.hashed_css()
+        self.assertRegex(name, r'^css/main\.[0-9a-f]{12}\.css$')
+        self.assertTrue(os.path.exists(os.path.join(self.static_root, name + '.gz')))
+
+    def test_serves_gzip_with_immutable_caching(self):
+        """Test hashed files are served precompressed with far-future caching."""
+        request = RequestFactory().get('/static/' + self.hashed_css(), HTTP_ACCEPT_ENCODING='gzip, deflate')
+        response = self.middleware()(request)
+        body = b''.join(response.streaming_content)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertIn(b'{', gzip.decompress(body))
+
+    def test_plain_file_without_accept_encoding(self):
+        """Test clients that do not accept gzip get the original file."""
+        request = RequestFactory().get('/static/' + self.hashed_css())
+        response = self.middleware()(request)
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertFalse(response.has_header('Content-Disposition'))
+
+    def test_refused_gzip_gets_plain_file(self):
+        """Test gzip;q=0 in Accept-Encoding means the precompressed variant is not sent."""
+        request = RequestFactory().get('/static/' + self.hashed_css(), HTTP_ACCEPT_ENCODING='gzip;q=0, identity')
+        response = self.middleware()(request)
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+    def test_not_modified_keeps_caching_headers(self):
+        """Test a 304 carries the same Cache-Control and Vary as the full response."""
+        request = RequestFactory().get(
+            '/static/' + self.hashed_css(), HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT',
+        )
+        response = self.middleware()(request)
+        self.assertEqual(response.status_code, 304)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+    def test_unknown_paths_fall_through(self):
+        """Test requests outside the collected files reach the app."""
+        response = self.middleware()(RequestFactory().get('/static/missing.css'))
+        self.assertEqual(response.content, b'app')
+
+
+class CompressionMiddlewareTests(TestCase):
+    """Tests for dynamic response compression."""
+
+    BODY = b'<div class="card">kitchenware</div>' * 200
+
+    def run_middleware(self, response, **headers):
+        request = RequestFactory().get('/', **headers)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_negotiation(self):
+        """Test Accept-Encoding parsing honours q-values."""
+        self.assertEqual(negotiate_encoding('gzip, deflate'), 'gzip')
+        self.assertIsNone(negotiate_encoding('gzip;q=0, identity'))
+        self.assertIsNone(negotiate_encoding(''))
+        self.assertEqual(negotiate_encoding('*'), 'br' if middleware.brotli else 'gzip')
+
+    def test_large_html_is_gzipped(self):
+        """Test large HTML responses are compressed and marked as such."""
+        response = self.run_middleware(HttpResponse(self.BODY), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), self.BODY)
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+        self.assertGreater(compression_stats()['gzip']['bytes_in'], 0)
+
+    def test_small_and_non_text_responses_untouched(self):
+        """Test small bodies and binary types are sent as they are."""
+        small = self.run_middleware(HttpResponse(b'ok'), HTTP_ACCEPT_ENCODING='gzip')
+        image = self.run_middleware(HttpResponse(self.BODY, content_type='image/png'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(small.has_header('Content-Encoding'))
+        self.assertFalse(image.has_header('Content-Encoding'))
+
+    def test_csrf_pages_not_compressed(self):
+        """Test responses carrying a CSRF token are excluded (BREACH)."""
+        response = self.client.get(reverse('users:login'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertContains(response, 'csrfmiddlewaretoken')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertGreaterEqual(len(response.content), settings.COMPRESSION_MIN_SIZE)
+
+    def test_pages_without_csrf_token_compressed(self):
+        """Test a page without a form is still compressed through the full middleware stack."""
+        response = self.client.get(reverse('marketplace:list'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    def test_streaming_response(self):
+        """Test streaming responses are compressed chunk by chunk."""
+        rows = (f'{number},pan,{number * 3}\n'.encode() for number in range(500))
+        streamed = StreamingHttpResponse(rows, content_type='text/csv')
+        response = self.run_middleware(streamed, HTTP_ACCEPT_ENCODING='gzip')
+        body = b''.join(response.streaming_content)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertFalse(response.has_header('Content-Length'))
+        self.assertTrue(gzip.decompress(body).startswith(b'0,pan,0\n1,pan,3\n'))
+
+    async def test_async_streaming_response(self):
+        """Test async streaming responses are compressed without being turned into sync iterators."""
+        async def rows():
+            for number in range(500):
+                yield f'{number},pan,{number * 3}\n'.encode()
+
+        async def get_response(request):
+            return StreamingHttpResponse(rows(), content_type='text/csv')
+
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+        response = await CompressionMiddleware(get_response)(request)
+        self.assertTrue(response.is_async)
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertTrue(gzip.decompress(body).startswith(b'0,pan,0\n1,pan,3\n'))
+
+    def test_item_list_is_compressed(self):
+        """Test the marketplace listing page goes out compressed."""
+        response = self.client.get(reverse('marketplace:list'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn(b'</html>', gzip.decompress(response.content))
+
+
+class TemplateProfilingTests(TestCase):
+    """Tests for per-template render timing."""
+
+    def setUp(self):
+        """Start profiling with empty stats."""
+        template_profiling.install()
+        template_profiling.reset()
+        self.addCleanup(template_profiling.uninstall)
+
+    def test_records_nested_templates(self):
+        """Test the view template, its parent and includes are timed separately."""
+        self.client.get(reverse('marketplace:list'))
+        stats = template_profiling.template_stats()
+        for name in ('marketplace/listing_list.html', 'base.html', 'navbar.html'):
+            self.assertIn(name, stats)
+        base = stats['base.html']
+        self.assertEqual(base['renders'], 1)
+        self.assertLessEqual(base['self'], base['total'])
+        self.assertLess(stats['navbar.html']['total'], base['total'])
+
+    @override_settings(TEMPLATE_PROFILING_LOG_INTERVAL=0)
+    def test_logs_hottest_templates(self):
+        """Test the slowest templates are logged once the interval passes."""
+        with self.assertLogs('core.template_profiling', 'INFO') as logs:
+            self.client.get(reverse('marketplace:list'))
+        self.assertTrue(any('base.html' in line for line in logs.output))
+
+    @skipIf(settings.TEMPLATE_PROFILING, "Template profiling is installed for the whole process")
+    def test_render_survives_another_request_releasing(self):
+        """Test a request finishing leaves Template._render patched while another thread is still rendering."""
+        template_profiling.uninstall()
+        entered, proceed = threading.Event(), threading.Event()
+
+        def wait():
+            entered.set()
+            proceed.wait(5)
+            # Still patched: this request holds the wrapper until it finishes
+            results.append(Template._render is template_profiling._profiled_render)
+            return 'rendered'
+
+        results = []
+
+        def render():
+            template_profiling.acquire()
+            try:
+                results.append(Engine().from_string('{{ wait }}').render(Context({'wait': wait})))
+            except Exception as exc:
+                results.append(exc)
+            finally:
+                template_profiling.release()
+
+        template_profiling.acquire()
+        thread = threading.Thread(target=render)
+        thread.start()
+        self.assertTrue(entered.wait(5))
+        template_profiling.release()
+        proceed.set()
+        thread.join()
+        self.assertEqual(results, [True, 'rendered'])
+        self.assertIs(Template._render, template_profiling._original_render)
+
+
+class FakeConnection:
+    """Stand-in DB-API connection that only tracks whether it was closed."""
+
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class ConnectionPoolTests(TestCase):
+    """Tests for the in-process connection pool."""
+
+    def test_connections_are_reused(self):
+        """Test a released connection is handed out again."""
+        pool = ConnectionPool(max_size=2)
+        first = pool.acquire(FakeConnection)
+        pool.release(first)
+        self.assertIs(pool.acquire(FakeConnection), first)
+        stats = pool.stats()
+        self.assertEqual((stats['created'], stats['reused'], stats['in_use']), (1, 1, 1))
+
+    def test_exhausted_pool_times_out(self):
+        """Test acquire waits for a free slot and then gives up."""
+        pool = ConnectionPool(max_size=1, timeout=0.05)
+        pool.acquire(FakeConnection)
+        with self.assertRaises(PoolTimeout):
+            pool.acquire(FakeConnection)
+        self.assertEqual(pool.stats()['timeouts'], 1)
+
+    def test_waiter_gets_released_connection(self):
+        """Test a waiting thread receives a connection another thread releases."""
+        pool = ConnectionPool(max_size=1, timeout=2)
+        held = pool.acquire(FakeConnection)
+        threading.Timer(0.05, pool.release, args=[held]).start()
+        self.assertIs(pool.acquire(FakeConnection), held)
+        self.assertEqual(pool.stats()['waits'], 1)
+
+    def test_idle_and_broken_connections_are_closed(self):
+        """Test idle connections above min_size expire and unusable ones are dropped."""
+        pool = ConnectionPool(max_size=3, idle_timeout=0, reset=lambda conn: not getattr(conn, 'dirty', False))
+        idle, dirty = pool.acquire(FakeConnection), pool.acquire(FakeConnection)
+        dirty.dirty = True
+        pool.release(idle)
+        pool.release(dirty)
+        self.assertTrue(dirty.closed)
+
+        fresh = pool.acquire(FakeConnection)
+        self.assertIsNot(fresh, idle)
+        self.assertTrue(idle.closed)
+        self.assertEqual(pool.stats()['size'], 1)
+
+    def test_pool_engine_refuses_persistent_connections(self):
+        """Test the pool engine will not start with a non-zero CONN_MAX_AGE unless pooling is off."""
+        from core.db.backends.postgresql_pool.base import DatabaseWrapper
+        settings_dict = {**connection.settings_dict, 'CONN_MAX_AGE': 60, 'POOL': {}}
+        with self.assertRaises(ImproperlyConfigured):
+            DatabaseWrapper(settings_dict, 'pooled')
+        DatabaseWrapper({**settings_dict, 'CONN_MAX_AGE': 0}, 'pooled')
+        DatabaseWrapper({**settings_dict, 'POOL': {'ENABLED': False}}, 'unpooled')
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'], REPLICA_STICKY_SECONDS=10)
+class ReplicaRoutingTests(SimpleTestCase):
+    """Tests for primary/replica routing and read-your-writes stickiness."""
+
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+
+    def test_reads_go_to_replica_until_a_write(self):
+        """Test reads use a replica and switch to the primary once the context writes."""
+        with routing_context():
+            self.assertEqual(self.router.db_for_read(Category), 'replica1')
+            self.assertEqual(self.router.db_for_write(Category), 'default')
+            self.assertEqual(self.router.db_for_read(Category), 'default')
+        with routing_context(), use_primary():
+            self.assertEqual(self.router.db_for_read(Category), 'default')
+
+    def test_only_primary_is_migrated(self):
+        """Test replicas are never migrated directly."""
+        self.assertTrue(self.router.allow_migrate('default', 'marketplace'))
+        self.assertFalse(self.router.allow_migrate('replica1', 'marketplace'))
+
+    def _through_middleware(self, request, view):
+        return ReadYourWritesMiddleware(view)(request)
+
+    def test_write_pins_client_to_primary(self):
+        """Test a request that writes sets the cookie that pins the next requests."""
+        def writing_view(request):
+            self.router.db_for_write(Category)
+            return HttpResponse()
+
+        routed = []
+
+        def reading_view(request):
+            routed.append(self.router.db_for_read(Category))
+            return HttpResponse()
+
+        factory = RequestFactory()
+        response = self._through_middleware(factory.get('/'), writing_view)
+        self.assertIn(middleware.PRIMARY_PIN_COOKIE, response.cookies)
+
+        self._through_middleware(factory.get('/'), reading_view)
+        request = factory.get('/')
+        request.COOKIES[middleware.PRIMARY_PIN_COOKIE] = response.cookies[middleware.PRIMARY_PIN_COOKIE].value
+        self._through_middleware(request, reading_view)
+        self._through_middleware(factory.post('/'), reading_view)
+        self.assertEqual(routed, ['replica1', 'default', 'default'])
+
+    def test_expired_or_forged_pin_is_ignored(self):
+        """Test reads return to the replica once the sticky window has passed."""
+        routed = []
+
+        def reading_view(request):
+            routed.append(self.router.db_for_read(Category))
+            return HttpResponse()
+
+        response = HttpResponse()
+        response.set_signed_cookie(middleware.PRIMARY_PIN_COOKIE, '1', salt=middleware.PRIMARY_PIN_SALT)
+        pin = response.cookies[middleware.PRIMARY_PIN_COOKIE].value
+        for value, offset in ((pin, 60), ('forged', 0)):
+            request = RequestFactory().get('/')
+            request.COOKIES[middleware.PRIMARY_PIN_COOKIE] = value
+            with mock.patch('time.time', return_value=time.time() + offset):
+                response = self._through_middleware(request, reading_view)
+            self.assertNotIn(middleware.PRIMARY_PIN_COOKIE, response.cookies)
+        self.assertEqual(routed, ['replica1', 'replica1'])
+
+
+class SQLiteTuningTests(TestCase):
+    """Tests for the production SQLite pragmas."""
+
+    def test_pragmas_applied_to_new_connections(self):
+        """Test a new connection to a file database runs the configured pragmas."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        settings_dict = {
+            **connection.settings_dict,
+            'NAME': os.path.join(directory, 'tuned.sqlite3'),
+            'PRAGMAS': {'journal_mode': 'WAL', 'synchronous': 'NORMAL', 'busy_timeout': 2500},
+        }
+        tuned = SQLiteDatabaseWrapper(settings_dict, alias='tuned')
+        self.addCleanup(tuned.close)
+        with tuned.cursor() as cursor:
+            values = [cursor.execute(f'PRAGMA {name}').fetchone()[0] for name in ('journal_mode', 'synchronous', 'busy_timeout')]
+        # synchronous=NORMAL reads back as 1
+        self.assertEqual(values, ['wal', 1, 2500])
+
+    def test_optimize_task(self):
+        """Test the periodic optimize task runs against the database."""
+        tasks.get_task('core.optimize_sqlite')()
+        self.assertIn('core.optimize_sqlite', settings.PERIODIC_TASKS)
+
+
+class ViewBenchmarkTests(TestCase):
+    """Tests for the hot-view benchmark."""
+
+    def test_scenarios_run_on_seeded_catalogue(self):
+        """Test every scenario runs against seeded data and reports its metrics."""
+        synthetic.generate(users=4, sellers=3, items=12, images_per_item=2, batch_size=5)
+
+        results = benchmark.run_scenarios(requests=2, instrumented_requests=1)
+        self.assertEqual(set(results), {
+            'browse', 'browse_category', 'detail', 'seller_list', 'storefront', 'create', 'edit',
+        })
+        for metrics in results.values():
+            self.assertLessEqual(metrics['p50'], metrics['p99'])
+            self.assertGreater(metrics['queries'], 0)
+
+    def test_seed_tops_up_without_new_sellers(self):
+        """Test seeding a kept database with more listings reuses its sellers."""
+        benchmark.seed(3, 10, 1, io.StringIO())
+        benchmark.seed(3, 25, 1, io.StringIO())
+        self.assertEqual(len(synthetic.existing_seller_ids()), 3)
+        self.assertEqual(Item.objects.count(), 25)
+
+    def test_benchmark_database_never_uses_the_test_database(self):
+        """Test the benchmark creates its own database, not test_<NAME>, and restores the test name."""
+        names = []
+        creation = mock.Mock()
+        creation.create_test_db.side_effect = lambda **kwargs: names.append(connection.settings_dict['TEST']['NAME'])
+        test_name = connection.settings_dict['TEST'].get('NAME')
+        with mock.patch.object(connection, 'vendor', 'postgresql'), \
+                mock.patch.object(connection, 'creation', creation), \
+                mock.patch.dict(connection.settings_dict, NAME='kitchenware'):
+            with benchmark.benchmark_database():
+                pass
+        self.assertEqual(names, ['benchmark_kitchenware'])
+        creation.destroy_test_db.assert_called_once()
+        self.assertEqual(connection.settings_dict['TEST'].get('NAME'), test_name)
+
+    def test_compare_flags_regressions(self):
+        """Test latency beyond the threshold and any extra query count as regressions."""
+        baseline = {'detail': {'p50': 10.0, 'p95': 20.0, 'p99': 30.0, 'queries': 3, 'alloc_kib': 100.0}}
+        current = {'detail': {'p50': 11.0, 'p95': 30.0, 'p99': 30.0, 'queries': 4, 'alloc_kib': 100.0}}
+        self.assertEqual(benchmark.compare(current, baseline, threshold=0.2), [
+            ('detail', 'p95', 20.0, 30.0),
+            ('detail', 'queries', 3, 4),
+        ])
+
+
+class SyntheticDataTests(TestCase):
+    """Tests for the synthetic data generator."""
+
+    def _snapshot(self):
+        return (
+            list(User.objects.filter(username__startswith='synthetic_').values_list('username', 'profile__is_seller')),
+            list(Item.objects.values_list('seller__username', 'category__name', 'price', 'condition', 'status', 'created_at')),
+            ItemImage.objects.count(),
+        )
+
+    def test_generates_requested_rows_with_profiles(self):
+        """Test users get profiles, sellers own every listing and listings keep their generated dates."""
+        counts = synthetic.generate(users=30, sellers=10, items=200, images_per_item=2, batch_size=16)
+        self.assertEqual(counts['items'], 200)
+        self.assertEqual(User.objects.filter(username__startswith='synthetic_', profile__isnull=False).count(), 30)
+        self.assertFalse(Item.objects.filter(seller__profile__is_seller=False).exists())
+        self.assertEqual(ItemImage.objects.filter(is_primary=True).count(), 200)
+        self.assertEqual(ItemImage.objects.count(), counts['images'])
+        self.assertGreater(Item.objects.values('created_at__date').distinct().count(), 10)
+        self.assertTrue(self.client.login(username='synthetic_0', password=synthetic.PASSWORD))
+
+        # Power law: the first seller alone lists far more than an even share
+        self.assertGreater(Item.objects.filter(seller__username='synthetic_0').count(), 200 / 10 * 2)
+
+    def test_same_seed_same_data(self):
+        """Test generation is deterministic for a given seed."""
+        synthetic.generate(users=5, sellers=3, items=40, seed=7)
+        first = self._snapshot()
+        ItemImage.objects.all().delete()
+        Item.objects.all().delete()
+        User.objects.filter(username__startswith='synthetic_').delete()
+        synthetic.generate(users=5, sellers=3, items=40, seed=7)
+        first_items, second_items = first[1], self._snapshot()[1]
+        self.assertEqual([row[:5] for row in first_items], [row[:5] for row in second_items])
+
+
+    def test_numbers_continue_after_highest_account(self):
+        """Test a second run numbers its accounts after the highest existing one, even after deletions."""
+        synthetic.generate(users=3, sellers=1, items=0)
+        User.objects.filter(username='synthetic_0').delete()
+        counts = synthetic.generate(users=2, sellers=1, items=0)
+        self.assertEqual(counts['users'], 2)
+        self.assertEqual(User.objects.filter(username__in=['synthetic_3', 'synthetic_4']).count(), 2)
+
+    def test_listings_only_go_to_existing_sellers(self):
+        """Test generating listings without new accounts adds them to the existing synthetic sellers."""
+        synthetic.generate(users=4, sellers=2, items=5)
+        counts = synthetic.generate(users=0, sellers=0, items=10)
+        self.assertEqual((counts['sellers'], counts['items']), (0, 10))
+        self.assertEqual(User.objects.filter(username__startswith='synthetic_').count(), 4)
+        self.assertEqual(Item.objects.filter(seller__profile__is_seller=True).count(), 15)
+
+class ProfilingMiddlewareTests(TestCase):
+    """Tests for Server-Timing headers and cProfile sampling."""
+
+    def setUp(self):
+        self.profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.profile_dir, ignore_errors=True)
+
+    def _profiles(self):
+        return [os.path.join(root, name) for root, _, names in os.walk(self.profile_dir) for name in names]
+
+    def test_server_timing_when_enabled(self):
+        """Test responses report database, template and total time."""
+        self.addCleanup(template_profiling.uninstall)
+        with override_settings(REQUEST_PROFILING=True, REQUEST_PROFILING_SAMPLE_RATE=0):
+            response = self.client.get(reverse('marketplace:list'))
+        timing = response['Server-Timing']
+        self.assertRegex(timing, r'db;dur=[\d.]+;desc="\d+ queries"')
+        self.assertIn('tpl;dur=', timing)
+        self.assertIn('total;dur=', timing)
+
+        response = self.client.get(reverse('marketplace:list'))
+        self.assertFalse(response.has_header('Server-Timing'))
+
+    def test_sampled_requests_write_profiles_per_view(self):
+        """Test sampled requests leave a cProfile dump under the view's name."""
+        self.addCleanup(template_profiling.uninstall)
+        with override_settings(REQUEST_PROFILING=True, REQUEST_PROFILING_SAMPLE_RATE=1,
+                               REQUEST_PROFILING_DIR=self.profile_dir):
+            self.client.get(reverse('marketplace:list'))
+        [path] = self._profiles()
+        self.assertEqual(os.path.basename(os.path.dirname(path)), 'marketplace_list')
+
+    def test_signed_token_profiles_one_request(self):
+        """Test a valid token profiles the request even when profiling is off; others are ignored."""
+        path = reverse('marketplace:list')
+        with override_settings(REQUEST_PROFILING_DIR=self.profile_dir):
+            for token in ('forged', profiling.profile_token('/users/sellers/')):
+                response = self.client.get(path, {profiling.PROFILE_PARAM: token})
+                self.assertFalse(response.has_header('Server-Timing'))
+            self.assertEqual(self._profiles(), [])
+
+            response = self.client.get(path, {profiling.PROFILE_PARAM: profiling.profile_token(path)})
+        self.assertIn('profile;desc=', response['Server-Timing'])
+        self.assertEqual(len(self._profiles()), 1)
+
+    @skipIf(settings.TEMPLATE_PROFILING, "Template profiling is installed for the whole process")
+    def test_signed_token_restores_template_render(self):
+        """Test a forced profile times templates, then leaves Template._render unpatched."""
+        path = reverse('marketplace:list')
+        with override_settings(REQUEST_PROFILING_DIR=self.profile_dir):
+            response = self.client.get(path, {profiling.PROFILE_PARAM: profiling.profile_token(path)})
+        self.assertIn('tpl;dur=', response['Server-Timing'])
+        self.assertIsNot(Template._render, template_profiling._profiled_render)
+
+
+class MetricsTests(TestCase):
+    """Tests for request metrics and the Prometheus endpoint."""
+
+    def setUp(self):
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+        self.scraper = self.client_class()
+        self.scraper.force_login(User.objects.create_user('ops', password='pw', is_staff=True))
+
+    def test_requests_recorded_per_url_name(self):
+        """Test latency, status and query metrics are labelled by URL name."""
+        self.client.get(reverse('marketplace:list'))
+        self.client.get('/no-such-page/')
+        output = self.scraper.get(reverse('metrics')).content.decode()
+
+        self.assertIn('# TYPE http_request_duration_seconds histogram', output)
+        self.assertIn('http_request_duration_seconds_count{view="marketplace:list"} 1', output)
+        self.assertIn('http_request_duration_seconds_bucket{view="marketplace:list",le="+Inf"} 1', output)
+        self.assertIn('http_responses_total{status="200",view="marketplace:list"} 1', output)
+        self.assertIn('http_responses_total{status="404",view="unresolved"} 1', output)
+        self.assertRegex(output, r'db_queries_total\{view="marketplace:list"\} \d+')
+        # Only the scrape itself is in flight
+        self.assertIn('http_requests_in_flight 1', output)
+
+    def test_cache_hits_and_misses(self):
+        """Test counter reads report cache hits and misses."""
+        counters.register('test_metric_counter', lambda user_id: 0)
+        self.addCleanup(counters._loaders.pop, 'test_metric_counter')
+        cache.clear()
+        counters.get_counters(1)
+        counters.get_counters(1)
+        output = metrics.render()
+        self.assertRegex(output, r'cache_requests_total\{cache="counters",result="miss"\} [1-9]')
+        self.assertRegex(output, r'cache_requests_total\{cache="counters",result="hit"\} [1-9]')
+
+    def test_snapshots_of_other_processes_are_merged(self):
+        """Test counters from every process file are summed and gauges come from this process only."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        metrics.inc('http_responses_total', view='marketplace:list', status='200')
+        other = {
+            'counters': [['http_responses_total', [['status', '200'], ['view', 'marketplace:list']], 4]],
+            'gauges': [['http_requests_in_flight', [], 3]],
+            'histograms': [],
+        }
+        # The parent process is alive; a pid beyond pid_max never is
+        for pid in (os.getppid(), 2 ** 22 + 1):
+            with open(os.path.join(directory, f'{pid}.json'), 'w') as handle:
+                json.dump({**other, 'pid': pid}, handle)
+
+        with override_settings(METRICS_DIR=directory):
+            metrics.flush(force=True)
+            self.assertTrue(os.path.exists(os.path.join(directory, f'{os.getpid()}.json')))
+            output = metrics.render()
+        self.assertIn('http_responses_total{status="200",view="marketplace:list"} 9', output)
+        self.assertNotIn('http_requests_in_flight', output)
+
+    def test_snapshots_of_exited_processes_are_pruned(self):
+        """Test a dead process's snapshot is deleted once it is older than METRICS_RETENTION_SECONDS."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        path = os.path.join(directory, f'{2 ** 22 + 1}.json')
+        with open(path, 'w') as handle:
+            json.dump({'pid': 2 ** 22 + 1, 'counters': [['db_queries_total', [], 4]], 'gauges': [],
+                       'histograms': []}, handle)
+        two_hours_ago = time.time() - 7200
+        os.utime(path, (two_hours_ago, two_hours_ago))
+
+        with override_settings(METRICS_DIR=directory, METRICS_RETENTION_SECONDS=3600):
+            self.assertNotIn('db_queries_total', metrics.render())
+        self.assertFalse(os.path.exists(path))
+
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_endpoint_is_internal(self):
+        """Test the endpoint hides from outside addresses unless given the token or a staff login."""
+        outsider = self.client_class(REMOTE_ADDR='203.0.113.9')
+        self.assertEqual(outsider.get(reverse('metrics')).status_code, 404)
+        self.assertEqual(outsider.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer wrong').status_code, 404)
+        response = outsider.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer scrape-secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+
+        outsider.force_login(User.objects.get(username='ops'))
+        self.assertEqual(outsider.get(reverse('metrics')).status_code, 200)
+
+    def test_localhost_needs_token_by_default(self):
+        """Test requests from 127.0.0.1 (say, through a local proxy) are not let in by address alone."""
+        local = self.client_class(REMOTE_ADDR='127.0.0.1')
+        self.assertEqual(local.get(reverse('metrics')).status_code, 404)
+        with override_settings(METRICS_ALLOWED_IPS=['127.0.0.1']):
+            self.assertEqual(local.get(reverse('metrics')).status_code, 200)
+
+
+class SlowQueryLogTests(TestCase):
+    """Tests for the slow query log."""
+
+    def setUp(self):
+        slow_queries.reset()
+        self.addCleanup(slow_queries.reset)
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    def test_fingerprint_ignores_arguments(self):
+        """Test queries differing only in literals and IN list lengths share a fingerprint."""
+        first = slow_queries.fingerprint("SELECT * FROM item WHERE id IN (%s, %s) AND title = 'pan'")
+        second = slow_queries.fingerprint("SELECT  * FROM item WHERE id IN (%s) AND title = 'it''s a pot'")
+        self.assertEqual(first, second)
+        self.assertEqual(first[1], "SELECT * FROM item WHERE id IN (...) AND title = ?")
+        self.assertNotEqual(first[0], slow_queries.fingerprint("SELECT * FROM category WHERE id = 1")[0])
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+    def test_slow_queries_logged_with_view_and_plan(self):
+        """Test slow queries are logged per view, explained once and counted per fingerprint."""
+        with self.assertLogs('core.db.slow_queries', 'WARNING') as logs:
+            self.client.get(reverse('marketplace:list'))
+            self.client.get(reverse('marketplace:list'))
+
+        stats = slow_queries.worst_queries(limit=100)
+        self.assertTrue(stats)
+        key, item_query = next((key, s) for key, s in stats if 'marketplace_item' in s['sql'])
+        self.assertEqual(item_query['views'], {'marketplace:list': item_query['count']})
+        self.assertGreaterEqual(item_query['count'], 2)
+        self.assertTrue(item_query['plan'])
+        self.assertTrue(any('in marketplace:list' in line and key in line for line in logs.output))
+        self.assertEqual(sum(f'Plan for [{key}]' in line for line in logs.output), 1)
+        self.assertIn(f'db_slow_queries_total{{fingerprint="{key}"}}', metrics.render())
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+    def test_fingerprints_past_the_cap_are_not_explained(self):
+        """Test query shapes beyond MAX_FINGERPRINTS are never explained and share the "other" label."""
+        with mock.patch.object(slow_queries, 'MAX_FINGERPRINTS', 1), \
+                mock.patch.object(slow_queries, '_explain', return_value='plan') as explain, \
+                self.assertLogs('core.db.slow_queries', 'WARNING'):
+            for _ in range(3):
+                Category.objects.count()
+                list(Category.objects.filter(name='Pots'))
+
+        self.assertEqual(explain.call_count, 1)
+        self.assertEqual(len(slow_queries.slow_query_stats()), 1)
+        self.assertIn('db_slow_queries_total{fingerprint="other"} 3', metrics.render())
+
+
+class WarmupTests(TestCase):
+    """Tests for worker warm-up and the import audit."""
+
+    def test_warm_up_runs_every_step(self):
+        """Test warm-up compiles URLs and templates, primes categories and reports durations."""
+        cache.clear()
+        with self.assertLogs('core.warmup', 'INFO') as logs:
+            report = warmup.warm_up()
+
+        self.assertEqual(list(report), ['urls', 'templates', 'categories', 'databases'])
+        self.assertGreater(report['urls'][0], 10)
+        self.assertEqual(report['templates'][0], len(settings.WARMUP_TEMPLATES))
+        self.assertEqual(report['categories'][0], Category.objects.count())
+        self.assertIn('Worker warmed up in', logs.output[-1])
+        with self.assertNumQueries(0):
+            cached_categories()
+
+    def test_failing_step_is_logged_and_skipped(self):
+        """Test a failing step does not stop the others."""
+        with mock.patch.object(warmup, 'STEPS', [('broken', lambda: 1 / 0), ('ok', lambda: 'done')]):
+            with self.assertLogs('core.warmup', 'ERROR'):
+                report = warmup.warm_up()
+        self.assertIsNone(report['broken'][0])
+        self.assertEqual(report['ok'][0], 'done')
+
+    def test_import_audit(self):
+        """Test the audit covers app modules but not tests or migrations, and times imports."""
+        modules = warmup.project_modules()
+        self.assertIn('marketplace.views', modules)
+        self.assertIn('config.urls', modules)
+        self.assertFalse([name for name in modules if 'tests' in name or 'migrations' in name])
+
+        rows = warmup.import_times(['core.metrics'])
+        self.assertTrue(any(name == 'core.metrics' and cumulative >= own for name, _, own, cumulative in rows))
+
+
+class AsyncViewTests(TestCase):
+    """Tests that the async read-only views match their sync counterparts."""
+
+    def setUp(self):
+        """Serve both implementations and create a verified seller with listings."""
+        urlconf = override_settings(ROOT_URLCONF=benchmark.sync_and_async_urlconf())
+        urlconf.enable()
+        self.addCleanup(urlconf.disable)
+        self.seller = User.objects.create_user(username='potter', password='testpass')
+        self.seller.profile.is_seller = True
+        self.seller.profile.verification_status = 'verified'
+        self.seller.profile.save()
+        category = Category.objects.create(name='Stoneware')
+        for n in range(15):
+            item = Item.objects.create(
+                seller=self.seller, title=f'Bowl {n}', description='Glazed', category=category,
+                price=10 + n, condition='good', location='Springfield', is_active=n != 0,
+            )
+            ItemImage.objects.create(item=item, image=f'listings/bowl-{n}.jpg', is_primary=n % 2 == 0)
+            ItemImage.objects.create(item=item, image=f'listings/bowl-{n}-side.jpg')
+        self.item = item
+
+    def get_both(self, path, data=None):
+        return self.client.get(f'/sync/{path}', data), self.client.get(f'/async/{path}', data)
+
+    def test_browse(self):
+        """Test the async browse view pages and filters like the sync one."""
+        for data in ({}, {'page': 2}, {'page': 'last'}):
+            sync, async_ = self.get_both('items/', data)
+            self.assertEqual(async_.status_code, 200)
+            self.assertEqual(async_.context['items'], list(sync.context['items']))
+            self.assertEqual(async_.context['page_obj'].number, sync.context['page_obj'].number)
+            self.assertEqual(async_.context['paginator'].count, 14)
+            self.assertEqual(async_.context['is_paginated'], sync.context['is_paginated'])
+            self.assertEqual(list(async_.context['categories']), list(sync.context['categories']))
+            self.assertTemplateUsed(async_, 'marketplace/listing_list.html')
+        for page in (0, 3, 'first'):
+            sync, async_ = self.get_both('items/', {'page': page})
+            self.assertEqual((sync.status_code, async_.status_code), (404, 404))
+
+    def test_browse_last_page_counts_once(self):
+        """Test the async browse view counts the items once, on the last page as on any other."""
+        for page in (1, 'last'):
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.client.get('/async/items/', {'page': page}).status_code, 200)
+            counts = [query['sql'] for query in queries if 'COUNT(' in query['sql']]
+            self.assertEqual(len(counts), 1, counts)
+
+    def test_detail(self):
+        """Test the async detail view shows the same images and hides inactive listings."""
+        sync, async_ = self.get_both(f'items/{self.item.pk}/')
+        self.assertEqual(async_.context['item'], self.item)
+        self.assertEqual(async_.context['images'], list(sync.context['images']))
+        self.assertEqual(async_.context['primary_image'], sync.context['primary_image'])
+        self.assertContains(async_, 'listings/bowl-14.jpg')
+        inactive = Item.objects.get(title='Bowl 0')
+        sync, async_ = self.get_both(f'items/{inactive.pk}/')
+        self.assertEqual((sync.status_code, async_.status_code), (404, 404))
+
+    @override_settings(DEBUG=True)
+    def test_middleware_stack_stays_async(self):
+        """Test no middleware has to be adapted to sync under ASGI, so async views never wait on a thread."""
+        with self.assertNoLogs('django.request', 'DEBUG'):
+            handler = ASGIHandler()
+        self.assertTrue(iscoroutinefunction(handler._middleware_chain))
+
+    @override_settings(REQUEST_PROFILING=True, REQUEST_PROFILING_SAMPLE_RATE=0)
+    async def test_async_stack_measures_and_compresses(self):
+        """Test the async middleware path still times queries and templates and compresses the page."""
+        self.addCleanup(template_profiling.uninstall)
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+        response = await self.async_client.get('/async/items/', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertRegex(response['Server-Timing'], r'db;dur=[\d.]+;desc="[1-9]\d* queries"')
+        self.assertNotIn('tpl;dur=0.0;', response['Server-Timing'])
+        self.assertIn('http_responses_total{status="200",view="marketplace.views.AsyncItemListView"} 1', metrics.render())
+
+    def test_storefront(self):
+        """Test the async storefront lists the same items and only serves verified sellers."""
+        sync, async_ = self.get_both('sellers/potter/')
+        self.assertEqual(async_.context['profile'], sync.context['profile'])
+        self.assertEqual(async_.context['seller_items'], list(sync.context['seller_items']))
+        self.seller.profile.verification_status = 'pending'
+        self.seller.profile.save()
+        sync, async_ = self.get_both('sellers/potter/')
+        self.assertEqual((sync.status_code, async_.status_code), (404, 404))
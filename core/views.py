@@ -0,0 +1,27 @@
+"""
+Core views.
+"""
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
+
+from core import metrics
+
+
+def _may_scrape(request):
+    if request.user.is_authenticated and request.user.is_staff:
+        return True
+    if request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS:
+        return True
+    authorization = request.headers.get('Authorization', '')
+    return bool(settings.METRICS_TOKEN) and constant_time_compare(authorization, f'Bearer {settings.METRICS_TOKEN}')
+
+
+@require_GET
+def metrics_view(request):
+    """Prometheus metrics for internal scrapers; looks like any missing page to everyone else."""
+    if not _may_scrape(request):
+        raise Http404
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
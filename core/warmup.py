@@ -0,0 +1,170 @@
+"""
+Worker warm-up.
+
+The first request a fresh worker serves pays for work that every later
+request gets for free: compiling the URL patterns, loading and parsing
+templates, filling the category cache and opening database connections.
+config/wsgi.py and config/asgi.py call warm_up() at import time when
+WARMUP is on, so that work happens while the worker boots rather than
+while a user waits. WARMUP is off by default, because the connections it
+opens belong to whichever process imports the application.
+
+Each step is timed and logged; a failing step (say, the database not yet
+reachable) is logged and skipped, since a slower first request is better
+than a worker that will not start. Under ASGI, sync views run on their
+own thread with its own connections, so the database step only helps
+WSGI workers; the other steps are process-wide. Turn WARMUP on only
+where each worker imports the application itself. When a WSGI server
+loads the application before forking (gunicorn --preload), leave it off
+and call warm_up() from the server's post-fork hook instead, so that
+forked workers never share a database connection.
+
+import_times() covers the other half of a cold start: it imports the
+project's modules in a fresh interpreter under -X importtime, so the
+audit_imports command can show which of them (and which of their
+dependencies) are slow to import.
+"""
+
+import logging
+import os
+import pkgutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from django.template import TemplateDoesNotExist
+from django.template.loader import get_template
+from django.urls import URLResolver, get_resolver
+
+logger = logging.getLogger(__name__)
+
+
+def _walk(resolver):
+    yield resolver
+    for pattern in resolver.url_patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _walk(pattern)
+        else:
+            yield pattern
+
+
+def resolve_urls():
+    """Import every URLconf and compile every pattern's regex; returns the pattern count."""
+    count = 0
+    for pattern in _walk(get_resolver()):
+        pattern.pattern.regex  # compiled lazily, then cached on the pattern
+        if isinstance(pattern, URLResolver):
+            pattern.reverse_dict  # builds the reverse() lookup tables
+        else:
+            count += 1
+    return count
+
+
+def compile_templates():
+    """Load and parse WARMUP_TEMPLATES; returns the number compiled."""
+    count = 0
+    for name in settings.WARMUP_TEMPLATES:
+        try:
+            get_template(name)
+        except TemplateDoesNotExist:
+            logger.warning("Warm-up template %s does not exist", name)
+        else:
+            count += 1
+    return count
+
+
+def prime_categories():
+    """Fill the category cache; returns the number of categories."""
+    from marketplace.models import cached_categories
+
+    return len(cached_categories())
+
+
+def connect_databases():
+    """Open this thread's connection to every database; returns how many were opened."""
+    for connection in connections.all():
+        connection.ensure_connection()
+    return len(connections.all())
+
+
+STEPS = [
+    ('urls', resolve_urls),
+    ('templates', compile_templates),
+    ('categories', prime_categories),
+    ('databases', connect_databases),
+]
+
+
+def warm_up():
+    """Run every step and log how long each took; returns {step: (result, seconds)}."""
+    report = {}
+    started = time.perf_counter()
+    for name, step in STEPS:
+        step_started = time.perf_counter()
+        try:
+            result = step()
+        except Exception:
+            logger.exception("Warm-up step %s failed", name)
+            result = None
+        report[name] = (result, time.perf_counter() - step_started)
+    logger.info(
+        "Worker warmed up in %.0f ms (%s)",
+        (time.perf_counter() - started) * 1000,
+        ', '.join(f'{name} {result} in {seconds * 1000:.0f} ms' for name, (result, seconds) in report.items()),
+    )
+    return report
+
+
+def project_modules():
+    """The importable modules of the project's own apps, plus the root URLconf."""
+    modules = {settings.ROOT_URLCONF}
+    for app_config in apps.get_app_configs():
+        try:
+            Path(app_config.path).relative_to(settings.BASE_DIR)
+        except ValueError:
+            # Django's and third-party apps live outside the project
+            continue
+        modules.add(app_config.name)
+        for module in pkgutil.walk_packages([app_config.path], prefix=f'{app_config.name}.'):
+            # Tests, migrations and commands are not imported by a serving worker
+            if not {'tests', 'migrations', 'management'} & set(module.name.split('.')):
+                modules.add(module.name)
+    return sorted(modules)
+
+
+_IMPORT_SCRIPT = """
+import importlib, sys
+import django
+django.setup()
+for name in sys.argv[1:]:
+    importlib.import_module(name)
+"""
+
+
+def import_times(modules):
+    """
+    Import modules after django.setup() in a new interpreter run with
+    -X importtime. Returns (module, depth, self_us, cumulative_us) rows in
+    import order; depth 0 marks modules imported directly rather than by
+    another module.
+    """
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'config.settings')}
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _IMPORT_SCRIPT, *modules],
+        capture_output=True, text=True, cwd=settings.BASE_DIR, env=env,
+    )
+    if process.returncode:
+        raise RuntimeError(process.stderr.strip().splitlines()[-1])
+    rows = []
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        # Nested imports are indented by two spaces per level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), depth, int(own), int(cumulative)))
+    return rows
@@ -1,5 +1,10 @@
 from django.contrib import admin
-from .models import Category, Item, ItemImage
+from django.db.models import Count
+
+from core.paginator import EstimatedCountPaginator
+from .archive import restore_items
+from .models import ArchivedItem, ArchivedItemImage, Category, Item, ItemImage, ModerationJob
+from .moderation import admin_action, queue_job
 
 
 class ItemImageInline(admin.TabularInline):
@@ -16,20 +21,35 @@ class CategoryAdmin(admin.ModelAdmin):
     search_fields = ['name', 'description']
     ordering = ['name']
     
+    def get_queryset(self, request):
+        """Count items for every category in the changelist query."""
+        queryset = super().get_queryset(request)
+        return queryset.annotate(item_count=Count('items'))
+    
     def item_count(self, obj):
         """Display count of items in category."""
-        return obj.items.count()
+        return obj.item_count
     item_count.short_description = 'Items'
+    item_count.admin_order_field = 'item_count'
 
 
 @admin.register(Item)
 class ItemAdmin(admin.ModelAdmin):
     """Admin for Item model."""
-    list_display = ['title', 'seller', 'category', 'price', 'condition', 'is_active', 'created_at']
-    list_filter = ['is_active', 'condition', 'category', 'created_at']
+    list_display = ['title', 'seller', 'category', 'price', 'condition', 'is_active', 'status', 'created_at']
+    list_filter = ['is_active', 'status', 'condition', 'category', 'created_at']
     search_fields = ['title', 'description', 'seller__username']
     readonly_fields = ['created_at', 'updated_at']
+    autocomplete_fields = ['seller']
     inlines = [ItemImageInline]
+    # Newest first with a unique tie-breaker, served by the (-created_at, -id) index
+    ordering = ['-created_at', '-id']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = [
+        admin_action('deactivate_items', 'Deactivate selected items'),
+        admin_action('reactivate_items', 'Reactivate selected items'),
+    ]
     fieldsets = (
         ('Basic Info', {
             'fields': ('title', 'description', 'seller')
@@ -38,7 +58,7 @@ class ItemAdmin(admin.ModelAdmin):
             'fields': ('category', 'condition', 'brand', 'material', 'price', 'location')
         }),
         ('Status', {
-            'fields': ('is_active', 'created_at', 'updated_at')
+            'fields': ('is_active', 'status', 'created_at', 'updated_at')
         }),
     )
     
@@ -55,8 +75,79 @@ class ItemImageAdmin(admin.ModelAdmin):
     list_filter = ['is_primary', 'uploaded_at']
     search_fields = ['item__title']
     readonly_fields = ['uploaded_at']
+    autocomplete_fields = ['item']
+    ordering = ['-id']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
     def get_queryset(self, request):
         """Optimize queryset with select_related."""
         queryset = super().get_queryset(request)
         return queryset.select_related('item')
+
+
+@admin.register(ModerationJob)
+class ModerationJobAdmin(admin.ModelAdmin):
+    """Admin for ModerationJob model; shows progress of queued bulk actions."""
+    list_display = ['id', 'action', 'status', 'progress_display', 'changed', 'created_by', 'created_at', 'finished_at']
+    list_filter = ['status', 'action']
+    raw_id_fields = ['created_by']
+    readonly_fields = [
+        'action', 'total', 'processed', 'changed', 'status', 'error', 'attempts',
+        'created_by', 'created_at', 'started_at', 'heartbeat_at', 'finished_at',
+    ]
+    exclude = ['selection', 'last_pk']
+    actions = ['retry_jobs']
+    
+    def has_add_permission(self, request):
+        """Jobs are only created by bulk moderation actions."""
+        return False
+    
+    def progress_display(self, obj):
+        """Display processed/total with a percentage."""
+        return f"{obj.processed}/{obj.total} ({obj.progress}%)"
+    progress_display.short_description = 'Progress'
+    
+    @admin.action(description='Retry selected failed jobs')
+    def retry_jobs(self, request, queryset):
+        """Queue failed jobs again; they resume after the last finished batch."""
+        failed = list(queryset.filter(status='failed'))
+        for job in failed:
+            ModerationJob.objects.filter(pk=job.pk).update(status='pending', error='')
+            queue_job(job)
+        self.message_user(request, f"{len(failed)} job(s) queued again.")
+
+
+class ArchivedItemImageInline(admin.TabularInline):
+    """Read-only inline for archived item images."""
+    model = ArchivedItemImage
+    extra = 0
+    can_delete = False
+    readonly_fields = ['image', 'is_primary', 'uploaded_at']
+
+
+@admin.register(ArchivedItem)
+class ArchivedItemAdmin(admin.ModelAdmin):
+    """Admin for ArchivedItem model; archived listings can only be restored."""
+    list_display = ['id', 'title', 'seller', 'status', 'created_at', 'archived_at']
+    search_fields = ['title', 'seller__username']
+    raw_id_fields = ['seller']
+    list_select_related = ['seller']
+    inlines = [ArchivedItemImageInline]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ['restore']
+    
+    def has_add_permission(self, request):
+        """Items are only archived by the expiry job."""
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        """Archived rows are read-only."""
+        return False
+    
+    @admin.action(description='Restore selected items (inactive)')
+    def restore(self, request, queryset):
+        """Move the selected items back to the item table."""
+        restored = restore_items(list(queryset.values_list('pk', flat=True)))
+        self.message_user(request, f"{restored} item(s) restored; reactivate them from the item list.")
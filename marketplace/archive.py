@@ -0,0 +1,120 @@
+"""
+Expiry and archival of stale listings.
+
+expire_listings deactivates available listings older than
+LISTING_MAX_AGE_DAYS. archive_listings then moves items that have been
+inactive for LISTING_ARCHIVE_AFTER_DAYS, with their image rows, into
+ArchivedItem/ArchivedItemImage, so marketplace_item and its indexes stay
+sized to the live catalogue. Both walk the table in primary key order a
+batch at a time, each batch in its own short transaction. Items that
+took part in a transaction are never archived, because transactions
+keep a protected reference to them. restore_items moves archived items
+back under their original primary keys.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ArchivedItem, ArchivedItemImage, Item, ItemImage
+
+ITEM_FIELDS = [
+    'seller_id', 'title', 'description', 'category_id', 'price', 'condition',
+    'brand', 'material', 'location', 'status', 'created_at', 'updated_at',
+]
+IMAGE_FIELDS = ['item_id', 'is_primary', 'uploaded_at']
+
+
+def _keyset_batches(queryset, batch_size):
+    """Yield lists of primary keys from queryset in ascending order, batch_size at a time."""
+    last_pk = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not batch:
+            return
+        yield batch
+        last_pk = batch[-1]
+
+
+def expire_listings(batch_size=500, now=None):
+    """Deactivate available listings older than LISTING_MAX_AGE_DAYS; returns the number expired."""
+    now = now or timezone.now()
+    stale = Item.objects.filter(
+        is_active=True,
+        status='available',
+        created_at__lt=now - timedelta(days=settings.LISTING_MAX_AGE_DAYS),
+    )
+    expired = 0
+    for batch in _keyset_batches(stale, batch_size):
+        # Re-check the filter so a listing reserved meanwhile is left alone
+        expired += stale.filter(pk__in=batch).update(is_active=False, updated_at=now)
+    return expired
+
+
+def _archive_batch(ids):
+    with transaction.atomic():
+        items = list(
+            Item.objects.filter(pk__in=ids, is_active=False, transactions__isnull=True)
+            .values('pk', *ITEM_FIELDS)
+        )
+        if not items:
+            return 0
+        item_ids = [row['pk'] for row in items]
+        images = list(ItemImage.objects.filter(item_id__in=item_ids).values('pk', 'image', *IMAGE_FIELDS))
+
+        ArchivedItem.objects.bulk_create([
+            ArchivedItem(id=row.pop('pk'), **row) for row in items
+        ])
+        ArchivedItemImage.objects.bulk_create([
+            ArchivedItemImage(id=row.pop('pk'), **row) for row in images
+        ])
+        ItemImage.objects.filter(item_id__in=item_ids).delete()
+        Item.objects.filter(pk__in=item_ids).delete()
+    return len(item_ids)
+
+
+def archive_listings(batch_size=500, now=None):
+    """Move items inactive for LISTING_ARCHIVE_AFTER_DAYS into the archive; returns the number moved."""
+    now = now or timezone.now()
+    candidates = Item.objects.filter(
+        is_active=False,
+        updated_at__lt=now - timedelta(days=settings.LISTING_ARCHIVE_AFTER_DAYS),
+        transactions__isnull=True,
+    )
+    archived = 0
+    for batch in _keyset_batches(candidates, batch_size):
+        archived += _archive_batch(batch)
+    return archived
+
+
+def restore_items(ids):
+    """
+    Move archived items back into the item table, inactive, under their original keys.
+
+    Returns the number restored.
+    """
+    with transaction.atomic():
+        archived = list(ArchivedItem.objects.filter(pk__in=ids).values('pk', *ITEM_FIELDS))
+        if not archived:
+            return 0
+        item_ids = [row['pk'] for row in archived]
+        images = list(ArchivedItemImage.objects.filter(item_id__in=item_ids).values('pk', 'image', *IMAGE_FIELDS))
+
+        items = [Item(id=row.pop('pk'), is_active=False, **row) for row in archived]
+        restored_images = [ItemImage(id=row.pop('pk'), **row) for row in images]
+        # bulk_create applies auto_now/auto_now_add, so put the original timestamps back afterwards
+        timestamps = {item.pk: (item.created_at, item.updated_at) for item in items}
+        uploaded = {image.pk: image.uploaded_at for image in restored_images}
+        Item.objects.bulk_create(items)
+        ItemImage.objects.bulk_create(restored_images)
+        for item in items:
+            item.created_at, item.updated_at = timestamps[item.pk]
+        for image in restored_images:
+            image.uploaded_at = uploaded[image.pk]
+        Item.objects.bulk_update(items, ['created_at', 'updated_at'])
+        ItemImage.objects.bulk_update(restored_images, ['uploaded_at'])
+
+        ArchivedItem.objects.filter(pk__in=item_ids).delete()
+    return len(items)
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from marketplace.archive import archive_listings, expire_listings
+
+
+class Command(BaseCommand):
+    help = "Deactivate listings older than LISTING_MAX_AGE_DAYS and archive ones inactive for LISTING_ARCHIVE_AFTER_DAYS."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Items handled per database transaction")
+
+    def handle(self, *args, **options):
+        expired = expire_listings(batch_size=options['batch_size'])
+        archived = archive_listings(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Expired {expired} listing(s); archived {archived} listing(s)."))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from marketplace.models import ModerationJob
+from marketplace.moderation import process_pending_jobs
+
+
+class Command(BaseCommand):
+    help = "Run queued bulk moderation jobs, recording progress after every batch."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help="Objects updated per batch (default: MODERATION_BATCH_SIZE)")
+
+    def handle(self, *args, **options):
+        attempted = process_pending_jobs(batch_size=options['batch_size'])
+        failed = ModerationJob.objects.filter(status='failed').count()
+        self.stdout.write(self.style.SUCCESS(f"Processed {attempted} moderation job(s); {failed} failed job(s) awaiting retry."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from marketplace.archive import restore_items
+
+
+class Command(BaseCommand):
+    help = "Move archived listings back to the marketplace (inactive) by item id."
+
+    def add_arguments(self, parser):
+        parser.add_argument('item_ids', nargs='+', type=int, help="Ids of the archived items")
+
+    def handle(self, *args, **options):
+        restored = restore_items(options['item_ids'])
+        self.stdout.write(self.style.SUCCESS(f"Restored {restored} listing(s)."))
@@ -61,7 +61,7 @@ def seed_categories(apps, schema_editor):
     ]
     
     for category_data in categories:
-        Category.objects.get_or_create(
+        Category.objects.using(schema_editor.connection.alias).get_or_create(
             name=category_data["name"],
             defaults={
                 "description": category_data["description"],
@@ -73,7 +73,7 @@ def seed_categories(apps, schema_editor):
 def reverse_categories(apps, schema_editor):
     """Remove seeded categories (optional)"""
     Category = apps.get_model('marketplace', 'Category')
-    Category.objects.filter(
+    Category.objects.using(schema_editor.connection.alias).filter(
         name__in=[
             "Cutlery",
             "Cookware",
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0002_seed_default_categories'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='status',
+            field=models.CharField(choices=[('available', 'Available'), ('reserved', 'Reserved'), ('sold', 'Sold')], default='available', help_text='Sale status; only available items can be reserved by a buyer', max_length=20),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0003_item_status'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['-created_at', '-id'], name='marketplace_created_15948b_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:29
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('marketplace', '0004_item_marketplace_created_15948b_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModerationJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action', models.CharField(choices=[('deactivate_items', 'Deactivate items'), ('reactivate_items', 'Reactivate items'), ('suspend_sellers', 'Suspend sellers and hide their items'), ('reverify_sellers', 'Re-verify sellers')], help_text='Moderation action to apply', max_length=30)),
+                ('target_ids', models.JSONField(help_text='Primary keys of the selected items or seller profiles')),
+                ('total', models.PositiveIntegerField(help_text='Number of selected objects')),
+                ('processed', models.PositiveIntegerField(default=0, help_text='Number of selected objects handled so far')),
+                ('changed', models.PositiveIntegerField(default=0, help_text='Number of rows the action actually changed')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', help_text='Job progress', max_length=20)),
+                ('error', models.TextField(blank=True, help_text='Error that stopped the job, if any')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, help_text='Admin who started the job', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='moderation_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Moderation Job',
+                'verbose_name_plural': 'Moderation Jobs',
+                'ordering': ['-created_at', '-id'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='marketplace_status_da9961_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:36
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('marketplace', '0005_moderationjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedItem',
+            fields=[
+                ('id', models.BigIntegerField(help_text='Primary key the item had in the item table', primary_key=True, serialize=False)),
+                ('title', models.CharField(help_text='Item title', max_length=200)),
+                ('description', models.TextField(help_text='Detailed item description')),
+                ('price', models.DecimalField(decimal_places=2, help_text='Item price', max_digits=10)),
+                ('condition', models.CharField(choices=[('like_new', 'Like New'), ('good', 'Good'), ('fair', 'Fair'), ('needs_repair', 'Needs Repair')], help_text='Item condition', max_length=20)),
+                ('brand', models.CharField(blank=True, help_text='Brand/manufacturer name', max_length=100)),
+                ('material', models.CharField(blank=True, help_text='Primary material', max_length=100)),
+                ('location', models.CharField(help_text='Pickup/delivery location', max_length=200)),
+                ('status', models.CharField(choices=[('available', 'Available'), ('reserved', 'Reserved'), ('sold', 'Sold')], help_text='Sale status when archived', max_length=20)),
+                ('created_at', models.DateTimeField(help_text='When the item was listed')),
+                ('updated_at', models.DateTimeField(help_text='Last change before archiving')),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('category', models.ForeignKey(help_text='Item category', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_items', to='marketplace.category')),
+                ('seller', models.ForeignKey(help_text='Item seller', on_delete=django.db.models.deletion.CASCADE, related_name='archived_items', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Archived Item',
+                'verbose_name_plural': 'Archived Items',
+                'ordering': ['-archived_at', '-id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedItemImage',
+            fields=[
+                ('id', models.BigIntegerField(help_text='Primary key the image had in the image table', primary_key=True, serialize=False)),
+                ('image', models.CharField(help_text='Storage path of the image file', max_length=100)),
+                ('is_primary', models.BooleanField(default=False, help_text='Use as primary display image?')),
+                ('uploaded_at', models.DateTimeField(help_text='When the image was uploaded')),
+                ('item', models.ForeignKey(help_text='Archived item', on_delete=django.db.models.deletion.CASCADE, related_name='images', to='marketplace.archiveditem')),
+            ],
+            options={
+                'verbose_name': 'Archived Item Image',
+                'verbose_name_plural': 'Archived Item Images',
+                'ordering': ['-is_primary', 'uploaded_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archiveditem',
+            index=models.Index(fields=['seller', '-archived_at'], name='marketplace_seller__741aa8_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0006_archiveditem_archiveditemimage_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='item',
+            options={'ordering': ['-created_at', '-id'], 'verbose_name': 'Item', 'verbose_name_plural': 'Items'},
+        ),
+        migrations.RemoveIndex(
+            model_name='item',
+            name='marketplace_categor_34dd1b_idx',
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at', '-id'], name='item_active_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['category', '-created_at', '-id'], name='item_active_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['seller', '-created_at', '-id'], name='item_active_seller_idx'),
+        ),
+    ]
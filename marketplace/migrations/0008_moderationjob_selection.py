@@ -0,0 +1,52 @@
+# Generated by Django 4.2.7 on 2026-10-19 04:05
+
+from django.db import migrations, models
+
+
+def fail_unfinished_jobs(apps, schema_editor):
+    """Jobs queued with a list of primary keys cannot be resumed from a selection; ask for a rerun."""
+    ModerationJob = apps.get_model('marketplace', 'ModerationJob')
+    ModerationJob.objects.using(schema_editor.connection.alias).filter(status__in=['pending', 'running']).update(
+        status='failed', error="Queued before an upgrade; run the admin action again."
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0007_alter_item_options_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(fail_unfinished_jobs, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='moderationjob',
+            name='target_ids',
+        ),
+        migrations.AddField(
+            model_name='moderationjob',
+            name='selection',
+            field=models.BinaryField(default=b'', help_text='Pickled query selecting the items or seller profiles'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='moderationjob',
+            name='last_pk',
+            field=models.BigIntegerField(default=0, help_text='Highest primary key handled so far'),
+        ),
+        migrations.AddField(
+            model_name='moderationjob',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Number of times a worker has started the job'),
+        ),
+        migrations.AddField(
+            model_name='moderationjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, help_text='When the running worker last finished a batch', null=True),
+        ),
+        migrations.AlterField(
+            model_name='moderationjob',
+            name='total',
+            field=models.PositiveIntegerField(help_text='Number of selected objects when the job was queued'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-19 12:10
+
+from django.db import migrations, models
+
+
+def fail_unfinished_jobs(apps, schema_editor):
+    """Pickled selections are never loaded again, so unfinished jobs cannot continue; ask for a rerun."""
+    ModerationJob = apps.get_model('marketplace', 'ModerationJob')
+    ModerationJob.objects.using(schema_editor.connection.alias).filter(status__in=['pending', 'running']).update(
+        status='failed', error="Queued before an upgrade; run the admin action again."
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0008_moderationjob_selection'),
+    ]
+
+    operations = [
+        migrations.RunPython(fail_unfinished_jobs, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='moderationjob',
+            name='selection',
+        ),
+        migrations.AddField(
+            model_name='moderationjob',
+            name='selection',
+            field=models.JSONField(default=list, help_text='Selected primary keys, as [first, last] runs of consecutive keys'),
+        ),
+    ]
@@ -1,6 +1,12 @@
+from django.conf import settings
+from django.core.cache import cache
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.contrib.auth.models import User
 
+CATEGORY_CACHE_KEY = 'marketplace:categories'
+
 
 class Category(models.Model):
     """Product category for marketplace items."""
@@ -16,6 +22,22 @@ class Category(models.Model):
         return self.name
 
 
+def cached_categories():
+    """All categories ordered by name, read through the cache."""
+    categories = cache.get(CATEGORY_CACHE_KEY)
+    if categories is None:
+        categories = list(Category.objects.order_by('name'))
+        cache.set(CATEGORY_CACHE_KEY, categories, settings.CATEGORY_CACHE_TIMEOUT)
+    return categories
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_cache(sender, **kwargs):
+    """Drop the cached category list when a category changes."""
+    cache.delete(CATEGORY_CACHE_KEY)
+
+
 class Item(models.Model):
     """Marketplace item listing."""
     CONDITION_CHOICES = [
@@ -25,6 +47,12 @@ class Item(models.Model):
         ('needs_repair', 'Needs Repair'),
     ]
     
+    STATUS_CHOICES = [
+        ('available', 'Available'),
+        ('reserved', 'Reserved'),
+        ('sold', 'Sold'),
+    ]
+    
     seller = models.ForeignKey(User, on_delete=models.CASCADE, related_name='items', help_text="Item seller")
     title = models.CharField(max_length=200, help_text="Item title")
     description = models.TextField(help_text="Detailed item description")
@@ -35,16 +63,39 @@ class Item(models.Model):
     material = models.CharField(max_length=100, blank=True, help_text="Primary material")
     location = models.CharField(max_length=200, help_text="Pickup/delivery location")
     is_active = models.BooleanField(default=True, help_text="Is item currently available for sale?")
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='available',
+        help_text="Sale status; only available items can be reserved by a buyer"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
-        ordering = ['-created_at']
+        ordering = ['-created_at', '-id']
         verbose_name = 'Item'
         verbose_name_plural = 'Items'
         indexes = [
             models.Index(fields=['seller', '-created_at']),
-            models.Index(fields=['category', 'is_active']),
+            models.Index(fields=['-created_at', '-id']),
+            # Partial indexes over live listings, one per hot query's filter and sort:
+            # browse, browse by category, and a seller's storefront
+            models.Index(
+                fields=['-created_at', '-id'],
+                condition=models.Q(is_active=True),
+                name='item_active_recent_idx',
+            ),
+            models.Index(
+                fields=['category', '-created_at', '-id'],
+                condition=models.Q(is_active=True),
+                name='item_active_category_idx',
+            ),
+            models.Index(
+                fields=['seller', '-created_at', '-id'],
+                condition=models.Q(is_active=True),
+                name='item_active_seller_idx',
+            ),
         ]
     
     def __str__(self):
@@ -52,6 +103,10 @@ class Item(models.Model):
     
     def get_primary_image(self):
         """Get primary image for item or first image if none marked."""
+        if 'images' in getattr(self, '_prefetched_objects_cache', {}):
+            # Prefetched images are already ordered primary first
+            images = self.images.all()
+            return images[0] if images else None
         primary = self.images.filter(is_primary=True).first()
         if primary:
             return primary
@@ -72,3 +127,111 @@ class ItemImage(models.Model):
     
     def __str__(self):
         return f"Image for {self.item.title}"
+
+
+class ArchivedItem(models.Model):
+    """Long-inactive listing moved out of the item table; keeps the original primary key for restoring."""
+    id = models.BigIntegerField(primary_key=True, help_text="Primary key the item had in the item table")
+    seller = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_items', help_text="Item seller")
+    title = models.CharField(max_length=200, help_text="Item title")
+    description = models.TextField(help_text="Detailed item description")
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='archived_items',
+        help_text="Item category"
+    )
+    price = models.DecimalField(max_digits=10, decimal_places=2, help_text="Item price")
+    condition = models.CharField(max_length=20, choices=Item.CONDITION_CHOICES, help_text="Item condition")
+    brand = models.CharField(max_length=100, blank=True, help_text="Brand/manufacturer name")
+    material = models.CharField(max_length=100, blank=True, help_text="Primary material")
+    location = models.CharField(max_length=200, help_text="Pickup/delivery location")
+    status = models.CharField(max_length=20, choices=Item.STATUS_CHOICES, help_text="Sale status when archived")
+    created_at = models.DateTimeField(help_text="When the item was listed")
+    updated_at = models.DateTimeField(help_text="Last change before archiving")
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-archived_at', '-id']
+        verbose_name = 'Archived Item'
+        verbose_name_plural = 'Archived Items'
+        indexes = [
+            models.Index(fields=['seller', '-archived_at']),
+        ]
+    
+    def __str__(self):
+        return self.title
+
+
+class ArchivedItemImage(models.Model):
+    """Image row of an archived item; the file itself stays in storage."""
+    id = models.BigIntegerField(primary_key=True, help_text="Primary key the image had in the image table")
+    item = models.ForeignKey(ArchivedItem, on_delete=models.CASCADE, related_name='images', help_text="Archived item")
+    image = models.CharField(max_length=100, help_text="Storage path of the image file")
+    is_primary = models.BooleanField(default=False, help_text="Use as primary display image?")
+    uploaded_at = models.DateTimeField(help_text="When the image was uploaded")
+    
+    class Meta:
+        ordering = ['-is_primary', 'uploaded_at']
+        verbose_name = 'Archived Item Image'
+        verbose_name_plural = 'Archived Item Images'
+    
+    def __str__(self):
+        return f"Archived image for {self.item.title}"
+
+
+class ModerationJob(models.Model):
+    """Bulk moderation action queued from the admin because the selection was too large for one request."""
+    ACTION_CHOICES = [
+        ('deactivate_items', 'Deactivate items'),
+        ('reactivate_items', 'Reactivate items'),
+        ('suspend_sellers', 'Suspend sellers and hide their items'),
+        ('reverify_sellers', 'Re-verify sellers'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    
+    action = models.CharField(max_length=30, choices=ACTION_CHOICES, help_text="Moderation action to apply")
+    selection = models.JSONField(
+        default=list, help_text="Selected primary keys, as [first, last] runs of consecutive keys"
+    )
+    last_pk = models.BigIntegerField(default=0, help_text="Highest primary key handled so far")
+    total = models.PositiveIntegerField(help_text="Number of selected objects when the job was queued")
+    processed = models.PositiveIntegerField(default=0, help_text="Number of selected objects handled so far")
+    changed = models.PositiveIntegerField(default=0, help_text="Number of rows the action actually changed")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', help_text="Job progress")
+    error = models.TextField(blank=True, help_text="Error that stopped the job, if any")
+    attempts = models.PositiveSmallIntegerField(default=0, help_text="Number of times a worker has started the job")
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='moderation_jobs',
+        help_text="Admin who started the job"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True, help_text="When the running worker last finished a batch")
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at', '-id']
+        verbose_name = 'Moderation Job'
+        verbose_name_plural = 'Moderation Jobs'
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_action_display()} ({self.processed}/{self.total})"
+    
+    @property
+    def progress(self):
+        """Percentage of selected objects processed."""
+        return round(100 * self.processed / self.total) if self.total else 100
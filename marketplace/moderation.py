@@ -0,0 +1,223 @@
+"""
+Set-based moderation of items and sellers.
+
+Every action is a single UPDATE over the selected rows, so moderating a
+spam wave never loads or saves objects one by one. Admin actions apply
+small selections inline; larger ones are stored as a ModerationJob and
+handed to the background task queue. The job stores the selected
+primary keys as [first, last] runs of consecutive keys, plain JSON that
+stays small for the contiguous id ranges a spam wave produces, and walks
+them in key order a batch at a time, recording the last key after each
+batch so a failed or interrupted job resumes where it stopped. Jobs
+whose worker died mid-run are put back in the queue by
+requeue_stale_jobs, and failed after MAX_JOB_ATTEMPTS.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib import admin, messages
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from core.tasks import enqueue
+from users.models import UserProfile
+from .models import Item, ModerationJob
+
+
+def deactivate_items(items):
+    """Hide active items; returns the number changed."""
+    return items.filter(is_active=True).update(is_active=False, updated_at=timezone.now())
+
+
+def reactivate_items(items):
+    """Put hidden, unsold items back on sale; returns the number changed."""
+    return items.filter(is_active=False, status='available').update(is_active=True, updated_at=timezone.now())
+
+
+def suspend_sellers(profiles):
+    """Suspend seller profiles and hide all of their active items; returns the number of profiles changed."""
+    now = timezone.now()
+    with transaction.atomic():
+        changed = profiles.exclude(verification_status='suspended').update(
+            verification_status='suspended', updated_at=now
+        )
+        Item.objects.filter(
+            seller_id__in=profiles.values('user_id'), is_active=True
+        ).update(is_active=False, updated_at=now)
+    return changed
+
+
+def reverify_sellers(profiles):
+    """Mark seller profiles verified again; returns the number changed."""
+    return profiles.filter(is_seller=True).exclude(verification_status='verified').update(
+        verification_status='verified', updated_at=timezone.now()
+    )
+
+
+ACTIONS = {
+    'deactivate_items': (deactivate_items, Item),
+    'reactivate_items': (reactivate_items, Item),
+    'suspend_sellers': (suspend_sellers, UserProfile),
+    'reverify_sellers': (reverify_sellers, UserProfile),
+}
+
+
+# A job that keeps killing its worker is failed rather than retried forever
+MAX_JOB_ATTEMPTS = 3
+# Ranges OR'ed into one batch query, keeping its SQL well inside the database's parser limits
+MAX_RUNS_PER_BATCH = 100
+
+
+def key_runs(pks):
+    """Collapse ascending primary keys into [first, last] runs of consecutive keys."""
+    runs = []
+    for pk in pks:
+        if runs and pk == runs[-1][1] + 1:
+            runs[-1][1] = pk
+        else:
+            runs.append([pk, pk])
+    return runs
+
+
+def runs_filter(runs):
+    """A Q object matching the primary keys covered by runs."""
+    condition = Q(pk__in=[first for first, last in runs if first == last])
+    for first, last in runs:
+        if first != last:
+            condition |= Q(pk__range=(first, last))
+    return condition
+
+
+def job_batches(job, batch_size):
+    """
+    The job's runs after job.last_pk, split into lists covering at most
+    batch_size keys and MAX_RUNS_PER_BATCH runs each.
+    """
+    batch, size = [], 0
+    for first, last in job.selection:
+        first = max(first, job.last_pk + 1)
+        while first <= last:
+            end = min(last, first + batch_size - size - 1)
+            batch.append([first, end])
+            size += end - first + 1
+            first = end + 1
+            if size >= batch_size or len(batch) >= MAX_RUNS_PER_BATCH:
+                yield batch
+                batch, size = [], 0
+    if batch:
+        yield batch
+
+
+def run_or_queue(action, queryset, user=None):
+    """
+    Apply an action to a queryset now, or queue it if the selection is large.
+
+    Returns (changed, job): the number of rows changed inline and None, or
+    None and the queued ModerationJob.
+    """
+    ids = list(queryset.values_list('pk', flat=True)[:settings.MODERATION_INLINE_LIMIT + 1])
+    if len(ids) <= settings.MODERATION_INLINE_LIMIT:
+        handler, model = ACTIONS[action]
+        return handler(model.objects.filter(pk__in=ids)), None
+
+    runs = key_runs(queryset.order_by('pk').values_list('pk', flat=True).iterator())
+    with transaction.atomic():
+        job = ModerationJob.objects.create(
+            action=action, selection=runs, total=sum(last - first + 1 for first, last in runs), created_by=user,
+        )
+        queue_job(job)
+    return None, job
+
+
+def queue_job(job):
+    """Hand a pending job to the background workers."""
+    enqueue('marketplace.process_moderation_job', args=[job.pk], max_attempts=1, dedupe_key=f'moderation:{job.pk}')
+
+
+def admin_action(action, description):
+    """Build a ModelAdmin action that runs or queues a moderation action."""
+    @admin.action(description=description)
+    def run(modeladmin, request, queryset):
+        changed, job = run_or_queue(action, queryset, request.user)
+        if job is None:
+            modeladmin.message_user(request, f"{description}: {changed} row(s) updated.", messages.SUCCESS)
+        else:
+            modeladmin.message_user(
+                request,
+                f"{description}: {job.total} selected objects queued as moderation job #{job.pk}.",
+                messages.INFO,
+            )
+    run.__name__ = action
+    return run
+
+
+def process_job(job, batch_size=None):
+    """Work through a job's remaining targets in batches; returns False if another worker holds it."""
+    batch_size = batch_size or settings.MODERATION_BATCH_SIZE
+    now = timezone.now()
+    claimed = ModerationJob.objects.filter(pk=job.pk, status='pending').update(
+        status='running', attempts=F('attempts') + 1, heartbeat_at=now
+    )
+    if not claimed:
+        return False
+    ModerationJob.objects.filter(pk=job.pk, started_at__isnull=True).update(started_at=now)
+
+    job.refresh_from_db()
+    handler, model = ACTIONS[job.action]
+    try:
+        for runs in job_batches(job, batch_size):
+            end = runs[-1][1]
+            with transaction.atomic():
+                # Rows deleted since the job was queued are skipped, not counted
+                batch = list(model.objects.filter(runs_filter(runs)).values_list('pk', flat=True))
+                changed = handler(model.objects.filter(pk__in=batch)) if batch else 0
+                ModerationJob.objects.filter(pk=job.pk).update(
+                    processed=F('processed') + len(batch), changed=F('changed') + changed,
+                    last_pk=end, heartbeat_at=timezone.now(),
+                )
+            job.last_pk = end
+    except Exception as exc:
+        ModerationJob.objects.filter(pk=job.pk).update(status='failed', error=str(exc))
+        raise
+
+    ModerationJob.objects.filter(pk=job.pk).update(
+        status='done', total=F('processed'), finished_at=timezone.now()
+    )
+    return True
+
+
+def requeue_stale_jobs(now=None):
+    """
+    Requeue running jobs that have not finished a batch in
+    MODERATION_JOB_TIMEOUT_SECONDS (their worker died); jobs that have
+    already been started MAX_JOB_ATTEMPTS times are failed instead.
+    Returns the number of jobs requeued or failed.
+    """
+    now = now or timezone.now()
+    stale = ModerationJob.objects.filter(
+        status='running', heartbeat_at__lt=now - timedelta(seconds=settings.MODERATION_JOB_TIMEOUT_SECONDS)
+    )
+    handled = stale.filter(attempts__gte=MAX_JOB_ATTEMPTS).update(
+        status='failed', error=f"Worker stopped responding {MAX_JOB_ATTEMPTS} times."
+    )
+    for job in stale.filter(attempts__lt=MAX_JOB_ATTEMPTS):
+        with transaction.atomic():
+            if ModerationJob.objects.filter(pk=job.pk, status='running').update(status='pending'):
+                queue_job(job)
+                handled += 1
+    return handled
+
+
+def process_pending_jobs(batch_size=None):
+    """Run every pending job, oldest first; returns the number attempted."""
+    attempted = 0
+    for job in ModerationJob.objects.filter(status='pending').order_by('created_at', 'id').only('pk'):
+        try:
+            if process_job(job, batch_size):
+                attempted += 1
+        except Exception:
+            # Already recorded on the job; carry on with the rest of the queue
+            attempted += 1
+    return attempted
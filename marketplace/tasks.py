@@ -0,0 +1,62 @@
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from core.tasks import task
+from . import archive
+from .models import ItemImage, ModerationJob
+from .moderation import process_job, requeue_stale_jobs
+
+
+@task(priority=10)
+def process_item_image(image_id):
+    """Downscale an uploaded item image to ITEM_IMAGE_MAX_DIMENSION, dropping its metadata."""
+    item_image = ItemImage.objects.filter(pk=image_id).first()
+    if item_image is None:
+        return
+
+    with item_image.image.open('rb') as upload:
+        picture = Image.open(upload)
+        picture.load()
+    limit = settings.ITEM_IMAGE_MAX_DIMENSION
+    if max(picture.size) <= limit:
+        return
+
+    image_format = picture.format or 'JPEG'
+    picture = ImageOps.exif_transpose(picture)
+    picture.thumbnail((limit, limit))
+    if image_format == 'JPEG' and picture.mode not in ('RGB', 'L'):
+        picture = picture.convert('RGB')
+    buffer = BytesIO()
+    picture.save(buffer, format=image_format, quality=85, optimize=True)
+
+    # Write the new file and point the row at it before removing the original,
+    # so a failure part-way never leaves the listing without its image
+    storage = item_image.image.storage
+    old_name = item_image.image.name
+    new_name = storage.save(old_name, ContentFile(buffer.getvalue()))
+    ItemImage.objects.filter(pk=image_id).update(image=new_name)
+    storage.delete(old_name)
+
+
+@task(max_attempts=1)
+def process_moderation_job(job_id):
+    """Work through a queued bulk moderation job."""
+    job = ModerationJob.objects.filter(pk=job_id).first()
+    if job is not None:
+        process_job(job)
+
+
+@task
+def requeue_stale_moderation_jobs():
+    """Put moderation jobs whose worker died back in the queue."""
+    requeue_stale_jobs()
+
+
+@task
+def expire_listings():
+    """Deactivate old listings and archive long-inactive ones."""
+    archive.expire_listings()
+    archive.archive_listings()
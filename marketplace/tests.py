@@ -1,10 +1,20 @@
-from django.test import TestCase, Client
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection, transaction
 from django.contrib.auth.models import User
 from django.urls import reverse
 from django.core.files.uploadedfile import SimpleUploadedFile
-from marketplace.models import Category, Item, ItemImage
+from django.utils import timezone
+from marketplace import archive, moderation
+from marketplace.models import ArchivedItem, Category, Item, ItemImage, ModerationJob, cached_categories
+from marketplace.tasks import process_item_image
+from transactions.models import Transaction
+from users.models import UserProfile
 from PIL import Image
+from datetime import timedelta
 import io
+import re
+from unittest import mock
 
 
 class CategoryModelTests(TestCase):
@@ -44,6 +54,16 @@ class CategoryModelTests(TestCase):
         # Verify they're in alphabetical order
         self.assertEqual(test_categories, sorted(test_categories))
 
+    def test_cached_categories_invalidated_on_change(self):
+        """Test the cached category list is reused until a category changes."""
+        cached_categories()
+        with self.assertNumQueries(0):
+            self.assertIn(self.category, cached_categories())
+        self.category.delete()
+        self.assertNotIn(self.category, cached_categories())
+        added = Category.objects.create(name='Glassware_Test')
+        self.assertIn(added, cached_categories())
+
 
 class ItemModelTests(TestCase):
     """Tests for Item model."""
@@ -154,6 +174,39 @@ class ItemImageModelTests(TestCase):
         self.assertEqual(item_image.item, self.item)
         self.assertTrue(item_image.is_primary)
     
+    @override_settings(ITEM_IMAGE_MAX_DIMENSION=40)
+    def test_oversized_image_is_downscaled(self):
+        """Test the background image task shrinks large uploads."""
+        image_io = io.BytesIO()
+        Image.new('RGB', (100, 80), color='blue').save(image_io, format='JPEG')
+        item_image = ItemImage.objects.create(
+            item=self.item,
+            image=SimpleUploadedFile('big.jpg', image_io.getvalue(), content_type='image/jpeg')
+        )
+        original = item_image.image.name
+        process_item_image(item_image.pk)
+        
+        item_image.refresh_from_db()
+        with item_image.image.open('rb') as stored:
+            self.assertEqual(Image.open(stored).size, (40, 32))
+        self.assertFalse(item_image.image.storage.exists(original))
+
+    @override_settings(ITEM_IMAGE_MAX_DIMENSION=40)
+    def test_failed_downscale_save_keeps_original(self):
+        """Test the original image survives when saving the downscaled copy fails."""
+        image_io = io.BytesIO()
+        Image.new('RGB', (100, 80), color='green').save(image_io, format='JPEG')
+        item_image = ItemImage.objects.create(
+            item=self.item,
+            image=SimpleUploadedFile('keep.jpg', image_io.getvalue(), content_type='image/jpeg')
+        )
+        storage = item_image.image.storage
+        with mock.patch.object(storage, 'save', side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                process_item_image(item_image.pk)
+        item_image.refresh_from_db()
+        self.assertTrue(storage.exists(item_image.image.name))
+    
     def test_item_multiple_images(self):
         """Test item can have multiple images."""
         # Create test images
@@ -252,6 +305,29 @@ class ItemListViewTests(TestCase):
         self.assertContains(response, 'Skillet')
         self.assertNotContains(response, 'Baking Pan')
 
+    def test_item_list_queries_do_not_grow_with_items(self):
+        """Test images and seller profiles on the page do not cost a query per item."""
+        for n in range(3):
+            item = Item.objects.create(
+                seller=self.user, title=f'Pot {n}', description='Test', category=self.category,
+                price=10, condition='good', location='Test'
+            )
+            ItemImage.objects.create(item=item, image=f'listings/pot-{n}.jpg')
+        self.client.get(reverse('marketplace:list'))  # fill the category cache
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(reverse('marketplace:list'))
+
+        for n in range(6):
+            item = Item.objects.create(
+                seller=User.objects.create_user(username=f'other{n}'), title=f'Pan {n}', description='Test',
+                category=self.category, price=10, condition='good', location='Test'
+            )
+            ItemImage.objects.create(item=item, image=f'listings/pan-{n}.jpg', is_primary=True)
+        with CaptureQueriesContext(connection) as more:
+            response = self.client.get(reverse('marketplace:list'))
+        self.assertEqual(len(more), len(few))
+        self.assertContains(response, 'listings/pan-5.jpg')
+
 
 class ItemDetailViewTests(TestCase):
     """Tests for ItemDetailView."""
@@ -496,3 +572,266 @@ class MarketplaceIntegrationTests(TestCase):
         # Verify soft delete using _base_manager
         item_after_delete = Item._base_manager.get(pk=item.pk)
         self.assertFalse(item_after_delete.is_active)
+
+
+class MarketplaceAdminTests(TestCase):
+    """Tests for admin changelists over marketplace tables."""
+
+    def setUp(self):
+        """Create a superuser, categories and items."""
+        self.client = Client()
+        self.admin = User.objects.create_superuser(username='admin', password='testpass', email='a@example.com')
+        self.client.login(username='admin', password='testpass')
+        for index in range(5):
+            category = Category.objects.create(name=f'Category {index}')
+            Item.objects.create(
+                seller=self.admin, title=f'Item {index}', description='Test', category=category,
+                price=10, condition='good', location='Test Location'
+            )
+
+    def test_category_counts_are_annotated(self):
+        """Test the category changelist does not count items per row."""
+        url = reverse('admin:marketplace_category_changelist')
+        self.client.get(url)
+        with self.assertNumQueries(5):
+            response = self.client.get(url)
+        self.assertContains(response, 'Category 4')
+
+    def test_item_changelist_and_autocomplete_seller(self):
+        """Test the item changelist loads and the seller field uses autocomplete."""
+        self.assertEqual(self.client.get(reverse('admin:marketplace_item_changelist')).status_code, 200)
+        response = self.client.get(reverse('admin:marketplace_item_add'))
+        self.assertContains(response, 'admin-autocomplete')
+
+
+class ModerationTests(TestCase):
+    """Tests for set-based moderation actions and queued jobs."""
+
+    def setUp(self):
+        """Create a seller profile with several items."""
+        self.seller = User.objects.create_user(username='spammer', password='testpass')
+        self.seller.profile.is_seller = True
+        self.seller.profile.verification_status = 'verified'
+        self.seller.profile.save()
+        self.category = Category.objects.create(name='Moderation_Test')
+        for index in range(6):
+            Item.objects.create(
+                seller=self.seller, title=f'Spam {index}', description='Test', category=self.category,
+                price=1, condition='good', location='Test Location'
+            )
+
+    def test_deactivate_is_one_update(self):
+        """Test deactivating a selection issues a single UPDATE."""
+        items = Item.objects.filter(seller=self.seller)
+        with self.assertNumQueries(1):
+            changed = moderation.deactivate_items(items)
+        self.assertEqual(changed, 6)
+        self.assertFalse(Item.objects.filter(is_active=True).exists())
+
+    def test_reactivate_skips_sold_items(self):
+        """Test sold items stay hidden when reactivating."""
+        Item.objects.update(is_active=False)
+        Item.objects.filter(title='Spam 0').update(status='sold')
+        self.assertEqual(moderation.reactivate_items(Item.objects.all()), 5)
+
+    def test_suspend_hides_items_and_reverify(self):
+        """Test suspending a seller hides their items and re-verifying restores the status."""
+        profiles = UserProfile.objects.filter(user=self.seller)
+        self.assertEqual(moderation.suspend_sellers(profiles), 1)
+        self.assertEqual(profiles.get().verification_status, 'suspended')
+        self.assertFalse(Item.objects.filter(seller=self.seller, is_active=True).exists())
+
+        self.assertEqual(moderation.reverify_sellers(profiles), 1)
+        self.assertEqual(profiles.get().verification_status, 'verified')
+
+    @override_settings(MODERATION_INLINE_LIMIT=3, MODERATION_BATCH_SIZE=4)
+    def test_large_selection_is_queued_and_processed(self):
+        """Test selections over the inline limit run as a batched job."""
+        changed, job = moderation.run_or_queue('deactivate_items', Item.objects.all())
+        self.assertIsNone(changed)
+        self.assertEqual((job.status, job.total), ('pending', 6))
+        self.assertEqual(Item.objects.filter(is_active=True).count(), 6)
+
+        self.assertEqual(moderation.process_pending_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed, job.changed, job.progress), ('done', 6, 6, 100))
+        self.assertFalse(Item.objects.filter(is_active=True).exists())
+        self.assertFalse(moderation.process_job(job))
+
+    @override_settings(MODERATION_INLINE_LIMIT=3, MODERATION_BATCH_SIZE=2)
+    def test_job_stores_key_runs_and_resumes_after_last_pk(self):
+        """Test a job stores its selection as plain key runs and resumes after the last batch."""
+        pks = list(Item.objects.order_by('pk').values_list('pk', flat=True))
+        Item.objects.filter(pk=pks[2]).update(is_active=False)
+        _, job = moderation.run_or_queue('deactivate_items', Item.objects.filter(is_active=True, seller=self.seller))
+        job.refresh_from_db()
+        self.assertEqual(job.total, 5)
+        self.assertEqual(job.selection, [[pks[0], pks[1]], [pks[3], pks[5]]])
+
+        # Rows added after queueing are not part of the selection, deleted ones are skipped
+        Item.objects.filter(pk=pks[4]).delete()
+        Item.objects.create(
+            seller=self.seller, title='Spam late', description='Test', category=self.category,
+            price=1, condition='good', location='Test Location'
+        )
+        ModerationJob.objects.filter(pk=job.pk).update(last_pk=pks[1], processed=2)
+        self.assertTrue(moderation.process_job(job))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed, job.changed, job.last_pk), ('done', 4, 2, pks[5]))
+        self.assertEqual(
+            set(Item.objects.filter(is_active=True).values_list('title', flat=True)), {'Spam 0', 'Spam 1', 'Spam late'}
+        )
+
+    def test_job_batches_cap_keys_and_runs(self):
+        """Test scattered keys are split into batches under the key and run limits."""
+        job = ModerationJob(action='deactivate_items', selection=moderation.key_runs([1, 2, 3, 7, 9, 10]), total=6)
+        self.assertEqual(job.selection, [[1, 3], [7, 7], [9, 10]])
+        self.assertEqual(list(moderation.job_batches(job, 2)), [[[1, 2]], [[3, 3], [7, 7]], [[9, 10]]])
+        job.last_pk = 7
+        self.assertEqual(list(moderation.job_batches(job, 10)), [[[9, 10]]])
+        job.selection = [[pk, pk] for pk in range(1, 400, 2)]
+        job.last_pk = 0
+        batches = list(moderation.job_batches(job, 500))
+        self.assertEqual([len(batch) for batch in batches], [moderation.MAX_RUNS_PER_BATCH] * 2)
+
+    @override_settings(MODERATION_INLINE_LIMIT=3, MODERATION_JOB_TIMEOUT_SECONDS=60)
+    def test_stale_running_job_is_requeued_then_failed(self):
+        """Test a job whose worker died is requeued, and failed after repeated deaths."""
+        _, job = moderation.run_or_queue('deactivate_items', Item.objects.all())
+        stale = timezone.now() - timedelta(minutes=5)
+        ModerationJob.objects.filter(pk=job.pk).update(status='running', attempts=1, heartbeat_at=stale)
+        self.assertEqual(moderation.requeue_stale_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'pending')
+        self.assertTrue(moderation.process_job(job))
+
+        ModerationJob.objects.filter(pk=job.pk).update(
+            status='running', attempts=moderation.MAX_JOB_ATTEMPTS, heartbeat_at=stale
+        )
+        self.assertEqual(moderation.requeue_stale_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertEqual(moderation.requeue_stale_jobs(), 0)
+
+    def test_admin_action_applies_inline(self):
+        """Test the item admin action deactivates the selected items."""
+        User.objects.create_superuser(username='admin', password='testpass', email='a@example.com')
+        self.client.login(username='admin', password='testpass')
+        selected = list(Item.objects.values_list('pk', flat=True)[:2])
+        self.client.post(reverse('admin:marketplace_item_changelist'), {
+            'action': 'deactivate_items',
+            '_selected_action': selected,
+        })
+        self.assertEqual(Item.objects.filter(is_active=False).count(), 2)
+
+
+class ListingArchiveTests(TestCase):
+    """Tests for listing expiry, archival and restore."""
+
+    def setUp(self):
+        """Create a seller with an old listing and a fresh one."""
+        self.seller = User.objects.create_user(username='seller', password='testpass')
+        self.category = Category.objects.create(name='Archive_Test')
+        self.old = self.create_item('Old pan', days=400)
+        self.fresh = self.create_item('New pan', days=1)
+        ItemImage.objects.create(item=self.old, image='listings/old.jpg', is_primary=True)
+
+    def create_item(self, title, days):
+        item = Item.objects.create(
+            seller=self.seller, title=title, description='Test', category=self.category,
+            price=15, condition='good', location='Test Location'
+        )
+        stamp = timezone.now() - timedelta(days=days)
+        Item.objects.filter(pk=item.pk).update(created_at=stamp, updated_at=stamp)
+        return Item.objects.get(pk=item.pk)
+
+    def test_expire_deactivates_old_listings(self):
+        """Test only listings past the maximum age are deactivated."""
+        self.assertEqual(archive.expire_listings(batch_size=1), 1)
+        self.assertFalse(Item.objects.get(pk=self.old.pk).is_active)
+        self.assertTrue(Item.objects.get(pk=self.fresh.pk).is_active)
+
+    def test_archive_and_restore(self):
+        """Test long-inactive items move to the archive with their images and come back intact."""
+        Item.objects.filter(pk=self.old.pk).update(is_active=False)
+        self.assertEqual(archive.archive_listings(batch_size=1), 1)
+        self.assertFalse(Item.objects.filter(pk=self.old.pk).exists())
+        self.assertFalse(ItemImage.objects.filter(item_id=self.old.pk).exists())
+        archived = ArchivedItem.objects.get(pk=self.old.pk)
+        self.assertEqual(archived.images.get().image, 'listings/old.jpg')
+
+        self.assertEqual(archive.restore_items([self.old.pk]), 1)
+        restored = Item.objects.get(pk=self.old.pk)
+        self.assertFalse(restored.is_active)
+        self.assertEqual(restored.created_at, self.old.created_at)
+        self.assertEqual(restored.images.get().image.name, 'listings/old.jpg')
+        self.assertFalse(ArchivedItem.objects.exists())
+
+    def test_recently_deactivated_and_sold_items_stay(self):
+        """Test items inactive for a short time or with transactions are not archived."""
+        Item.objects.filter(pk=self.fresh.pk).update(is_active=False)
+        Item.objects.filter(pk=self.old.pk).update(is_active=False)
+        buyer = User.objects.create_user(username='buyer', password='testpass')
+        Transaction.objects.create(buyer=buyer, seller=self.seller, item=self.old, price=15, status='completed')
+        self.assertEqual(archive.archive_listings(), 0)
+
+
+def explain(sql):
+    """Return the query plan of a captured statement as text, preferring indexes on PostgreSQL."""
+    with transaction.atomic(), connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            # Test tables are tiny, so make the planner show which index it would use at scale
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute('EXPLAIN ' + sql)
+            return '\n'.join(row[0] for row in cursor.fetchall())
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+        return '\n'.join(row[-1] for row in cursor.fetchall())
+
+
+PLAN_PROBLEMS = [
+    # SQLite: full table scan, or sorting rows instead of reading them in index order
+    re.compile(r'SCAN marketplace_item(?! USING)'),
+    re.compile(r'USE TEMP B-TREE FOR ORDER BY'),
+    # PostgreSQL equivalents
+    re.compile(r'Seq Scan on marketplace_item'),
+    re.compile(r'Sort Key: marketplace_item\.created_at'),
+]
+
+
+class ItemQueryPlanTests(TestCase):
+    """EXPLAIN the item queries views run and fail if they scan or sort the item table."""
+
+    def setUp(self):
+        """Create a verified seller with listings."""
+        self.client = Client()
+        self.seller = User.objects.create_user(username='seller', password='testpass')
+        UserProfile.objects.filter(user=self.seller).update(is_seller=True, verification_status='verified')
+        self.category = Category.objects.create(name='Plan_Test')
+        for index in range(15):
+            Item.objects.create(
+                seller=self.seller, title=f'Pot {index}', description='Test', category=self.category,
+                price=10, condition='good', location='Test Location', is_active=index % 3 != 0
+            )
+
+    def assert_indexed(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        statements = [query['sql'] for query in queries if 'FROM "marketplace_item"' in query['sql']]
+        self.assertTrue(statements, f"{url} ran no item queries")
+        for sql in statements:
+            plan = explain(sql)
+            for problem in PLAN_PROBLEMS:
+                self.assertIsNone(problem.search(plan), f"{url}\n{sql}\n{plan}")
+            self.assertIn('item_active_', plan, f"{url} did not use a partial index\n{sql}\n{plan}")
+
+    def test_browse(self):
+        """Test the marketplace browse query uses the active listings index."""
+        self.assert_indexed(reverse('marketplace:list'))
+
+    def test_category_browse(self):
+        """Test browsing a category uses the active category index."""
+        self.assert_indexed(reverse('marketplace:list') + f'?category={self.category.pk}')
+
+    def test_seller_storefront(self):
+        """Test a seller storefront uses the active seller index."""
+        self.assert_indexed(reverse('users:seller_profile', args=['seller']))
@@ -1,13 +1,20 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
 app_name = 'marketplace'
 
+# Async implementations of the read-only views for ASGI deployments
+if settings.ASYNC_VIEWS:
+    list_view, detail_view = views.AsyncItemListView, views.AsyncItemDetailView
+else:
+    list_view, detail_view = views.ItemListView, views.ItemDetailView
+
 urlpatterns = [
     # Listing views
-    path('', views.ItemListView.as_view(), name='list'),
+    path('', list_view.as_view(), name='list'),
     path('create/', views.ItemCreateView.as_view(), name='create'),
-    path('<int:pk>/', views.ItemDetailView.as_view(), name='detail'),
+    path('<int:pk>/', detail_view.as_view(), name='detail'),
     path('<int:pk>/edit/', views.ItemUpdateView.as_view(), name='edit'),
     path('<int:pk>/delete/', views.ItemDeleteView.as_view(), name='delete'),
 ]
@@ -1,10 +1,17 @@
+import asyncio
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.core.paginator import InvalidPage, Page
+from django.http import Http404
 from django.shortcuts import render, redirect, get_object_or_404
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib import messages
 from django.urls import reverse_lazy
-from .models import Item, Category, ItemImage
+from .models import Item, ItemImage, cached_categories
 from .forms import ItemCreationForm, ItemImageForm
+from .tasks import process_item_image
 
 
 class ItemListView(ListView):
@@ -17,7 +24,7 @@ class ItemListView(ListView):
     def get_queryset(self):
         """Filter for active items and optimize with select_related."""
         queryset = Item.objects.filter(is_active=True).select_related(
-            'seller', 'category'
+            'seller', 'seller__profile', 'category'
         ).prefetch_related('images')
         
         # Filter by category if provided
@@ -30,7 +37,7 @@ class ItemListView(ListView):
     def get_context_data(self, **kwargs):
         """Add categories to context."""
         context = super().get_context_data(**kwargs)
-        context['categories'] = Category.objects.all().order_by('name')
+        context['categories'] = cached_categories()
         context['selected_category'] = self.request.GET.get('category')
         return context
 
@@ -52,9 +59,94 @@ class ItemDetailView(DetailView):
         context = super().get_context_data(**kwargs)
         context['images'] = self.object.images.all()
         context['primary_image'] = self.object.get_primary_image()
+        # Lets a double-submitted or retried "Buy Now" reserve the item only once
+        context['idempotency_key'] = uuid.uuid4().hex
         return context
 
 
+async def _alist(queryset):
+    """Evaluate a queryset (with its prefetches) without blocking the event loop."""
+    return [obj async for obj in queryset]
+
+
+class AsyncItemListView(ItemListView):
+    """
+    ItemListView for ASGI deployments (settings.ASYNC_VIEWS).
+
+    The page of items, the total count and the category list are awaited
+    together with the async ORM and passed to the same template, under the
+    same context names, as the sync view. Django 4.2 still runs a request's
+    ORM calls in turn on one thread; they overlap once the ORM has native
+    async database access.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        queryset = self.get_queryset()
+        paginator = self.get_paginator(queryset, self.paginate_by)
+        page_number = request.GET.get('page') or 1
+        count = None
+        if page_number == 'last':
+            # The last page number needs the count up front; it is not fetched again below
+            count = await queryset.acount()
+            paginator.count = count
+            page_number = paginator.num_pages
+        try:
+            number = int(page_number)
+        except ValueError:
+            raise Http404("Page is not “last”, nor can it be converted to an int.")
+        if number < 1:
+            raise Http404("That page number is less than 1")
+
+        offset = (number - 1) * self.paginate_by
+        items, categories, *counted = await asyncio.gather(
+            _alist(queryset[offset:offset + self.paginate_by]),
+            sync_to_async(cached_categories)(),
+            *([queryset.acount()] if count is None else []),
+        )
+        # Paginator.count is a cached_property; seed it with the count fetched above
+        paginator.count = counted[0] if counted else count
+        try:
+            page = Page(items, paginator.validate_number(number), paginator)
+        except InvalidPage as exc:
+            raise Http404(f"Invalid page ({number}): {exc}")
+
+        self.object_list = items
+        return self.render_to_response({
+            'view': self,
+            'paginator': paginator,
+            'page_obj': page,
+            'is_paginated': page.has_other_pages(),
+            'object_list': items,
+            self.context_object_name: items,
+            'categories': categories,
+            'selected_category': request.GET.get('category'),
+        })
+
+
+class AsyncItemDetailView(ItemDetailView):
+    """ItemDetailView for ASGI deployments; the item and its images are awaited together."""
+
+    async def get(self, request, *args, **kwargs):
+        pk = self.kwargs[self.pk_url_kwarg]
+        try:
+            self.object, images = await asyncio.gather(
+                self.get_queryset().prefetch_related(None).aget(pk=pk),
+                _alist(ItemImage.objects.filter(item_id=pk)),
+            )
+        except Item.DoesNotExist:
+            raise Http404("No item found matching the query")
+
+        return self.render_to_response({
+            'view': self,
+            'object': self.object,
+            self.context_object_name: self.object,
+            'images': images,
+            # Images are ordered primary first, as get_primary_image() picks them
+            'primary_image': images[0] if images else None,
+            'idempotency_key': uuid.uuid4().hex,
+        })
+
+
 class ItemCreateView(LoginRequiredMixin, CreateView):
     """Create a new marketplace item."""
     model = Item
@@ -79,11 +171,13 @@ class ItemCreateView(LoginRequiredMixin, CreateView):
         images = self.request.FILES.getlist('images')
         is_primary = True
         for image_file in images:
-            ItemImage.objects.create(
+            item_image = ItemImage.objects.create(
                 item=self.object,
                 image=image_file,
                 is_primary=is_primary
             )
+            # Resizing happens in a background worker, not in the request
+            process_item_image.delay(item_image.pk)
             is_primary = False
         
         messages.success(self.request, "Item created successfully!")
@@ -123,11 +217,12 @@ class ItemUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
             is_primary = not has_primary
             
             for image_file in images:
-                ItemImage.objects.create(
+                item_image = ItemImage.objects.create(
                     item=self.object,
                     image=image_file,
                     is_primary=is_primary
                 )
+                process_item_image.delay(item_image.pk)
                 is_primary = False
         
         messages.success(self.request, "Item updated successfully!")
@@ -1,3 +1,30 @@
 from django.contrib import admin
 
-# Admin will be configured in Phase 5
+from core.paginator import EstimatedCountPaginator
+from .models import Conversation, Message
+
+
+@admin.register(Conversation)
+class ConversationAdmin(admin.ModelAdmin):
+    """Admin for Conversation model."""
+    list_display = ['id', 'item', 'created_at', 'updated_at']
+    raw_id_fields = ['item']
+    filter_horizontal = ['participants']
+    readonly_fields = ['first_participant', 'second_participant', 'created_at', 'updated_at']
+
+
+@admin.register(Message)
+class MessageAdmin(admin.ModelAdmin):
+    """Admin for Message model."""
+    list_display = ['id', 'conversation', 'sender', 'is_read', 'created_at']
+    list_filter = ['is_read']
+    search_fields = ['content', 'sender__username']
+    raw_id_fields = ['conversation', 'sender']
+    readonly_fields = ['created_at']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    
+    def get_queryset(self, request):
+        """Optimize queryset with select_related."""
+        queryset = super().get_queryset(request)
+        return queryset.select_related('conversation', 'sender')
@@ -3,3 +3,8 @@ from django.apps import AppConfig
 class MessagingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'messaging'
+
+    def ready(self):
+        from core import counters
+        from .models import unread_message_count
+        counters.register('unread_messages', unread_message_count)
@@ -0,0 +1,20 @@
+from django import forms
+from .models import Message
+
+
+class MessageForm(forms.ModelForm):
+    """Form for sending a message in a conversation."""
+    
+    content = forms.CharField(
+        max_length=2000,
+        widget=forms.Textarea(attrs={
+            'class': 'form-control',
+            'rows': 3,
+            'placeholder': 'Write a message...'
+        }),
+        help_text='Your message (max 2000 characters)'
+    )
+    
+    class Meta:
+        model = Message
+        fields = ['content']
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:12
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('marketplace', '0002_seed_default_categories'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Conversation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('item', models.ForeignKey(blank=True, help_text='Listing the conversation started from', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='conversations', to='marketplace.item')),
+                ('participants', models.ManyToManyField(help_text='Users taking part in the conversation', related_name='conversations', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Conversation',
+                'verbose_name_plural': 'Conversations',
+                'ordering': ['-updated_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Message',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content', models.TextField(help_text='Message body')),
+                ('is_read', models.BooleanField(default=False, help_text='Has the recipient seen this message?')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('conversation', models.ForeignKey(help_text='Conversation thread', on_delete=django.db.models.deletion.CASCADE, related_name='messages', to='messaging.conversation')),
+                ('sender', models.ForeignKey(help_text='Message author', on_delete=django.db.models.deletion.CASCADE, related_name='sent_messages', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Message',
+                'verbose_name_plural': 'Messages',
+                'ordering': ['created_at', 'id'],
+                'indexes': [models.Index(fields=['conversation', 'created_at', 'id'], name='messaging_m_convers_1f1ac3_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_participant_pairs(apps, schema_editor):
+    """Record each conversation's pair, merging duplicate conversations into the oldest."""
+    Conversation = apps.get_model('messaging', 'Conversation')
+    Message = apps.get_model('messaging', 'Message')
+    kept = {}
+    for conversation in Conversation.objects.order_by('pk').prefetch_related('participants'):
+        user_ids = sorted(user.pk for user in conversation.participants.all())
+        if len(user_ids) != 2:
+            continue
+        pair = tuple(user_ids)
+        if pair in kept:
+            Message.objects.filter(conversation=conversation).update(conversation_id=kept[pair])
+            conversation.delete()
+            continue
+        kept[pair] = conversation.pk
+        Conversation.objects.filter(pk=conversation.pk).update(
+            first_participant_id=pair[0], second_participant_id=pair[1],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('messaging', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='first_participant',
+            field=models.ForeignKey(blank=True, help_text='Participant with the lower user id', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='second_participant',
+            field=models.ForeignKey(blank=True, help_text='Participant with the higher user id', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(fill_participant_pairs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='conversation',
+            constraint=models.UniqueConstraint(fields=('first_participant', 'second_participant'), name='unique_conversation_per_pair'),
+        ),
+    ]
@@ -1,3 +1,93 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.contrib.auth.models import User
 
-# Models will be added in Phase 5
+
+class Conversation(models.Model):
+    """Private thread between a buyer and a seller."""
+    participants = models.ManyToManyField(User, related_name='conversations', help_text="Users taking part in the conversation")
+    item = models.ForeignKey(
+        'marketplace.Item',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='conversations',
+        help_text="Listing the conversation started from"
+    )
+    # The participants again, lower user id first, so the database allows one conversation per pair
+    first_participant = models.ForeignKey(
+        User, on_delete=models.CASCADE, null=True, blank=True, related_name='+',
+        help_text="Participant with the lower user id"
+    )
+    second_participant = models.ForeignKey(
+        User, on_delete=models.CASCADE, null=True, blank=True, related_name='+',
+        help_text="Participant with the higher user id"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-updated_at']
+        verbose_name = 'Conversation'
+        verbose_name_plural = 'Conversations'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['first_participant', 'second_participant'], name='unique_conversation_per_pair'
+            ),
+        ]
+
+    def __str__(self):
+        return f"Conversation {self.id}"
+
+    @staticmethod
+    def _pair(user, other):
+        first, second = sorted((user, other), key=lambda participant: participant.pk)
+        return {'first_participant': first, 'second_participant': second}
+
+    @classmethod
+    def between(cls, user, other):
+        """Return the conversation shared by two users, or None."""
+        return cls.objects.filter(**cls._pair(user, other)).first()
+
+    @classmethod
+    def get_or_create_between(cls, user, other, item=None):
+        """Return the conversation shared by two users, creating it if needed."""
+        conversation = cls.between(user, other)
+        if conversation is not None:
+            return conversation
+        try:
+            with transaction.atomic():
+                conversation = cls.objects.create(item=item, **cls._pair(user, other))
+                conversation.participants.add(user, other)
+        except IntegrityError:
+            # A concurrent first message created it between the lookup and the insert
+            conversation = cls.objects.get(**cls._pair(user, other))
+        return conversation
+
+
+class Message(models.Model):
+    """Single message inside a conversation."""
+    conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name='messages', help_text="Conversation thread")
+    sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sent_messages', help_text="Message author")
+    content = models.TextField(help_text="Message body")
+    is_read = models.BooleanField(default=False, help_text="Has the recipient seen this message?")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['created_at', 'id']
+        verbose_name = 'Message'
+        verbose_name_plural = 'Messages'
+        indexes = [
+            # Serves newest-first thread pages and keyset lookups for older pages
+            models.Index(fields=['conversation', 'created_at', 'id']),
+        ]
+
+    def __str__(self):
+        return f"Message {self.id} from {self.sender.username}"
+
+
+def unread_message_count(user_id):
+    """Count messages sent to a user that they have not read yet."""
+    return Message.objects.filter(
+        conversation__participants=user_id,
+        is_read=False
+    ).exclude(sender_id=user_id).count()
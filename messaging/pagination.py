@@ -0,0 +1,59 @@
+"""
+Keyset (cursor) pagination for conversation threads.
+
+Pages are fetched newest-first using the (conversation, created_at, id)
+index, so loading an older page costs the same no matter how long the
+thread is. A cursor encodes the (created_at, id) of the oldest message
+already shown.
+"""
+
+from datetime import datetime
+
+from django.db.models import Q
+from django.utils.encoding import force_str
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+MESSAGES_PER_PAGE = 30
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor cannot be decoded."""
+
+
+def encode_cursor(message):
+    """Build an opaque cursor pointing just before the given message."""
+    raw = f"{message.created_at.isoformat()}|{message.pk}"
+    return urlsafe_base64_encode(raw.encode())
+
+
+def decode_cursor(cursor):
+    """Return the (created_at, id) pair stored in a cursor."""
+    try:
+        created_at, pk = force_str(urlsafe_base64_decode(cursor)).split('|')
+        return datetime.fromisoformat(created_at), int(pk)
+    except (TypeError, ValueError, UnicodeDecodeError) as exc:
+        raise InvalidCursor(cursor) from exc
+
+
+def get_message_page(conversation, cursor=None, page_size=MESSAGES_PER_PAGE):
+    """
+    Return (messages, next_cursor) for one page of a conversation.
+
+    Messages come back in chronological order, ready to render. next_cursor
+    is None once the start of the thread has been reached.
+    """
+    queryset = conversation.messages.select_related('sender').order_by('-created_at', '-id')
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+        )
+
+    # Fetch one extra row to learn whether an older page exists
+    page = list(queryset[:page_size + 1])
+    has_more = len(page) > page_size
+    page = page[:page_size]
+    page.reverse()
+
+    next_cursor = encode_cursor(page[0]) if has_more else None
+    return page, next_cursor
@@ -0,0 +1,128 @@
+from unittest import mock
+
+from django.db import IntegrityError, transaction
+from django.test import TestCase, Client
+from django.contrib.auth.models import User
+from django.urls import reverse
+from messaging.models import Conversation, Message
+from messaging.pagination import get_message_page
+
+
+class ConversationModelTests(TestCase):
+    """Tests for Conversation model."""
+
+    def setUp(self):
+        """Create two users."""
+        self.buyer = User.objects.create_user(username='buyer', password='testpass')
+        self.seller = User.objects.create_user(username='seller', password='testpass')
+
+    def test_between_returns_none_without_conversation(self):
+        """Test between returns None when users have not talked yet."""
+        self.assertIsNone(Conversation.between(self.buyer, self.seller))
+
+    def test_get_or_create_between_reuses_conversation(self):
+        """Test both users share a single conversation."""
+        first = Conversation.get_or_create_between(self.buyer, self.seller)
+        second = Conversation.get_or_create_between(self.seller, self.buyer)
+        self.assertEqual(first, second)
+        self.assertEqual(first.participants.count(), 2)
+
+    def test_concurrent_first_messages_share_conversation(self):
+        """Test a conversation created between the lookup and the insert is fetched, not duplicated."""
+        existing = Conversation.get_or_create_between(self.buyer, self.seller)
+        with mock.patch.object(Conversation, 'between', return_value=None):
+            conversation = Conversation.get_or_create_between(self.seller, self.buyer)
+        self.assertEqual(conversation, existing)
+        self.assertEqual(Conversation.objects.count(), 1)
+
+    def test_database_rejects_second_conversation_for_pair(self):
+        """Test the unique constraint holds whichever user is listed first."""
+        Conversation.get_or_create_between(self.buyer, self.seller)
+        first, second = sorted((self.buyer, self.seller), key=lambda user: user.pk)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Conversation.objects.create(first_participant=first, second_participant=second)
+
+
+class MessagePaginationTests(TestCase):
+    """Tests for cursor pagination of conversation threads."""
+
+    def setUp(self):
+        """Create a conversation with a long thread."""
+        self.buyer = User.objects.create_user(username='buyer', password='testpass')
+        self.seller = User.objects.create_user(username='seller', password='testpass')
+        self.conversation = Conversation.get_or_create_between(self.buyer, self.seller)
+        Message.objects.bulk_create([
+            Message(conversation=self.conversation, sender=self.buyer, content=f'Message {i}')
+            for i in range(25)
+        ])
+
+    def test_first_page_is_newest_messages(self):
+        """Test first page holds the newest messages in chronological order."""
+        page, cursor = get_message_page(self.conversation, page_size=10)
+        self.assertEqual([m.content for m in page], [f'Message {i}' for i in range(15, 25)])
+        self.assertIsNotNone(cursor)
+
+    def test_cursor_walks_back_to_start(self):
+        """Test following cursors visits every message exactly once."""
+        page, cursor = get_message_page(self.conversation, page_size=10)
+        seen = [m.pk for m in page]
+        while cursor:
+            page, cursor = get_message_page(self.conversation, cursor=cursor, page_size=10)
+            seen = [m.pk for m in page] + seen
+        self.assertEqual(seen, list(self.conversation.messages.values_list('pk', flat=True)))
+
+    def test_page_query_count_is_constant(self):
+        """Test an older page costs a single query regardless of thread length."""
+        _, cursor = get_message_page(self.conversation, page_size=10)
+        with self.assertNumQueries(1):
+            get_message_page(self.conversation, cursor=cursor, page_size=10)
+
+
+class MessagingViewsTests(TestCase):
+    """Tests for messaging views."""
+
+    def setUp(self):
+        """Create users and log in as buyer."""
+        self.client = Client()
+        self.buyer = User.objects.create_user(username='buyer', password='testpass')
+        self.seller = User.objects.create_user(username='seller', password='testpass')
+        self.client.login(username='buyer', password='testpass')
+
+    def test_inbox_requires_login(self):
+        """Test inbox redirects anonymous users."""
+        self.client.logout()
+        response = self.client.get(reverse('messaging:inbox'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_send_message_creates_conversation(self):
+        """Test sending a message starts a conversation."""
+        response = self.client.post(reverse('messaging:send'), {
+            'recipient': self.seller.pk,
+            'content': 'Is this still available?',
+        })
+        self.assertRedirects(response, reverse('messaging:conversation', args=[self.seller.pk]))
+        conversation = Conversation.between(self.buyer, self.seller)
+        self.assertEqual(conversation.messages.get().content, 'Is this still available?')
+
+    def test_conversation_view_marks_messages_read(self):
+        """Test opening a thread marks incoming messages read."""
+        conversation = Conversation.get_or_create_between(self.buyer, self.seller)
+        Message.objects.create(conversation=conversation, sender=self.seller, content='Hello')
+        Message.objects.create(conversation=conversation, sender=self.buyer, content='Hi')
+        response = self.client.get(reverse('messaging:conversation', args=[self.seller.pk]))
+        self.assertContains(response, 'Hello')
+        self.assertFalse(Message.objects.filter(sender=self.seller, is_read=False).exists())
+        self.assertFalse(Message.objects.get(sender=self.buyer).is_read)
+
+    def test_older_view_rejects_bad_cursor(self):
+        """Test the fragment endpoint rejects malformed cursors."""
+        Conversation.get_or_create_between(self.buyer, self.seller)
+        response = self.client.get(
+            reverse('messaging:conversation_older', args=[self.seller.pk]) + '?cursor=garbage'
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_cannot_message_self(self):
+        """Test users cannot open a conversation with themselves."""
+        response = self.client.get(reverse('messaging:conversation', args=[self.buyer.pk]))
+        self.assertEqual(response.status_code, 404)
@@ -6,5 +6,6 @@ app_name = 'messaging'
 urlpatterns = [
     path('inbox/', views.inbox_view, name='inbox'),
     path('conversation/<int:user_id>/', views.conversation_view, name='conversation'),
+    path('conversation/<int:user_id>/older/', views.conversation_older_view, name='conversation_older'),
     path('send/', views.send_message_view, name='send'),
 ]
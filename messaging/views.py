@@ -1,13 +1,131 @@
-from django.shortcuts import render
-from django.http import HttpResponse
+from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib.auth.decorators import login_required
+from django.contrib.auth.models import User
+from django.contrib import messages
+from django.core.paginator import Paginator
+from django.http import Http404, HttpResponseBadRequest
+from django.utils import timezone
+from django.views.decorators.http import require_GET, require_POST
 
-# Stub views for messaging app - to be implemented in Phase 5
+from core import counters
+from marketplace.models import Item
+from .forms import MessageForm
+from .models import Conversation, Message
+from .pagination import InvalidCursor, get_message_page
 
+
+def _get_other_user(request, user_id):
+    """Return the conversation partner, refusing conversations with oneself."""
+    other = get_object_or_404(User, pk=user_id)
+    if other == request.user:
+        raise Http404("You cannot message yourself.")
+    return other
+
+
+def _mark_page_read(page, user):
+    """Mark the incoming messages of a rendered page read with one UPDATE."""
+    unread_ids = [message.pk for message in page if message.sender_id != user.pk and not message.is_read]
+    if not unread_ids:
+        return 0
+    updated = Message.objects.filter(pk__in=unread_ids, is_read=False).update(is_read=True)
+    counters.decrement('unread_messages', user.pk, updated)
+    return updated
+
+
+@login_required
 def inbox_view(request):
-    return HttpResponse("Inbox View - Coming in Phase 5")
+    """List the current user's conversations, most recently active first."""
+    conversations = Conversation.objects.filter(
+        participants=request.user
+    ).prefetch_related('participants').select_related('item')
+    page_obj = Paginator(conversations, 20).get_page(request.GET.get('page'))
 
+    for conversation in page_obj:
+        conversation.other_participants = [
+            participant for participant in conversation.participants.all()
+            if participant != request.user
+        ]
+
+    return render(request, 'messaging/inbox.html', {
+        'conversations': page_obj,
+        'page_obj': page_obj,
+        'is_paginated': page_obj.has_other_pages(),
+    })
+
+
+@login_required
+@require_GET
 def conversation_view(request, user_id):
-    return HttpResponse("Conversation View - Coming in Phase 5")
+    """Show the newest page of the thread with another user."""
+    other = _get_other_user(request, user_id)
+    conversation = Conversation.between(request.user, other)
+
+    page, next_cursor = [], None
+    if conversation is not None:
+        page, next_cursor = get_message_page(conversation)
+        _mark_page_read(page, request.user)
+
+    item = None
+    item_id = request.GET.get('item')
+    if item_id and item_id.isdigit():
+        item = Item.objects.filter(pk=item_id, is_active=True).first()
 
+    return render(request, 'messaging/conversation.html', {
+        'other_user': other,
+        'conversation': conversation,
+        'thread_messages': page,
+        'next_cursor': next_cursor,
+        'item': item or (conversation.item if conversation else None),
+        'form': MessageForm(),
+    })
+
+
+@login_required
+@require_GET
+def conversation_older_view(request, user_id):
+    """Render one older page of a thread as an HTML fragment for lazy loading."""
+    other = _get_other_user(request, user_id)
+    conversation = Conversation.between(request.user, other)
+    if conversation is None:
+        raise Http404("No conversation with this user.")
+
+    try:
+        page, next_cursor = get_message_page(conversation, cursor=request.GET.get('cursor'))
+    except InvalidCursor:
+        return HttpResponseBadRequest("Invalid cursor.")
+    _mark_page_read(page, request.user)
+
+    return render(request, 'messaging/message_page.html', {
+        'thread_messages': page,
+        'next_cursor': next_cursor,
+    })
+
+
+@login_required
+@require_POST
 def send_message_view(request):
-    return HttpResponse("Send Message View - Coming in Phase 5")
+    """Send a message to another user, starting a conversation if needed."""
+    recipient_id = request.POST.get('recipient', '')
+    if not recipient_id.isdigit():
+        return HttpResponseBadRequest("Missing recipient.")
+    recipient = _get_other_user(request, recipient_id)
+
+    form = MessageForm(request.POST)
+    if not form.is_valid():
+        messages.error(request, "Your message could not be sent. Please check its content.")
+        return redirect('messaging:conversation', user_id=recipient.pk)
+
+    item = None
+    item_id = request.POST.get('item', '')
+    if item_id.isdigit():
+        item = Item.objects.filter(pk=item_id).first()
+
+    conversation = Conversation.get_or_create_between(request.user, recipient, item=item)
+    form.instance.conversation = conversation
+    form.instance.sender = request.user
+    form.save()
+    counters.increment('unread_messages', recipient.pk)
+    # Bump the thread to the top of both inboxes without reloading it
+    Conversation.objects.filter(pk=conversation.pk).update(updated_at=timezone.now())
+
+    return redirect('messaging:conversation', user_id=recipient.pk)
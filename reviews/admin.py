@@ -1,3 +1,21 @@
 from django.contrib import admin
 
-# Admin will be configured in Phase 7
+from core.paginator import EstimatedCountPaginator
+from .models import Review
+
+
+@admin.register(Review)
+class ReviewAdmin(admin.ModelAdmin):
+    """Admin for Review model."""
+    list_display = ['id', 'reviewed_user', 'reviewer', 'rating', 'created_at']
+    list_filter = ['rating']
+    search_fields = ['reviewed_user__username', 'reviewer__username', 'comment']
+    raw_id_fields = ['reviewer', 'reviewed_user', 'transaction']
+    readonly_fields = ['created_at']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    
+    def get_queryset(self, request):
+        """Optimize queryset with select_related."""
+        queryset = super().get_queryset(request)
+        return queryset.select_related('reviewer', 'reviewed_user')
@@ -0,0 +1,30 @@
+from django import forms
+from .models import Review
+
+
+class ReviewForm(forms.ModelForm):
+    """Form for rating a seller after a completed purchase."""
+    
+    rating = forms.TypedChoiceField(
+        choices=Review.RATING_CHOICES,
+        coerce=int,
+        widget=forms.Select(attrs={
+            'class': 'form-control'
+        }),
+        help_text='How was your experience with this seller?'
+    )
+    
+    comment = forms.CharField(
+        max_length=1000,
+        required=False,
+        widget=forms.Textarea(attrs={
+            'class': 'form-control',
+            'rows': 4,
+            'placeholder': 'Tell other buyers about this seller (optional)'
+        }),
+        help_text='Optional comment (max 1000 characters)'
+    )
+    
+    class Meta:
+        model = Review
+        fields = ['rating', 'comment']
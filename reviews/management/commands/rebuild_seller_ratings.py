@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from reviews.ratings import rebuild_all_rating_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute stored rating histograms and Bayesian scores of sellers from their reviews."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help="Sellers rebuilt per database transaction")
+
+    def handle(self, *args, **options):
+        processed = rebuild_all_rating_stats(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt rating stats for {processed} seller(s)."))
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:25
+
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('transactions', '0003_transaction_completed_at_monthlysellersales_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Review',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rating', models.PositiveSmallIntegerField(choices=[(5, '5 stars'), (4, '4 stars'), (3, '3 stars'), (2, '2 stars'), (1, '1 star')], help_text='Rating from 1 to 5 stars', validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(5)])),
+                ('comment', models.TextField(blank=True, help_text='Optional comment (max 1000 characters)', max_length=1000)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('reviewed_user', models.ForeignKey(help_text='Seller being reviewed', on_delete=django.db.models.deletion.CASCADE, related_name='received_reviews', to=settings.AUTH_USER_MODEL)),
+                ('reviewer', models.ForeignKey(help_text='Buyer who wrote the review', on_delete=django.db.models.deletion.CASCADE, related_name='given_reviews', to=settings.AUTH_USER_MODEL)),
+                ('transaction', models.OneToOneField(help_text='Completed transaction the review is about', on_delete=django.db.models.deletion.CASCADE, related_name='review', to='transactions.transaction')),
+            ],
+            options={
+                'verbose_name': 'Review',
+                'verbose_name_plural': 'Reviews',
+                'ordering': ['-created_at', '-id'],
+                'indexes': [models.Index(fields=['reviewed_user', '-created_at', '-id'], name='reviews_rev_reviewe_b863c3_idx')],
+            },
+        ),
+    ]
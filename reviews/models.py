@@ -1,3 +1,68 @@
 from django.db import models
+from django.contrib.auth.models import User
+from django.core.validators import MinValueValidator, MaxValueValidator
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
 
-# Models will be added in Phase 7
+
+class Review(models.Model):
+    """Buyer's rating of a seller after a completed transaction."""
+    RATING_CHOICES = [(stars, f"{stars} star{'s' if stars > 1 else ''}") for stars in range(5, 0, -1)]
+    
+    reviewer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='given_reviews', help_text="Buyer who wrote the review")
+    reviewed_user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='received_reviews', help_text="Seller being reviewed")
+    transaction = models.OneToOneField(
+        'transactions.Transaction',
+        on_delete=models.CASCADE,
+        related_name='review',
+        help_text="Completed transaction the review is about"
+    )
+    rating = models.PositiveSmallIntegerField(
+        choices=RATING_CHOICES,
+        validators=[MinValueValidator(1), MaxValueValidator(5)],
+        help_text="Rating from 1 to 5 stars"
+    )
+    comment = models.TextField(blank=True, max_length=1000, help_text="Optional comment (max 1000 characters)")
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at', '-id']
+        verbose_name = 'Review'
+        verbose_name_plural = 'Reviews'
+        indexes = [
+            # Paginated review list on each seller's page
+            models.Index(fields=['reviewed_user', '-created_at', '-id']),
+        ]
+    
+    def __str__(self):
+        return f"{self.rating}★ for {self.reviewed_user.username} by {self.reviewer.username}"
+
+
+@receiver(pre_save, sender=Review)
+def remember_rated_seller(sender, instance, **kwargs):
+    """Note the stored seller and rating, so an edit (in the admin, say) can move the review's count."""
+    instance._stored_rating = None
+    if instance.pk is not None:
+        instance._stored_rating = Review.objects.filter(pk=instance.pk).values_list(
+            'reviewed_user_id', 'rating'
+        ).first()
+
+
+@receiver(post_save, sender=Review)
+def add_review_to_rating_stats(sender, instance, created, **kwargs):
+    """Count a new review in the seller's histogram and score, or move an edited one."""
+    from .ratings import apply_rating
+    current = (instance.reviewed_user_id, instance.rating)
+    stored = None if created else getattr(instance, '_stored_rating', None)
+    if stored == current:
+        return
+    if stored is not None:
+        apply_rating(*stored, -1)
+    apply_rating(*current, 1)
+
+
+@receiver(post_delete, sender=Review)
+def remove_review_from_rating_stats(sender, instance, **kwargs):
+    """Remove a deleted review from the seller's histogram and score."""
+    from .ratings import apply_rating
+    apply_rating(instance.reviewed_user_id, instance.rating, -1)
@@ -0,0 +1,90 @@
+"""
+Seller rating statistics stored on UserProfile.
+
+Each review changes two histogram columns with F() increments; the
+average and the Bayesian ranking score are then derived from the
+histogram in the same UPDATE pass, so no request ever aggregates the
+reviews table. The score is
+
+    (prior_weight * prior_mean + sum of ratings) / (prior_weight + count)
+
+which keeps a seller with one 5-star review below one with hundreds of
+4.9s. rebuild_rating_stats recomputes the histogram from scratch.
+"""
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, F, FloatField, Q, Value, When
+from django.db.models.functions import Cast
+
+from users.models import UserProfile
+from .models import Review
+
+STARS = range(1, 6)
+
+
+def _derived_stats():
+    """Expressions computing average_rating and rating_score from the histogram columns."""
+    count = Cast(F('rating_count'), FloatField())
+    total = Cast(sum(F(f'rating_{stars}_count') * stars for stars in STARS), FloatField())
+    prior = settings.RATING_PRIOR_WEIGHT * settings.RATING_PRIOR_MEAN
+    return {
+        'average_rating': Case(
+            When(rating_count=0, then=Value(0)),
+            default=Cast(total / count, DecimalField(max_digits=3, decimal_places=2)),
+            output_field=DecimalField(max_digits=3, decimal_places=2),
+        ),
+        'rating_score': Case(
+            When(rating_count=0, then=Value(0.0)),
+            default=(total + prior) / (count + settings.RATING_PRIOR_WEIGHT),
+            output_field=FloatField(),
+        ),
+    }
+
+
+def apply_rating(seller_id, rating, delta):
+    """Add (delta=1) or remove (delta=-1) one rating from a seller's stats."""
+    profiles = UserProfile.objects.filter(user_id=seller_id)
+    with transaction.atomic():
+        profiles.update(**{
+            'rating_count': F('rating_count') + delta,
+            f'rating_{rating}_count': F(f'rating_{rating}_count') + delta,
+        })
+        profiles.update(**_derived_stats())
+
+
+def rebuild_rating_stats(seller_ids):
+    """Recompute histograms and scores of the given sellers from their reviews."""
+    counts = {
+        row['reviewed_user_id']: row
+        for row in Review.objects.filter(reviewed_user_id__in=seller_ids)
+        .values('reviewed_user_id')
+        .annotate(
+            total=Count('pk'),
+            **{f'stars_{stars}': Count('pk', filter=Q(rating=stars)) for stars in STARS}
+        )
+        .order_by()
+    }
+    with transaction.atomic():
+        for seller_id in seller_ids:
+            row = counts.get(seller_id, {})
+            UserProfile.objects.filter(user_id=seller_id).update(
+                rating_count=row.get('total', 0),
+                **{f'rating_{stars}_count': row.get(f'stars_{stars}', 0) for stars in STARS}
+            )
+        UserProfile.objects.filter(user_id__in=seller_ids).update(**_derived_stats())
+
+
+def rebuild_all_rating_stats(chunk_size=500):
+    """Rebuild every seller's stats, chunk_size sellers per transaction; returns the number processed."""
+    sellers = UserProfile.objects.filter(is_seller=True).order_by('user_id')
+    processed = 0
+    last_id = 0
+    while True:
+        chunk = list(sellers.filter(user_id__gt=last_id).values_list('user_id', flat=True)[:chunk_size])
+        if not chunk:
+            break
+        rebuild_rating_stats(chunk)
+        processed += len(chunk)
+        last_id = chunk[-1]
+    return processed
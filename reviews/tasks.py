@@ -0,0 +1,9 @@
+from core.tasks import task
+
+from .ratings import rebuild_all_rating_stats
+
+
+@task
+def rebuild_seller_ratings():
+    """Repair any drift in the stored rating histograms and scores."""
+    rebuild_all_rating_stats()
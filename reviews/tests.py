@@ -0,0 +1,130 @@
+from django.test import TestCase, Client
+from django.contrib.auth.models import User
+from django.urls import reverse
+from marketplace.models import Category, Item
+from reviews.models import Review
+from reviews.ratings import rebuild_all_rating_stats
+from transactions.models import Transaction
+from users.models import UserProfile
+
+
+def make_seller(username):
+    """Create a verified seller."""
+    user = User.objects.create_user(username=username, password='testpass')
+    UserProfile.objects.filter(user=user).update(is_seller=True, verification_status='verified')
+    return user
+
+
+def review(seller, buyer, rating):
+    """Create a completed sale from seller to buyer and review it."""
+    category, _ = Category.objects.get_or_create(name='Cookware_Test')
+    item = Item.objects.create(
+        seller=seller, title='Pan', description='Test item', category=category,
+        price=20, condition='good', location='Test Location', status='sold', is_active=False
+    )
+    txn = Transaction.objects.create(buyer=buyer, seller=seller, item=item, price=20, status='completed')
+    return Review.objects.create(reviewer=buyer, reviewed_user=seller, transaction=txn, rating=rating)
+
+
+class RatingStatsTests(TestCase):
+    """Tests for the stored rating histogram and score."""
+
+    def setUp(self):
+        """Create a seller and a buyer."""
+        self.seller = make_seller('seller')
+        self.buyer = User.objects.create_user(username='buyer', password='testpass')
+
+    def profile(self):
+        return UserProfile.objects.get(user=self.seller)
+
+    def test_reviews_update_histogram(self):
+        """Test creating and deleting reviews keeps the histogram in step."""
+        review(self.seller, self.buyer, 5)
+        low = review(self.seller, self.buyer, 2)
+        profile = self.profile()
+        self.assertEqual(profile.rating_count, 2)
+        self.assertEqual((profile.rating_5_count, profile.rating_2_count), (1, 1))
+        self.assertEqual(float(profile.average_rating), 3.5)
+
+        low.delete()
+        profile = self.profile()
+        self.assertEqual(profile.rating_count, 1)
+        self.assertEqual(profile.rating_2_count, 0)
+        self.assertEqual(float(profile.average_rating), 5.0)
+        self.assertEqual(profile.rating_histogram()[0], (5, 1, 100))
+
+    def test_edited_review_moves_between_histograms(self):
+        """Test changing a review's rating or seller updates both sellers' stored stats."""
+        other = make_seller('other')
+        edited = review(self.seller, self.buyer, 5)
+        edited.rating = 1
+        edited.save()
+        profile = self.profile()
+        self.assertEqual((profile.rating_count, profile.rating_5_count, profile.rating_1_count), (1, 0, 1))
+
+        edited.reviewed_user = other
+        edited.save()
+        self.assertEqual(self.profile().rating_count, 0)
+        other_profile = UserProfile.objects.get(user=other)
+        self.assertEqual((other_profile.rating_count, other_profile.rating_1_count), (1, 1))
+        self.assertEqual(float(other_profile.average_rating), 1.0)
+
+    def test_score_is_zero_without_reviews(self):
+        """Test removing the last review resets the stats."""
+        review(self.seller, self.buyer, 4).delete()
+        profile = self.profile()
+        self.assertEqual(profile.rating_score, 0)
+        self.assertEqual(profile.average_rating, 0)
+
+    def test_many_good_reviews_outrank_one_perfect(self):
+        """Test the Bayesian score ranks volume above a single 5-star review."""
+        veteran = make_seller('veteran')
+        review(self.seller, self.buyer, 5)
+        for _ in range(9):
+            review(veteran, self.buyer, 5)
+        review(veteran, self.buyer, 4)
+
+        ranked = list(
+            UserProfile.objects.filter(is_seller=True).order_by('-rating_score', 'id')
+            .values_list('user__username', flat=True)
+        )
+        self.assertEqual(ranked, ['veteran', 'seller'])
+
+    def test_rebuild_repairs_drift(self):
+        """Test the rebuild recomputes stats from reviews."""
+        review(self.seller, self.buyer, 3)
+        UserProfile.objects.filter(user=self.seller).update(rating_count=9, rating_3_count=9, rating_score=1)
+        rebuild_all_rating_stats(chunk_size=1)
+        profile = self.profile()
+        self.assertEqual((profile.rating_count, profile.rating_3_count), (1, 1))
+        self.assertAlmostEqual(profile.rating_score, (3 + 35) / 11)
+
+
+class ReviewViewsTests(TestCase):
+    """Tests for review views."""
+
+    def setUp(self):
+        """Create a seller, a buyer and log in as buyer."""
+        self.client = Client()
+        self.seller = make_seller('seller')
+        self.buyer = User.objects.create_user(username='buyer', password='testpass')
+        self.client.login(username='buyer', password='testpass')
+
+    def test_buyer_reviews_completed_purchase(self):
+        """Test the buyer of a completed transaction can leave a review."""
+        txn = review(self.seller, self.buyer, 5).transaction
+        Review.objects.all().delete()
+        response = self.client.post(reverse('reviews:create', args=[txn.item_id]), {'rating': 4, 'comment': 'Good'})
+        created = Review.objects.get()
+        self.assertRedirects(response, reverse('reviews:detail', args=[created.pk]))
+        self.assertEqual(UserProfile.objects.get(user=self.seller).rating_4_count, 1)
+
+    def test_seller_reviews_paginated(self):
+        """Test the seller's review list is paginated from the stored count."""
+        for _ in range(12):
+            review(self.seller, self.buyer, 5)
+        response = self.client.get(reverse('reviews:seller_reviews', args=['seller']))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['reviews']), 10)
+        self.assertTrue(response.context['is_paginated'])
+        self.assertEqual(response.context['page_obj'].paginator.num_pages, 2)
@@ -7,4 +7,5 @@ urlpatterns = [
     path('create/<int:item_id>/', views.create_review_view, name='create'),
     path('<int:pk>/', views.review_detail_view, name='detail'),
     path('<int:pk>/delete/', views.review_delete_view, name='delete'),
+    path('seller/<str:username>/', views.seller_reviews_view, name='seller_reviews'),
 ]
@@ -1,13 +1,90 @@
-from django.shortcuts import render
-from django.http import HttpResponse
+from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+from django.core.paginator import Paginator
+from django.http import Http404
 
-# Stub views for reviews app - to be implemented in Phase 7
+from transactions.models import Transaction
+from users.models import UserProfile
+from .forms import ReviewForm
+from .models import Review
 
+REVIEWS_PER_PAGE = 10
+
+
+@login_required
 def create_review_view(request, item_id):
-    return HttpResponse("Create Review View - Coming in Phase 7")
+    """Let the buyer of a completed purchase rate the seller."""
+    txn = Transaction.objects.filter(
+        item_id=item_id,
+        buyer=request.user,
+        status='completed'
+    ).select_related('item', 'seller').first()
+    if txn is None:
+        messages.error(request, "You can only review sellers after a completed purchase.")
+        return redirect('transactions:list')
+
+    existing = Review.objects.filter(transaction=txn).first()
+    if existing is not None:
+        messages.info(request, "You have already reviewed this purchase.")
+        return redirect('reviews:detail', pk=existing.pk)
+
+    form = ReviewForm(request.POST or None)
+    if request.method == 'POST' and form.is_valid():
+        form.instance.reviewer = request.user
+        form.instance.reviewed_user = txn.seller
+        form.instance.transaction = txn
+        review = form.save()
+        messages.success(request, "Thank you for your review!")
+        return redirect('reviews:detail', pk=review.pk)
+
+    return render(request, 'reviews/review_form.html', {
+        'form': form,
+        'transaction': txn,
+    })
+
 
 def review_detail_view(request, pk):
-    return HttpResponse("Review Detail View - Coming in Phase 7")
+    """Display a single review."""
+    review = get_object_or_404(
+        Review.objects.select_related('reviewer', 'reviewed_user', 'transaction__item'), pk=pk
+    )
+    return render(request, 'reviews/review_detail.html', {
+        'review': review,
+        'is_reviewer': request.user == review.reviewer,
+    })
 
+
+@login_required
 def review_delete_view(request, pk):
-    return HttpResponse("Review Delete View - Coming in Phase 7")
+    """Let a reviewer withdraw their review."""
+    review = get_object_or_404(Review, pk=pk)
+    if review.reviewer != request.user:
+        raise Http404("No review found.")
+
+    if request.method == 'POST':
+        seller = review.reviewed_user
+        review.delete()
+        messages.success(request, "Your review has been removed.")
+        return redirect('reviews:seller_reviews', username=seller.username)
+
+    return render(request, 'reviews/review_confirm_delete.html', {'review': review})
+
+
+def seller_reviews_view(request, username):
+    """Paginated reviews of a seller with their stored rating histogram."""
+    profile = get_object_or_404(
+        UserProfile.objects.select_related('user'), user__username=username, is_seller=True
+    )
+    reviews = Review.objects.filter(reviewed_user=profile.user).select_related('reviewer')
+    # Histogram totals are stored on the profile, so skip the COUNT query
+    paginator = Paginator(reviews, REVIEWS_PER_PAGE)
+    paginator.count = profile.rating_count
+    page_obj = paginator.get_page(request.GET.get('page'))
+
+    return render(request, 'reviews/seller_reviews.html', {
+        'profile': profile,
+        'reviews': page_obj,
+        'page_obj': page_obj,
+        'is_paginated': page_obj.has_other_pages(),
+    })
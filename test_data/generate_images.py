@@ -2,13 +2,29 @@
 """
 Test Image Generator
 Generates sample test images for marketplace testing.
-Run this script to create sample images in the test_data/images directory.
+
+Without arguments, creates the 8 sample images below in test_data/images.
+With --count, renders a corpus of varied product images across a process
+pool, in several sizes and formats, for thumbnail, dedup and upload
+benchmarks:
+
+    python3 test_data/generate_images.py --count 5000 --sizes 500x500,1600x1200 --formats jpeg,webp
+
+Gradients are built by Pillow's C routines in one call per image rather
+than drawn row by row, and each worker generates its noise field once per
+size, so the cost is dominated by encoding (PNG most of all).
 """
 
-from PIL import Image, ImageDraw, ImageFont
+import argparse
 import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
+from PIL import Image, ImageChops, ImageDraw, ImageFont, ImageOps, features
+
 # Test data - product images to generate
 TEST_IMAGES = [
     {
@@ -61,54 +77,143 @@ TEST_IMAGES = [
     }
 ]
 
-def create_test_image(filename, title, color, description):
+FORMATS = {
+    'jpeg': ('JPEG', 'jpg', {'quality': 85, 'optimize': True}),
+    'png': ('PNG', 'png', {'optimize': False}),
+    'webp': ('WEBP', 'webp', {'quality': 80, 'method': 4}),
+}
+
+
+@lru_cache(maxsize=None)
+def load_font(size):
+    """Return a TrueType font at size, falling back to Pillow's built-in font."""
+    for path in ("/System/Library/Fonts/Helvetica.ttc", "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"):
+        try:
+            return ImageFont.truetype(path, size)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(size)
+    except TypeError:  # Pillow without FreeType ignores sizes
+        return ImageFont.load_default()
+
+
+def gradient(size, top_color, bottom_color, angle=0):
+    """Linear gradient from top_color to bottom_color, rotated by angle degrees, built in one pass."""
+    width, height = size
+    # Pillow's 256x256 ramp, scaled to size, is mapped to the two colours through one lookup table
+    mask = Image.linear_gradient('L')
+    if angle:
+        mask = mask.rotate(angle, resample=Image.BICUBIC, fillcolor=255).resize(size, Image.BILINEAR)
+    else:
+        # A vertical ramp is constant along each row: scale one column, then stretch it
+        mask = mask.resize((1, height), Image.BILINEAR).resize(size, Image.NEAREST)
+    return ImageOps.colorize(mask, top_color, bottom_color)
+
+
+def add_centered_text(draw, width, y, text, font, fill=(255, 255, 255)):
+    bbox = draw.textbbox((0, 0), text, font=font)
+    draw.text(((width - (bbox[2] - bbox[0])) // 2, y), text, font=font, fill=fill)
+
+
+def create_test_image(filename, title, color, description, size=(500, 500)):
     """Create a test image with the given specifications."""
-    # Create image with gradient background
-    width, height = 500, 500
-    img = Image.new('RGB', (width, height), color)
-    
-    # Add a gradient effect
-    draw = ImageDraw.Draw(img)
-    for i in range(height):
-        # Create a gradient by adjusting brightness
-        factor = 1 - (i / height) * 0.3
-        r = int(color[0] * factor)
-        g = int(color[1] * factor)
-        b = int(color[2] * factor)
-        draw.line([(0, i), (width, i)], fill=(r, g, b))
-    
-    # Add text
+    width, height = size
+    darker = tuple(int(channel * 0.7) for channel in color)
+    img = gradient(size, color, darker)
+
     draw = ImageDraw.Draw(img)
-    
-    # Try to use a default font, fall back if not available
-    try:
-        title_font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 40)
-        desc_font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 24)
-    except:
-        title_font = ImageFont.load_default()
-        desc_font = ImageFont.load_default()
-    
-    # Draw white text
-    text_color = (255, 255, 255)
-    
-    # Center title
-    title_bbox = draw.textbbox((0, 0), title, font=title_font)
-    title_width = title_bbox[2] - title_bbox[0]
-    title_x = (width - title_width) // 2
-    draw.text((title_x, 180), title, font=title_font, fill=text_color)
-    
-    # Center description
-    desc_bbox = draw.textbbox((0, 0), description, font=desc_font)
-    desc_width = desc_bbox[2] - desc_bbox[0]
-    desc_x = (width - desc_width) // 2
-    draw.text((desc_x, 280), description, font=desc_font, fill=text_color)
-    
-    # Save image
+    add_centered_text(draw, width, int(height * 0.36), title, load_font(max(12, width // 12)))
+    add_centered_text(draw, width, int(height * 0.56), description, load_font(max(10, width // 20)))
+
     img.save(filename)
     print(f"✓ Created {os.path.basename(filename)}")
 
-def main():
-    """Generate all test images."""
+
+@lru_cache(maxsize=None)
+def noise_field(size):
+    """Gaussian noise at size, generated once per worker process and then shifted per image."""
+    return Image.effect_noise(size, 16).convert('RGB')
+
+
+def render_product(index, seed, size):
+    """Render one varied product shot (a deterministic function of seed and index)."""
+    rng = random.Random(seed * 1_000_003 + index)
+    template = TEST_IMAGES[index % len(TEST_IMAGES)]
+    width, height = size
+    color = tuple(min(255, max(0, channel + rng.randint(-60, 60))) for channel in template["color"])
+    background = tuple(rng.randint(170, 250) for _ in range(3))
+    img = gradient(size, background, tuple(int(c * 0.75) for c in background), angle=rng.choice([0, 0, 45, 90, 135]))
+
+    # Sensor-like noise keeps encoded sizes realistic and near-duplicates distinguishable
+    noise = ImageChops.offset(noise_field(size), rng.randrange(width), rng.randrange(height))
+    img = Image.blend(img, noise, rng.uniform(0.04, 0.12))
+
+    # A simple "product" silhouette with a shadow
+    draw = ImageDraw.Draw(img)
+    cx, cy = width * rng.uniform(0.4, 0.6), height * rng.uniform(0.4, 0.55)
+    rx, ry = width * rng.uniform(0.18, 0.32), height * rng.uniform(0.12, 0.28)
+    shadow_offset = max(2, width // 60)
+    draw.ellipse([cx - rx, cy + ry * 0.8, cx + rx, cy + ry * 1.2 + shadow_offset], fill=(90, 90, 90))
+    shape = draw.ellipse if rng.random() < 0.5 else draw.rounded_rectangle
+    box = [cx - rx, cy - ry, cx + rx, cy + ry]
+    if shape is draw.rounded_rectangle:
+        shape(box, radius=int(min(rx, ry) * 0.3), fill=color)
+    else:
+        shape(box, fill=color)
+    handle_y = cy - ry * rng.uniform(-0.2, 0.2)
+    draw.rectangle([cx + rx * 0.9, handle_y - ry * 0.1, cx + rx * 1.6, handle_y + ry * 0.1], fill=color)
+
+    label = f"{template['title']} #{index}"
+    add_centered_text(draw, width, int(height * 0.82), label, load_font(max(10, width // 18)), fill=(40, 40, 40))
+    return img, template["title"]
+
+
+def _render_job(job):
+    """Worker: render one product in every requested size and format; returns bytes written."""
+    index, seed, sizes, formats, output_dir = job
+    written = 0
+    for size in sizes:
+        img, title = render_product(index, seed, size)
+        slug = title.lower().replace(' ', '_')
+        for name in formats:
+            pil_format, extension, options = FORMATS[name]
+            path = Path(output_dir) / f"{index:06d}_{slug}_{size[0]}x{size[1]}.{extension}"
+            img.save(path, pil_format, **options)
+            written += path.stat().st_size
+    return written
+
+
+def generate_corpus(count, sizes, formats, output_dir, seed=0, workers=None):
+    """Render count products in every size and format across a process pool; returns (files, bytes)."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    jobs = [(index, seed, sizes, formats, str(output_dir)) for index in range(count)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        total_bytes = sum(pool.map(_render_job, jobs, chunksize=max(1, count // (4 * (workers or os.cpu_count() or 1)))))
+    return count * len(sizes) * len(formats), total_bytes
+
+
+def parse_sizes(value):
+    sizes = []
+    for part in value.split(','):
+        width, _, height = part.strip().lower().partition('x')
+        sizes.append((int(width), int(height or width)))
+    return sizes
+
+
+def parse_formats(value):
+    formats = [name.strip().lower().replace('jpg', 'jpeg') for name in value.split(',')]
+    unknown = [name for name in formats if name not in FORMATS]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown format(s): {', '.join(unknown)}")
+    if 'webp' in formats and not features.check('webp'):
+        print("⚠️  This Pillow build has no WebP support; skipping webp")
+        formats.remove('webp')
+    return formats
+
+
+def create_samples():
+    """Generate the sample images in TEST_IMAGES."""
     images_dir = Path(__file__).parent / "images"
     images_dir.mkdir(exist_ok=True)
     
@@ -129,5 +234,32 @@ def main():
     print("  - Test image validation (file types, sizes)")
     print("  - Test image display and gallery functionality")
 
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate sample images, or with --count a product image corpus.")
+    parser.add_argument('--count', type=int, help="Number of products to render into a corpus")
+    parser.add_argument('--sizes', type=parse_sizes, default=[(500, 500)],
+                        help="Comma-separated WIDTHxHEIGHT sizes, e.g. 500x500,1600x1200 (default 500x500)")
+    parser.add_argument('--formats', type=parse_formats, default=['jpeg'],
+                        help="Comma-separated formats: jpeg, png, webp (default jpeg)")
+    parser.add_argument('--output', type=Path, default=Path(__file__).parent / "images" / "corpus",
+                        help="Corpus directory (default test_data/images/corpus)")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: one per CPU)")
+    parser.add_argument('--seed', type=int, default=0, help="Seed; the same seed renders the same corpus")
+    args = parser.parse_args()
+
+    if args.count is None:
+        create_samples()
+        return
+
+    started = time.perf_counter()
+    files, total_bytes = generate_corpus(args.count, args.sizes, args.formats, args.output, args.seed, args.workers)
+    elapsed = time.perf_counter() - started
+    print(
+        f"✅ Rendered {files} files ({total_bytes / 1024 / 1024:.1f} MiB) from {args.count} products "
+        f"in {elapsed:.1f}s ({files / elapsed:.0f} files/s) into {args.output}"
+    )
+
+
 if __name__ == "__main__":
     main()
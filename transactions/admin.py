@@ -1,3 +1,21 @@
 from django.contrib import admin
 
-# Admin will be configured in Phase 6
+from core.paginator import EstimatedCountPaginator
+from .models import Transaction
+
+
+@admin.register(Transaction)
+class TransactionAdmin(admin.ModelAdmin):
+    """Admin for Transaction model."""
+    list_display = ['id', 'item', 'buyer', 'seller', 'price', 'status', 'expires_at', 'created_at']
+    list_filter = ['status']
+    search_fields = ['item__title', 'buyer__username', 'seller__username']
+    raw_id_fields = ['item', 'buyer', 'seller']
+    readonly_fields = ['created_at', 'updated_at']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    
+    def get_queryset(self, request):
+        """Optimize queryset with select_related."""
+        queryset = super().get_queryset(request)
+        return queryset.select_related('item', 'buyer', 'seller')
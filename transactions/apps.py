@@ -3,3 +3,8 @@ from django.apps import AppConfig
 class TransactionsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'transactions'
+
+    def ready(self):
+        from core import counters
+        from .models import pending_transaction_count
+        counters.register('pending_transactions', pending_transaction_count)
@@ -0,0 +1,120 @@
+"""
+Idempotency-Key support for state-changing views.
+
+The first request with a given key claims a row in IdempotencyKey, runs
+the view and records its redirect, with the flash messages it queued,
+in the same database transaction. A retry with the same key finds the
+row and replays the stored redirect and messages without running the
+view again, so a retried failure reports the same error. Because the claim is uncommitted while
+the view runs, a concurrent duplicate waits on the unique constraint and
+then replays the committed result; if the first request crashes, its
+claim rolls back and the retry runs normally.
+"""
+
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.contrib import messages
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse, HttpResponseBadRequest
+from django.utils import timezone
+
+from .models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+IDEMPOTENCY_FIELD = 'idempotency_key'
+MAX_KEY_LENGTH = 64
+
+
+def _pending_messages(request):
+    """The flash messages waiting to be shown, read without marking them as shown."""
+    storage = messages.get_messages(request)
+    used = storage.used
+    pending = list(storage)
+    # Iterating marks the messages as shown; keep them for the page they were meant for
+    storage.used = used
+    return pending
+
+
+def _replay(request, record):
+    for level, text in record.messages:
+        messages.add_message(request, level, text)
+    response = HttpResponse(status=record.status_code)
+    if record.location:
+        response['Location'] = record.location
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def _claim(user, key):
+    """Insert the key, or return the live record already holding it."""
+    now = timezone.now()
+    existing = IdempotencyKey.objects.filter(user=user, key=key).first()
+    if existing is not None:
+        if existing.expires_at > now:
+            return None, existing
+        # Expired but not purged yet: the key is free to reuse
+        existing.delete()
+
+    try:
+        with transaction.atomic():
+            record = IdempotencyKey.objects.create(
+                user=user,
+                key=key,
+                status_code=0,
+                expires_at=now + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS),
+            )
+    except IntegrityError:
+        # A concurrent duplicate committed first; replay its result
+        return None, IdempotencyKey.objects.get(user=user, key=key)
+    return record, None
+
+
+def idempotent(view_func):
+    """Replay the stored redirect when an authenticated client retries with the same key."""
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER) or request.POST.get(IDEMPOTENCY_FIELD)
+        if not key or not request.user.is_authenticated:
+            return view_func(request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return HttpResponseBadRequest("Idempotency key is too long.")
+
+        with transaction.atomic():
+            record, existing = _claim(request.user, key)
+            if existing is not None:
+                return _replay(request, existing)
+
+            already_pending = len(_pending_messages(request))
+            response = view_func(request, *args, **kwargs)
+            if 300 <= response.status_code < 400:
+                record.status_code = response.status_code
+                record.location = response.get('Location', '')
+                # Messages are only ever appended, so the view's own come after the earlier ones
+                added = _pending_messages(request)[already_pending:]
+                record.messages = [[message.level, message.message] for message in added]
+                record.save(update_fields=['status_code', 'location', 'messages'])
+            else:
+                # Only redirects are replayable; let the client retry anything else
+                record.delete()
+        return response
+    return wrapper
+
+
+def purge_expired_keys(batch_size=1000, now=None):
+    """Delete expired keys in batches; returns the number removed."""
+    now = now or timezone.now()
+    purged = 0
+    while True:
+        ids = list(
+            IdempotencyKey.objects.filter(expires_at__lte=now)
+            .order_by('expires_at')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        purged += IdempotencyKey.objects.filter(pk__in=ids).delete()[0]
+        if len(ids) < batch_size:
+            break
+    return purged
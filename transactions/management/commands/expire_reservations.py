@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from transactions.services import expire_reservations
+
+
+class Command(BaseCommand):
+    help = "Cancel lapsed pending reservations in batches and put their items back on sale."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Reservations expired per database transaction")
+
+    def handle(self, *args, **options):
+        expired = expire_reservations(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Expired {expired} reservation(s)."))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from transactions.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Backfill or reconcile seller sales rollups and UserProfile.total_sales from completed transactions."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help="Sellers rebuilt per database transaction")
+        parser.add_argument('--seller', type=int, action='append', dest='sellers', help="Only rebuild this seller id (repeatable)")
+
+    def handle(self, *args, **options):
+        processed = rebuild_rollups(chunk_size=options['chunk_size'], seller_ids=options['sellers'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt sales rollups for {processed} user(s)."))
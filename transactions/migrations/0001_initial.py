@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:15
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('marketplace', '0003_item_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Transaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('confirmed', 'Confirmed'), ('completed', 'Completed'), ('cancelled', 'Cancelled')], default='pending', help_text='Transaction status', max_length=20)),
+                ('price', models.DecimalField(decimal_places=2, help_text='Agreed price at reservation time', max_digits=10)),
+                ('notes', models.TextField(blank=True, help_text='Notes from the buyer')),
+                ('expires_at', models.DateTimeField(blank=True, help_text='When a pending reservation lapses and the item is released', null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('buyer', models.ForeignKey(help_text='Buying user', on_delete=django.db.models.deletion.CASCADE, related_name='purchases', to=settings.AUTH_USER_MODEL)),
+                ('item', models.ForeignKey(help_text='Purchased item', on_delete=django.db.models.deletion.PROTECT, related_name='transactions', to='marketplace.item')),
+                ('seller', models.ForeignKey(help_text='Selling user', on_delete=django.db.models.deletion.CASCADE, related_name='sales', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Transaction',
+                'verbose_name_plural': 'Transactions',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['buyer', '-created_at'], name='transaction_buyer_i_053873_idx'), models.Index(fields=['seller', '-created_at'], name='transaction_seller__8cf6c4_idx'), models.Index(fields=['status', 'expires_at'], name='transaction_status_d02115_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:21
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('marketplace', '0003_item_status'),
+        ('transactions', '0002_idempotencykey_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, help_text='When the sale was completed', null=True),
+        ),
+        migrations.CreateModel(
+            name='MonthlySellerSales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sales_count', models.PositiveIntegerField(default=0, help_text='Completed sales in the period')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, help_text='Sum of sale prices in the period', max_digits=14)),
+                ('month', models.DateField(help_text='First day of the month the sales completed')),
+                ('category', models.ForeignKey(blank=True, help_text='Category of the sold items', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='marketplace.category')),
+                ('seller', models.ForeignKey(help_text='Selling user', on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Monthly Seller Sales',
+                'verbose_name_plural': 'Monthly Seller Sales',
+                'ordering': ['-month'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailySellerSales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sales_count', models.PositiveIntegerField(default=0, help_text='Completed sales in the period')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, help_text='Sum of sale prices in the period', max_digits=14)),
+                ('day', models.DateField(help_text='Day the sales completed')),
+                ('category', models.ForeignKey(blank=True, help_text='Category of the sold items', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='marketplace.category')),
+                ('seller', models.ForeignKey(help_text='Selling user', on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Daily Seller Sales',
+                'verbose_name_plural': 'Daily Seller Sales',
+                'ordering': ['-day'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='monthlysellersales',
+            constraint=models.UniqueConstraint(condition=models.Q(('category__isnull', False)), fields=('seller', 'category', 'month'), name='unique_monthly_sales_per_category'),
+        ),
+        migrations.AddConstraint(
+            model_name='monthlysellersales',
+            constraint=models.UniqueConstraint(condition=models.Q(('category__isnull', True)), fields=('seller', 'month'), name='unique_monthly_sales_uncategorized'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailysellersales',
+            constraint=models.UniqueConstraint(condition=models.Q(('category__isnull', False)), fields=('seller', 'category', 'day'), name='unique_daily_sales_per_category'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailysellersales',
+            constraint=models.UniqueConstraint(condition=models.Q(('category__isnull', True)), fields=('seller', 'day'), name='unique_daily_sales_uncategorized'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 03:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0003_transaction_completed_at_monthlysellersales_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='idempotencykey',
+            name='messages',
+            field=models.JSONField(blank=True, default=list, help_text='[level, text] flash messages of the first response'),
+        ),
+    ]
@@ -1,3 +1,166 @@
 from django.db import models
+from django.db.models import Q
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+from django.contrib.auth.models import User
 
-# Models will be added in Phase 6
+from marketplace.models import Category
+
+
+class Transaction(models.Model):
+    """Purchase of a marketplace item, from reservation to completion."""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('confirmed', 'Confirmed'),
+        ('completed', 'Completed'),
+        ('cancelled', 'Cancelled'),
+    ]
+
+    buyer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='purchases', help_text="Buying user")
+    seller = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sales', help_text="Selling user")
+    item = models.ForeignKey(
+        'marketplace.Item',
+        on_delete=models.PROTECT,
+        related_name='transactions',
+        help_text="Purchased item"
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', help_text="Transaction status")
+    price = models.DecimalField(max_digits=10, decimal_places=2, help_text="Agreed price at reservation time")
+    notes = models.TextField(blank=True, help_text="Notes from the buyer")
+    expires_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When a pending reservation lapses and the item is released"
+    )
+    completed_at = models.DateTimeField(null=True, blank=True, help_text="When the sale was completed")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Transaction'
+        verbose_name_plural = 'Transactions'
+        indexes = [
+            models.Index(fields=['buyer', '-created_at']),
+            models.Index(fields=['seller', '-created_at']),
+            # Lets the expiry job walk lapsed reservations in batches
+            models.Index(fields=['status', 'expires_at']),
+        ]
+
+    def __str__(self):
+        return f"Transaction {self.id} - {self.item.title}"
+
+    def is_participant(self, user):
+        """Check if user is the buyer or the seller."""
+        return user.pk in (self.buyer_id, self.seller_id)
+
+
+class IdempotencyKey(models.Model):
+    """Outcome of a client request, replayed when the client retries with the same key."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='idempotency_keys', help_text="User who sent the request")
+    key = models.CharField(max_length=64, help_text="Client-supplied Idempotency-Key")
+    status_code = models.PositiveSmallIntegerField(help_text="HTTP status of the first response")
+    location = models.CharField(max_length=500, blank=True, help_text="Redirect target of the first response")
+    messages = models.JSONField(default=list, blank=True, help_text="[level, text] flash messages of the first response")
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True, help_text="When the key may be purged and reused")
+
+    class Meta:
+        verbose_name = 'Idempotency Key'
+        verbose_name_plural = 'Idempotency Keys'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='unique_idempotency_key_per_user'),
+        ]
+
+    def __str__(self):
+        return f"{self.key} ({self.user_id})"
+
+
+class SellerSalesRollup(models.Model):
+    """Sales totals of one seller and category over a period, kept up to date as sales complete."""
+    seller = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+', help_text="Selling user")
+    category = models.ForeignKey(
+        'marketplace.Category',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        help_text="Category of the sold items"
+    )
+    sales_count = models.PositiveIntegerField(default=0, help_text="Completed sales in the period")
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0, help_text="Sum of sale prices in the period")
+
+    class Meta:
+        abstract = True
+
+    @property
+    def average_price(self):
+        """Average sale price in the period."""
+        if not self.sales_count:
+            return 0
+        return self.revenue / self.sales_count
+
+
+class DailySellerSales(SellerSalesRollup):
+    """Per-day sales rollup."""
+    day = models.DateField(help_text="Day the sales completed")
+
+    class Meta:
+        ordering = ['-day']
+        verbose_name = 'Daily Seller Sales'
+        verbose_name_plural = 'Daily Seller Sales'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['seller', 'category', 'day'],
+                condition=Q(category__isnull=False),
+                name='unique_daily_sales_per_category'
+            ),
+            models.UniqueConstraint(
+                fields=['seller', 'day'],
+                condition=Q(category__isnull=True),
+                name='unique_daily_sales_uncategorized'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.seller_id} {self.day}: {self.sales_count} sales"
+
+
+class MonthlySellerSales(SellerSalesRollup):
+    """Per-month sales rollup; month is the first day of the month."""
+    month = models.DateField(help_text="First day of the month the sales completed")
+
+    class Meta:
+        ordering = ['-month']
+        verbose_name = 'Monthly Seller Sales'
+        verbose_name_plural = 'Monthly Seller Sales'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['seller', 'category', 'month'],
+                condition=Q(category__isnull=False),
+                name='unique_monthly_sales_per_category'
+            ),
+            models.UniqueConstraint(
+                fields=['seller', 'month'],
+                condition=Q(category__isnull=True),
+                name='unique_monthly_sales_uncategorized'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.seller_id} {self.month:%Y-%m}: {self.sales_count} sales"
+
+
+@receiver(pre_delete, sender=Category)
+def fold_deleted_category_rollups(sender, instance, **kwargs):
+    """Merge a deleted category's sales into the sellers' uncategorized rollups."""
+    from .rollups import fold_category
+    fold_category(instance.pk)
+
+
+def pending_transaction_count(user_id):
+    """Count pending transactions a user takes part in."""
+    return Transaction.objects.filter(
+        Q(buyer_id=user_id) | Q(seller_id=user_id),
+        status='pending'
+    ).count()
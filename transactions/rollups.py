@@ -0,0 +1,147 @@
+"""
+Seller sales rollups.
+
+Completing a transaction bumps one daily and one monthly row for the
+seller and category with F() increments, plus UserProfile.total_sales, so
+profile pages and the seller list read a handful of small rows instead of
+aggregating the transactions table. rebuild_rollups recomputes everything
+from completed transactions, a chunk of sellers at a time, to backfill or
+repair drift. Deleting a category folds its rows into the sellers'
+uncategorized rows (fold_category), as its items become uncategorized.
+"""
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DateField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate, TruncMonth
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from users.models import UserProfile
+from .models import DailySellerSales, MonthlySellerSales, Transaction
+
+
+def _bump(model, seller_id, category_id, price, **period):
+    lookup = dict(seller_id=seller_id, category_id=category_id, **period)
+    increments = dict(sales_count=F('sales_count') + 1, revenue=F('revenue') + price)
+    if model.objects.filter(**lookup).update(**increments):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(sales_count=1, revenue=price, **lookup)
+    except IntegrityError:
+        # Another sale created the row first
+        model.objects.filter(**lookup).update(**increments)
+
+
+def record_sale(seller_id, category_id, price, completed_at):
+    """Add one completed sale to the seller's rollups."""
+    day = timezone.localdate(completed_at)
+    _bump(DailySellerSales, seller_id, category_id, price, day=day)
+    _bump(MonthlySellerSales, seller_id, category_id, price, month=day.replace(day=1))
+    UserProfile.objects.filter(user_id=seller_id).update(total_sales=F('total_sales') + 1)
+
+
+def fold_category(category_id):
+    """
+    Merge a category's rollup rows into the matching uncategorized rows.
+
+    Runs before the category is deleted: letting SET_NULL clear the
+    category would leave two uncategorized rows for the same seller and
+    period wherever one already existed, which the unique constraints reject.
+    """
+    with transaction.atomic():
+        for model, period_field in ((DailySellerSales, 'day'), (MonthlySellerSales, 'month')):
+            for row in model.objects.select_for_update().filter(category_id=category_id):
+                lookup = {'seller_id': row.seller_id, 'category': None, period_field: getattr(row, period_field)}
+                merged = model.objects.filter(**lookup).update(
+                    sales_count=F('sales_count') + row.sales_count, revenue=F('revenue') + row.revenue,
+                )
+                if merged:
+                    row.delete()
+                else:
+                    row.category = None
+                    row.save(update_fields=['category'])
+
+
+def seller_sales_summary(seller, months=12):
+    """Return lifetime totals and recent monthly figures for a seller."""
+    rows = MonthlySellerSales.objects.filter(seller=seller)
+    totals = rows.aggregate(sales_count=Sum('sales_count'), revenue=Sum('revenue'))
+    by_month = list(
+        rows.values('month')
+        .annotate(sales_count=Sum('sales_count'), revenue=Sum('revenue'))
+        .order_by('-month')[:months]
+    )
+    for row in by_month:
+        row['average_price'] = row['revenue'] / row['sales_count'] if row['sales_count'] else 0
+
+    sales_count = totals['sales_count'] or 0
+    revenue = totals['revenue'] or 0
+    return {
+        'sales_count': sales_count,
+        'revenue': revenue,
+        'average_price': revenue / sales_count if sales_count else 0,
+        'by_month': by_month,
+    }
+
+
+def _aggregate(seller_ids, trunc, period_field):
+    return (
+        Transaction.objects.filter(seller_id__in=seller_ids, status='completed')
+        .annotate(**{period_field: trunc('completed_at', output_field=DateField())})
+        .values('seller_id', 'item__category_id', period_field)
+        .annotate(sales_count=Count('pk'), revenue=Sum('price'))
+        .order_by()
+    )
+
+
+def _rebuild_chunk(seller_ids):
+    with transaction.atomic():
+        for model, trunc, period_field in (
+            (DailySellerSales, TruncDate, 'day'),
+            (MonthlySellerSales, TruncMonth, 'month'),
+        ):
+            model.objects.filter(seller_id__in=seller_ids).delete()
+            model.objects.bulk_create([
+                model(
+                    seller_id=row['seller_id'],
+                    category_id=row['item__category_id'],
+                    sales_count=row['sales_count'],
+                    revenue=row['revenue'],
+                    **{period_field: row[period_field]}
+                )
+                for row in _aggregate(seller_ids, trunc, period_field)
+            ])
+
+        monthly_total = (
+            MonthlySellerSales.objects.filter(seller_id=OuterRef('user_id'))
+            .values('seller_id')
+            .annotate(total=Sum('sales_count'))
+            .values('total')
+        )
+        UserProfile.objects.filter(user_id__in=seller_ids).update(
+            total_sales=Coalesce(Subquery(monthly_total), Value(0))
+        )
+
+
+def rebuild_rollups(chunk_size=500, seller_ids=None):
+    """
+    Recompute rollups and total_sales from completed transactions.
+
+    Users are walked in primary key order, chunk_size at a time, each chunk
+    in its own short transaction. Returns the number of users processed.
+    """
+    users = User.objects.order_by('pk')
+    if seller_ids is not None:
+        users = users.filter(pk__in=seller_ids)
+
+    processed = 0
+    last_pk = 0
+    while True:
+        chunk = list(users.filter(pk__gt=last_pk).values_list('pk', flat=True)[:chunk_size])
+        if not chunk:
+            break
+        _rebuild_chunk(chunk)
+        processed += len(chunk)
+        last_pk = chunk[-1]
+    return processed
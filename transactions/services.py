@@ -0,0 +1,156 @@
+"""
+Reservation and status workflow for transactions.
+
+Every state change is a single conditional UPDATE whose WHERE clause
+encodes the expected current state, followed by a row-count check. Two
+buyers racing for the same item therefore never both win, and no row lock
+is held beyond the short statement that flips the status.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from core import counters
+from marketplace.models import Item
+from .models import Transaction
+from .rollups import record_sale
+
+OPEN_STATUSES = ['pending', 'confirmed']
+
+
+class TransactionError(Exception):
+    """Raised when a transaction cannot move to the requested state."""
+
+
+def _refresh_pending_counters(*user_ids):
+    for user_id in set(user_ids):
+        counters.invalidate('pending_transactions', user_id)
+
+
+def reserve_item(item_id, buyer, notes=''):
+    """
+    Reserve an available item for a buyer and open a pending transaction.
+
+    Raises TransactionError if the item is gone, already reserved or sold,
+    or belongs to the buyer.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        reserved = Item.objects.filter(
+            pk=item_id,
+            is_active=True,
+            status='available'
+        ).exclude(seller=buyer).update(status='reserved', updated_at=now)
+        if reserved != 1:
+            raise TransactionError("This item is no longer available.")
+
+        seller_id, price = Item.objects.values_list('seller_id', 'price').get(pk=item_id)
+        created = Transaction.objects.create(
+            buyer=buyer,
+            seller_id=seller_id,
+            item_id=item_id,
+            price=price,
+            notes=notes,
+            expires_at=now + timedelta(minutes=settings.RESERVATION_TIMEOUT_MINUTES),
+        )
+
+        def bump_counters():
+            counters.increment('pending_transactions', buyer.pk)
+            counters.increment('pending_transactions', seller_id)
+        transaction.on_commit(bump_counters)
+    return created
+
+
+def _release_items(transaction_ids):
+    """Put items of cancelled transactions back on sale unless re-reserved since."""
+    return Item.objects.filter(
+        transactions__pk__in=transaction_ids,
+        status='reserved'
+    ).exclude(
+        transactions__status__in=OPEN_STATUSES
+    ).update(status='available', updated_at=timezone.now())
+
+
+def confirm_transaction(txn, user):
+    """Seller accepts a pending reservation."""
+    if user.pk != txn.seller_id:
+        raise TransactionError("Only the seller can confirm this transaction.")
+    updated = Transaction.objects.filter(pk=txn.pk, status='pending').update(
+        status='confirmed', expires_at=None, updated_at=timezone.now()
+    )
+    if updated != 1:
+        raise TransactionError("Only pending transactions can be confirmed.")
+    counters.decrement('pending_transactions', txn.buyer_id)
+    counters.decrement('pending_transactions', txn.seller_id)
+
+
+def complete_transaction(txn, user):
+    """Seller marks a confirmed transaction as completed and the item as sold."""
+    if user.pk != txn.seller_id:
+        raise TransactionError("Only the seller can complete this transaction.")
+    now = timezone.now()
+    with transaction.atomic():
+        updated = Transaction.objects.filter(pk=txn.pk, status='confirmed').update(
+            status='completed', completed_at=now, updated_at=now
+        )
+        if updated != 1:
+            raise TransactionError("Only confirmed transactions can be completed.")
+        Item.objects.filter(pk=txn.item_id).update(status='sold', is_active=False, updated_at=now)
+        category_id = Item.objects.values_list('category_id', flat=True).get(pk=txn.item_id)
+        record_sale(txn.seller_id, category_id, txn.price, now)
+
+
+def cancel_transaction(txn, user):
+    """Buyer or seller cancels an open transaction, releasing the item."""
+    if not txn.is_participant(user):
+        raise TransactionError("You are not part of this transaction.")
+    now = timezone.now()
+    with transaction.atomic():
+        was_pending = Transaction.objects.filter(pk=txn.pk, status='pending').update(
+            status='cancelled', expires_at=None, updated_at=now
+        )
+        if not was_pending:
+            updated = Transaction.objects.filter(pk=txn.pk, status='confirmed').update(
+                status='cancelled', updated_at=now
+            )
+            if updated != 1:
+                raise TransactionError("Only open transactions can be cancelled.")
+        _release_items([txn.pk])
+    if was_pending:
+        counters.decrement('pending_transactions', txn.buyer_id)
+        counters.decrement('pending_transactions', txn.seller_id)
+
+
+def expire_reservations(batch_size=500, now=None):
+    """
+    Cancel lapsed pending reservations in batches and release their items.
+
+    Each batch is its own short transaction so the job never holds locks on
+    more than batch_size rows. Returns the number of reservations expired.
+    """
+    now = now or timezone.now()
+    expired = 0
+    while True:
+        batch = list(
+            Transaction.objects.filter(status='pending', expires_at__lte=now)
+            .order_by('expires_at', 'pk')
+            .values_list('pk', 'buyer_id', 'seller_id')[:batch_size]
+        )
+        if not batch:
+            break
+
+        ids = [pk for pk, _, _ in batch]
+        with transaction.atomic():
+            # Re-check the status so reservations confirmed meanwhile are kept
+            expired += Transaction.objects.filter(
+                pk__in=ids, status='pending'
+            ).update(status='cancelled', expires_at=None, updated_at=now)
+            _release_items(ids)
+
+        _refresh_pending_counters(*[user_id for _, *user_ids in batch for user_id in user_ids])
+        if len(batch) < batch_size:
+            break
+    return expired
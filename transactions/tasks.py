@@ -0,0 +1,21 @@
+from core.tasks import task
+
+from . import idempotency, rollups, services
+
+
+@task
+def expire_reservations():
+    """Release items whose reservation lapsed."""
+    services.expire_reservations()
+
+
+@task
+def purge_idempotency_keys():
+    """Delete expired idempotency keys."""
+    idempotency.purge_expired_keys()
+
+
+@task
+def rebuild_sales_rollups(seller_ids=None):
+    """Recompute seller sales rollups from completed transactions."""
+    rollups.rebuild_rollups(seller_ids=seller_ids)
@@ -0,0 +1,342 @@
+import threading
+from datetime import timedelta
+
+from django.test import TestCase, TransactionTestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.contrib import messages
+from django.contrib.auth.models import User
+from django.db import OperationalError, connection
+from django.urls import reverse
+from django.utils import timezone
+from marketplace.models import Category, Item
+from users.models import UserProfile
+from transactions.idempotency import purge_expired_keys
+from transactions.models import DailySellerSales, IdempotencyKey, MonthlySellerSales, Transaction
+from transactions.rollups import rebuild_rollups, seller_sales_summary
+from transactions.services import (
+    TransactionError, cancel_transaction, complete_transaction,
+    confirm_transaction, expire_reservations, reserve_item,
+)
+
+
+def create_item(seller, title='Skillet'):
+    """Create an active item for a seller."""
+    category, _ = Category.objects.get_or_create(name='Cookware_Test')
+    return Item.objects.create(
+        seller=seller,
+        title=title,
+        description='Test item',
+        category=category,
+        price=50.00,
+        condition='good',
+        location='Test Location'
+    )
+
+
+class ReservationTests(TestCase):
+    """Tests for the reservation workflow."""
+
+    def setUp(self):
+        """Create a seller, two buyers and an item."""
+        self.seller = User.objects.create_user(username='seller', password='testpass')
+        self.buyer = User.objects.create_user(username='buyer', password='testpass')
+        self.other_buyer = User.objects.create_user(username='other', password='testpass')
+        self.item = create_item(self.seller)
+
+    def test_reserve_available_item(self):
+        """Test reserving an item opens a pending transaction."""
+        txn = reserve_item(self.item.pk, self.buyer)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.status, 'reserved')
+        self.assertEqual(txn.status, 'pending')
+        self.assertEqual(txn.seller, self.seller)
+        self.assertEqual(txn.price, self.item.price)
+        self.assertIsNotNone(txn.expires_at)
+
+    def test_second_reservation_fails(self):
+        """Test a reserved item cannot be reserved again."""
+        reserve_item(self.item.pk, self.buyer)
+        with self.assertRaises(TransactionError):
+            reserve_item(self.item.pk, self.other_buyer)
+        self.assertEqual(Transaction.objects.count(), 1)
+
+    def test_seller_cannot_buy_own_item(self):
+        """Test sellers cannot reserve their own items."""
+        with self.assertRaises(TransactionError):
+            reserve_item(self.item.pk, self.seller)
+
+    def test_inactive_item_cannot_be_reserved(self):
+        """Test removed items cannot be reserved."""
+        Item.objects.filter(pk=self.item.pk).update(is_active=False)
+        with self.assertRaises(TransactionError):
+            reserve_item(self.item.pk, self.buyer)
+
+    def test_complete_marks_item_sold(self):
+        """Test completing a confirmed transaction sells the item."""
+        txn = reserve_item(self.item.pk, self.buyer)
+        confirm_transaction(txn, self.seller)
+        complete_transaction(txn, self.seller)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.status, 'sold')
+        self.assertFalse(self.item.is_active)
+
+    def test_buyer_cannot_confirm(self):
+        """Test only the seller can confirm."""
+        txn = reserve_item(self.item.pk, self.buyer)
+        with self.assertRaises(TransactionError):
+            confirm_transaction(txn, self.buyer)
+
+    def test_cancel_releases_item(self):
+        """Test cancelling puts the item back on sale."""
+        txn = reserve_item(self.item.pk, self.buyer)
+        cancel_transaction(txn, self.buyer)
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.status, 'available')
+        reserve_item(self.item.pk, self.other_buyer)
+
+    def test_expire_reservations_in_batches(self):
+        """Test lapsed reservations are cancelled and items released."""
+        items = [self.item] + [create_item(self.seller, f'Pan {i}') for i in range(4)]
+        for item in items:
+            reserve_item(item.pk, self.buyer)
+        kept = Transaction.objects.order_by('pk').last()
+        Transaction.objects.exclude(pk=kept.pk).update(expires_at=timezone.now() - timedelta(minutes=1))
+
+        self.assertEqual(expire_reservations(batch_size=2), 4)
+        self.assertEqual(Transaction.objects.filter(status='cancelled').count(), 4)
+        self.assertEqual(Item.objects.filter(status='available').count(), 4)
+        self.assertEqual(Item.objects.get(pk=kept.item_id).status, 'reserved')
+
+
+class TransactionViewsTests(TestCase):
+    """Tests for transaction views."""
+
+    def setUp(self):
+        """Create users, an item and log in as buyer."""
+        self.client = Client()
+        self.seller = User.objects.create_user(username='seller', password='testpass')
+        self.buyer = User.objects.create_user(username='buyer', password='testpass')
+        self.item = create_item(self.seller)
+        self.client.login(username='buyer', password='testpass')
+
+    def test_create_view_reserves_item(self):
+        """Test posting to create reserves the item."""
+        response = self.client.post(reverse('transactions:create'), {'item': self.item.pk})
+        txn = Transaction.objects.get()
+        self.assertRedirects(response, reverse('transactions:detail', args=[txn.pk]))
+
+    def test_create_view_requires_post(self):
+        """Test create rejects GET requests."""
+        response = self.client.get(reverse('transactions:create'))
+        self.assertEqual(response.status_code, 405)
+
+    def test_detail_hidden_from_other_users(self):
+        """Test outsiders cannot see a transaction."""
+        txn = reserve_item(self.item.pk, self.buyer)
+        User.objects.create_user(username='outsider', password='testpass')
+        self.client.login(username='outsider', password='testpass')
+        response = self.client.get(reverse('transactions:detail', args=[txn.pk]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_seller_confirms_via_view(self):
+        """Test the seller can confirm from the detail page."""
+        txn = reserve_item(self.item.pk, self.buyer)
+        self.client.login(username='seller', password='testpass')
+        self.client.post(reverse('transactions:update', args=[txn.pk, 'confirm']))
+        txn.refresh_from_db()
+        self.assertEqual(txn.status, 'confirmed')
+
+
+class IdempotencyKeyTests(TestCase):
+    """Tests for Idempotency-Key replay on transaction creation."""
+
+    def setUp(self):
+        """Create users, an item and log in as buyer."""
+        self.client = Client()
+        self.seller = User.objects.create_user(username='seller', password='testpass')
+        self.buyer = User.objects.create_user(username='buyer', password='testpass')
+        self.item = create_item(self.seller)
+        self.client.login(username='buyer', password='testpass')
+
+    def post(self, key, **extra):
+        return self.client.post(
+            reverse('transactions:create'), {'item': self.item.pk}, HTTP_IDEMPOTENCY_KEY=key, **extra
+        )
+
+    def shown_messages(self, url):
+        page = self.client.get(url)
+        return [(message.level, str(message)) for message in messages.get_messages(page.wsgi_request)]
+
+    def test_retry_replays_first_response(self):
+        """Test a retried request gets the original redirect without a new reservation."""
+        first = self.post('abc123')
+        with CaptureQueriesContext(connection) as queries:
+            retry = self.post('abc123')
+        touched = ' '.join(query['sql'] for query in queries)
+        self.assertNotIn('marketplace_item', touched)
+        self.assertNotIn('transactions_transaction', touched)
+        self.assertEqual(retry.status_code, first.status_code)
+        self.assertEqual(retry['Location'], first['Location'])
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(Transaction.objects.count(), 1)
+
+    def test_retried_failure_replays_its_error(self):
+        """Test a retry of a failed reservation gets the original error message again."""
+        self.item.status = 'sold'
+        self.item.save()
+        first = self.post('failed')
+        # Messages each response left for the page it redirects to
+        first_messages = self.shown_messages(first['Location'])
+        retry = self.post('failed')
+        replayed = self.shown_messages(retry['Location'])
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry['Location'], first['Location'])
+        self.assertEqual(first_messages[0][0], messages.ERROR)
+        self.assertEqual(replayed, first_messages)
+
+    def test_only_the_views_own_messages_are_recorded(self):
+        """Test messages still waiting from an earlier request are not stored with the key."""
+        self.item.status = 'sold'
+        self.item.save()
+        self.post('earlier')
+        self.post('later')
+        self.assertEqual(len(IdempotencyKey.objects.get(key='later').messages), 1)
+
+    def test_form_field_key_is_honoured(self):
+        """Test the hidden form field works like the header."""
+        url = reverse('transactions:create')
+        self.client.post(url, {'item': self.item.pk, 'idempotency_key': 'form-key'})
+        response = self.client.post(url, {'item': self.item.pk, 'idempotency_key': 'form-key'})
+        self.assertEqual(response['Idempotent-Replayed'], 'true')
+
+    def test_keys_are_scoped_per_user(self):
+        """Test another user's identical key is not replayed."""
+        self.post('shared')
+        User.objects.create_user(username='other', password='testpass')
+        self.client.login(username='other', password='testpass')
+        response = self.post('shared')
+        self.assertFalse(response.has_header('Idempotent-Replayed'))
+
+    def test_bad_request_is_not_stored(self):
+        """Test non-redirect responses release the key."""
+        self.client.post(reverse('transactions:create'), {}, HTTP_IDEMPOTENCY_KEY='bad')
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_expired_key_is_reusable_and_purged(self):
+        """Test expired keys run the view again and are purged in bulk."""
+        self.post('old')
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(hours=1))
+        response = self.post('old')
+        self.assertFalse(response.has_header('Idempotent-Replayed'))
+
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(purge_expired_keys(batch_size=1), 1)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+
+class SalesRollupTests(TestCase):
+    """Tests for incremental and rebuilt seller sales rollups."""
+
+    def setUp(self):
+        """Create a seller, a buyer and complete two sales."""
+        self.seller = User.objects.create_user(username='seller', password='testpass')
+        self.buyer = User.objects.create_user(username='buyer', password='testpass')
+        for title in ('Skillet', 'Wok'):
+            txn = reserve_item(create_item(self.seller, title).pk, self.buyer)
+            confirm_transaction(txn, self.seller)
+            complete_transaction(txn, self.seller)
+
+    def test_completion_updates_rollups(self):
+        """Test completed sales are added to daily and monthly rows."""
+        daily = DailySellerSales.objects.get(seller=self.seller)
+        monthly = MonthlySellerSales.objects.get(seller=self.seller)
+        for row in (daily, monthly):
+            self.assertEqual(row.sales_count, 2)
+            self.assertEqual(row.revenue, 100)
+            self.assertEqual(row.average_price, 50)
+        self.seller.profile.refresh_from_db()
+        self.assertEqual(self.seller.profile.total_sales, 2)
+
+    def test_deleting_category_folds_rollups(self):
+        """Test a deleted category's sales merge into the existing uncategorized rows."""
+        uncategorized = create_item(self.seller, 'Ladle')
+        uncategorized.category = None
+        uncategorized.save()
+        txn = reserve_item(uncategorized.pk, self.buyer)
+        confirm_transaction(txn, self.seller)
+        complete_transaction(txn, self.seller)
+        self.assertEqual(MonthlySellerSales.objects.filter(seller=self.seller).count(), 2)
+
+        Category.objects.get(name='Cookware_Test').delete()
+        for model in (DailySellerSales, MonthlySellerSales):
+            row = model.objects.get(seller=self.seller)
+            self.assertIsNone(row.category_id)
+            self.assertEqual(row.sales_count, 3)
+            self.assertEqual(row.revenue, 150)
+
+    def test_summary_reads_rollups(self):
+        """Test the profile summary comes from the monthly rollup."""
+        with self.assertNumQueries(2):
+            summary = seller_sales_summary(self.seller)
+        self.assertEqual(summary['sales_count'], 2)
+        self.assertEqual(summary['revenue'], 100)
+        self.assertEqual(len(summary['by_month']), 1)
+
+    def test_rebuild_repairs_drift(self):
+        """Test the rebuild recomputes rollups and total_sales."""
+        MonthlySellerSales.objects.update(sales_count=99)
+        DailySellerSales.objects.all().delete()
+        UserProfile.objects.filter(pk=self.seller.profile.pk).update(total_sales=7)
+
+        rebuild_rollups(chunk_size=1)
+
+        self.assertEqual(MonthlySellerSales.objects.get(seller=self.seller).sales_count, 2)
+        self.assertEqual(DailySellerSales.objects.get(seller=self.seller).revenue, 100)
+        self.seller.profile.refresh_from_db()
+        self.assertEqual(self.seller.profile.total_sales, 2)
+
+
+class ConcurrentReservationTests(TransactionTestCase):
+    """Race many buyers for the same item."""
+
+    BUYERS = 12
+
+    def setUp(self):
+        """Create a seller, an item and many buyers."""
+        self.seller = User.objects.create_user(username='seller', password='testpass')
+        self.item = create_item(self.seller)
+        self.buyers = [
+            User.objects.create_user(username=f'buyer{i}', password='testpass')
+            for i in range(self.BUYERS)
+        ]
+
+    def test_exactly_one_winner(self):
+        """Test only one of many simultaneous reservations succeeds."""
+        barrier = threading.Barrier(self.BUYERS)
+        winners, losers = [], []
+
+        def attempt(buyer):
+            try:
+                barrier.wait()
+                for _ in range(50):
+                    try:
+                        winners.append(reserve_item(self.item.pk, buyer))
+                    except TransactionError:
+                        losers.append(buyer)
+                    except OperationalError:
+                        # SQLite reports write contention instead of blocking; retry like a client would
+                        continue
+                    break
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=attempt, args=(buyer,)) for buyer in self.buyers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(winners), 1)
+        self.assertEqual(len(losers), self.BUYERS - 1)
+        self.assertEqual(Transaction.objects.filter(item=self.item).count(), 1)
+        self.assertEqual(Item.objects.get(pk=self.item.pk).status, 'reserved')
@@ -7,4 +7,5 @@ urlpatterns = [
     path('', views.transaction_list_view, name='list'),
     path('<int:pk>/', views.transaction_detail_view, name='detail'),
     path('create/', views.transaction_create_view, name='create'),
+    path('<int:pk>/<str:action>/', views.transaction_update_view, name='update'),
 ]
@@ -1,13 +1,89 @@
-from django.shortcuts import render
-from django.http import HttpResponse
+from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.http import Http404, HttpResponseBadRequest
+from django.views.decorators.http import require_POST
 
-# Stub views for transactions app - to be implemented in Phase 6
+from .idempotency import idempotent
+from .models import Transaction
+from .services import (
+    TransactionError, cancel_transaction, complete_transaction,
+    confirm_transaction, reserve_item,
+)
 
+TRANSACTION_ACTIONS = {
+    'confirm': (confirm_transaction, "Transaction confirmed."),
+    'complete': (complete_transaction, "Transaction completed. The item is now marked as sold."),
+    'cancel': (cancel_transaction, "Transaction cancelled."),
+}
+
+
+@login_required
 def transaction_list_view(request):
-    return HttpResponse("Transaction List View - Coming in Phase 6")
+    """List purchases and sales of the current user."""
+    transactions = Transaction.objects.filter(
+        Q(buyer=request.user) | Q(seller=request.user)
+    ).select_related('buyer', 'seller', 'item')
+    page_obj = Paginator(transactions, 20).get_page(request.GET.get('page'))
+
+    return render(request, 'transactions/transaction_list.html', {
+        'transactions': page_obj,
+        'page_obj': page_obj,
+        'is_paginated': page_obj.has_other_pages(),
+    })
 
+
+@login_required
 def transaction_detail_view(request, pk):
-    return HttpResponse("Transaction Detail View - Coming in Phase 6")
+    """Show a transaction to its buyer or seller."""
+    txn = get_object_or_404(
+        Transaction.objects.select_related('buyer', 'seller', 'item'), pk=pk
+    )
+    if not txn.is_participant(request.user):
+        raise Http404("No transaction found.")
+
+    return render(request, 'transactions/transaction_detail.html', {
+        'transaction': txn,
+        'is_seller': request.user.pk == txn.seller_id,
+    })
+
 
+@login_required
+@require_POST
+@idempotent
 def transaction_create_view(request):
-    return HttpResponse("Transaction Create View - Coming in Phase 6")
+    """Reserve an item for the current user; retries with an Idempotency-Key are replayed."""
+    item_id = request.POST.get('item', '')
+    if not item_id.isdigit():
+        return HttpResponseBadRequest("Missing item.")
+
+    try:
+        txn = reserve_item(int(item_id), request.user, notes=request.POST.get('notes', ''))
+    except TransactionError as exc:
+        messages.error(request, str(exc))
+        return redirect('marketplace:detail', pk=item_id)
+
+    messages.success(request, "Item reserved! The seller has been asked to confirm.")
+    return redirect('transactions:detail', pk=txn.pk)
+
+
+@login_required
+@require_POST
+def transaction_update_view(request, pk, action):
+    """Move a transaction through its status workflow."""
+    if action not in TRANSACTION_ACTIONS:
+        raise Http404("Unknown action.")
+    txn = get_object_or_404(Transaction, pk=pk)
+    if not txn.is_participant(request.user):
+        raise Http404("No transaction found.")
+
+    handler, success_message = TRANSACTION_ACTIONS[action]
+    try:
+        handler(txn, request.user)
+    except TransactionError as exc:
+        messages.error(request, str(exc))
+    else:
+        messages.success(request, success_message)
+    return redirect('transactions:detail', pk=txn.pk)
@@ -1,4 +1,7 @@
 from django.contrib import admin
+
+from core.paginator import EstimatedCountPaginator
+from marketplace.moderation import admin_action
 from .models import UserProfile
 
 
@@ -8,6 +11,15 @@ class UserProfileAdmin(admin.ModelAdmin):
     list_filter = ('is_seller', 'verification_status', 'created_at')
     search_fields = ('user__username', 'user__email', 'user__first_name', 'user__last_name')
     readonly_fields = ('created_at', 'updated_at', 'total_sales', 'average_rating')
+    raw_id_fields = ('user',)
+    list_select_related = ('user',)
+    ordering = ('-id',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = [
+        admin_action('suspend_sellers', 'Suspend selected sellers and hide their items'),
+        admin_action('reverify_sellers', 'Re-verify selected sellers'),
+    ]
     
     fieldsets = (
         ('User Information', {
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='rating_1_count',
+            field=models.PositiveIntegerField(default=0, help_text='Number of 1-star reviews'),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='rating_2_count',
+            field=models.PositiveIntegerField(default=0, help_text='Number of 2-star reviews'),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='rating_3_count',
+            field=models.PositiveIntegerField(default=0, help_text='Number of 3-star reviews'),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='rating_4_count',
+            field=models.PositiveIntegerField(default=0, help_text='Number of 4-star reviews'),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='rating_5_count',
+            field=models.PositiveIntegerField(default=0, help_text='Number of 5-star reviews'),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, help_text='Number of reviews received'),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='rating_score',
+            field=models.FloatField(default=0.0, help_text='Bayesian average rating used to rank sellers (0 until the first review)'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['is_seller', 'verification_status', '-rating_score', 'id'], name='users_userp_is_sell_c5d8bf_idx'),
+        ),
+    ]
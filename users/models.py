@@ -49,6 +49,18 @@ class UserProfile(models.Model):
         help_text="Average rating from buyers (0.0 to 5.0)"
     )
     
+    # Rating histogram and ranking score, maintained as reviews are added and removed
+    rating_count = models.PositiveIntegerField(default=0, help_text="Number of reviews received")
+    rating_1_count = models.PositiveIntegerField(default=0, help_text="Number of 1-star reviews")
+    rating_2_count = models.PositiveIntegerField(default=0, help_text="Number of 2-star reviews")
+    rating_3_count = models.PositiveIntegerField(default=0, help_text="Number of 3-star reviews")
+    rating_4_count = models.PositiveIntegerField(default=0, help_text="Number of 4-star reviews")
+    rating_5_count = models.PositiveIntegerField(default=0, help_text="Number of 5-star reviews")
+    rating_score = models.FloatField(
+        default=0.0,
+        help_text="Bayesian average rating used to rank sellers (0 until the first review)"
+    )
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -59,6 +71,8 @@ class UserProfile(models.Model):
         indexes = [
             models.Index(fields=['is_seller', '-average_rating']),
             models.Index(fields=['verification_status']),
+            # Seller directory: equality on both flags, then ordered by score
+            models.Index(fields=['is_seller', 'verification_status', '-rating_score', 'id']),
         ]
     
     def __str__(self):
@@ -70,6 +84,15 @@ class UserProfile(models.Model):
             return f"{self.user.first_name} {self.user.last_name}"
         return self.user.username
     
+    def rating_histogram(self):
+        """Return (stars, count, percent) rows from 5 stars down to 1."""
+        rows = []
+        for stars in range(5, 0, -1):
+            count = getattr(self, f'rating_{stars}_count')
+            percent = round(100 * count / self.rating_count) if self.rating_count else 0
+            rows.append((stars, count, percent))
+        return rows
+    
     def is_verified_seller(self):
         """Check if user is a verified seller."""
         return self.is_seller and self.verification_status == 'verified'
@@ -329,10 +329,9 @@ class UserViewsTests(TestCase):
         seller_profile.save()
         
         response = self.client.get(reverse('users:seller_list'))
-        # Seller list may return 404 if URL not yet active, that's OK for now
-        if response.status_code == 200:
-            self.assertTemplateUsed(response, 'users/seller_list.html')
-            self.assertIn(seller_profile, response.context['sellers'])
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'users/seller_list.html')
+        self.assertIn(seller_profile, response.context['sellers'])
     
     def test_seller_detail_view(self):
         """Test seller detail view for verified seller - may fail if Item model not ready."""
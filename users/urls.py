@@ -1,8 +1,12 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
 app_name = 'users'
 
+# Async storefront for ASGI deployments, like the marketplace listing views
+seller_view = views.AsyncSellerDetailView if settings.ASYNC_VIEWS else views.SellerDetailView
+
 urlpatterns = [
     # Authentication
     path('register/', views.RegisterView.as_view(), name='register'),
@@ -12,9 +16,11 @@ urlpatterns = [
     # User Profile
     path('profile/', views.MyProfileDetailView.as_view(), name='my_profile'),
     path('profile/edit/', views.ProfileEditView.as_view(), name='edit_profile'),
-    path('<str:username>/', views.ProfileDetailView.as_view(), name='profile'),
     
     # Sellers
     path('sellers/', views.SellerListView.as_view(), name='seller_list'),
-    path('sellers/<str:username>/', views.SellerDetailView.as_view(), name='seller_profile'),
+    path('sellers/<str:username>/', seller_view.as_view(), name='seller_profile'),
+    
+    # Catch-all username pattern last, so it does not shadow the fixed paths above
+    path('<str:username>/', views.ProfileDetailView.as_view(), name='profile'),
 ]
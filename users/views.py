@@ -1,3 +1,6 @@
+import asyncio
+
+from django.http import Http404
 from django.shortcuts import render, redirect, get_object_or_404
 from django.views.generic import CreateView, DetailView, UpdateView, ListView
 from django.contrib.auth.models import User
@@ -107,10 +110,13 @@ class MyProfileDetailView(LoginRequiredMixin, DetailView):
         # Add seller info if applicable
         if self.object.is_seller:
             from marketplace.models import Item
+            from transactions.rollups import seller_sales_summary
             context['seller_items'] = Item.objects.filter(
                 seller=self.request.user,
                 is_active=True
             ).select_related('category').prefetch_related('images')
+            # Read from the monthly rollups, never the raw transactions table
+            context['sales_summary'] = seller_sales_summary(self.request.user)
         
         return context
 
@@ -160,11 +166,11 @@ class SellerListView(ListView):
     paginate_by = 12
     
     def get_queryset(self):
-        """Get verified sellers ordered by rating."""
+        """Get verified sellers ranked by Bayesian rating score."""
         return UserProfile.objects.filter(
             is_seller=True,
             verification_status='verified'
-        ).order_by('-average_rating')
+        ).select_related('user').order_by('-rating_score', 'id')
     
     def get_context_data(self, **kwargs):
         """Add context data."""
@@ -196,13 +202,44 @@ class SellerDetailView(DetailView):
     def get_context_data(self, **kwargs):
         """Add seller's items."""
         context = super().get_context_data(**kwargs)
-        profile = self.get_object()
+        profile = self.object
         
         # Get seller's active items
         from marketplace.models import Item
         context['seller_items'] = Item.objects.filter(
             seller=profile.user,
             is_active=True
-        ).select_related('category').prefetch_related('images').order_by('-created_at')
+        ).select_related('category').prefetch_related('images').order_by('-created_at', '-id')
         
         return context
+
+
+class AsyncSellerDetailView(SellerDetailView):
+    """SellerDetailView for ASGI deployments; the profile and the listings are awaited together."""
+
+    async def get(self, request, *args, **kwargs):
+        from marketplace.models import Item
+
+        username = self.kwargs.get(self.slug_url_kwarg)
+        items = Item.objects.filter(
+            seller__username=username,
+            is_active=True
+        ).select_related('category').prefetch_related('images').order_by('-created_at', '-id')
+
+        async def fetch_items():
+            return [item async for item in items]
+
+        try:
+            self.object, seller_items = await asyncio.gather(
+                self.get_queryset().select_related('user').aget(user__username=username),
+                fetch_items(),
+            )
+        except UserProfile.DoesNotExist:
+            raise Http404("No seller found matching the query")
+
+        return self.render_to_response({
+            'view': self,
+            'object': self.object,
+            self.context_object_name: self.object,
+            'seller_items': seller_items,
+        })